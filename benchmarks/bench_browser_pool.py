@@ -0,0 +1,120 @@
+# benchmarks/bench_browser_pool.py
+"""
+Cold-launch vs warm browser pool for segment rendering.
+
+Renders the same short scene N times with render_segment_capture, once
+launching a browser per segment (render_segment_video behaviour) and once on a
+BrowserPool (SegmentRenderWorker behaviour), and reports wall time and CPU
+seconds (this process + reaped browser/ffmpeg children) per segment.
+
+Requires playwright (with chromium installed) and ffmpeg on PATH.
+
+    python benchmarks/bench_browser_pool.py --segments 6 --duration 3 --mode virtual
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from video_renderer import BrowserPool, render_segment_capture
+
+
+# Inline stand-in for gsap so the benchmark measures browser + capture cost only,
+# independent of CDN latency.
+BENCH_HTML = """<!DOCTYPE html>
+<html><head><meta charset="UTF-8">
+<style>
+body { margin: 0; width: 1920px; height: 1080px; overflow: hidden;
+       background: linear-gradient(135deg, #0f172a 0%, #1e293b 100%); }
+.box { position: absolute; top: 440px; left: 160px; width: 200px; height: 200px;
+       background: #00d4ff; border-radius: 20px; animation: slide 2s ease-in-out infinite alternate; }
+@keyframes slide { to { transform: translateX(1400px) rotate(180deg); } }
+</style></head>
+<body><div class="box"></div>
+<script>window.gsap = window.gsap || { ticker: { lagSmoothing: function () {} } };</script>
+</body></html>"""
+
+
+def _cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _write_fixtures(workdir: str, duration: float):
+    html_path = os.path.join(workdir, 'bench.html')
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(BENCH_HTML)
+
+    audio_path = os.path.join(workdir, 'bench.wav')
+    with wave.open(audio_path, 'wb') as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(44100)
+        w.writeframes(b'\x00\x00\x00\x00' * int(44100 * duration))
+
+    return html_path, audio_path
+
+
+def _run(label: str, segments: int, duration: float, mode: str, workdir: str, html_path: str, audio_path: str, pool=None) -> dict:
+    cpu_start = _cpu_seconds()
+    wall_start = time.time()
+    latencies = []
+
+    for i in range(segments):
+        start = time.time()
+        render_segment_capture(
+            html_path=html_path,
+            audio_path=audio_path,
+            output_path=os.path.join(workdir, f'{label}_{i}.mp4'),
+            duration_sec=duration,
+            segment_index=i,
+            fps=30,
+            quality=90,
+            ffmpeg_timeout=180,
+            capture_mode=mode,
+            browser_pool=pool
+        )
+        latencies.append(time.time() - start)
+
+    if pool is not None:
+        pool.close()
+
+    return {
+        'label': label,
+        'wall': time.time() - wall_start,
+        'cpu': _cpu_seconds() - cpu_start,
+        'first': latencies[0],
+        'rest': sum(latencies[1:]) / max(1, len(latencies) - 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--segments', type=int, default=6)
+    parser.add_argument('--duration', type=float, default=3.0, help="seconds of video per segment")
+    parser.add_argument('--mode', choices=['virtual', 'realtime'], default='virtual', help="capture mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        html_path, audio_path = _write_fixtures(workdir, args.duration)
+
+        results = [
+            _run('cold', args.segments, args.duration, args.mode, workdir, html_path, audio_path),
+            _run('pool', args.segments, args.duration, args.mode, workdir, html_path, audio_path,
+                 pool=BrowserPool(size=1, capture_mode=args.mode))
+        ]
+
+    print(f"\n{'mode':<6} {'wall/seg':>10} {'cpu/seg':>10} {'first':>8} {'steady':>8}")
+    for r in results:
+        print(f"{r['label']:<6} {r['wall'] / args.segments:>9.2f}s {r['cpu'] / args.segments:>9.2f}s "
+              f"{r['first']:>7.2f}s {r['rest']:>7.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+# benchmarks/bench_llm_client.py
+"""
+Direct LLMClient vs per-call CrewAI Agent/Task/Crew against the local stub LLM.
+
+Sends the real animation task prompt --calls times (--concurrency in flight) the
+way VideoAnimationAgent does under each LLM_BACKEND, and reports wall time,
+per-call latency and the prompt / completion tokens the server actually
+received per call. Both sides talk to the same stub server; crewai must be
+installed for the comparison, or pass --direct-only to measure LLMClient alone.
+
+    python benchmarks/bench_llm_client.py --calls 12 --concurrency 4 --ttft 0.3 --tps 400
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_llm_server import start_stub_llm_server
+from video_animation_prompts import (
+    ANIMATION_CODER_ROLE,
+    ANIMATION_CODER_GOAL,
+    ANIMATION_CODER_BACKSTORY,
+    ANIMATION_GENERATION_TASK_TEMPLATE
+)
+from video_llm_client import LLMClient, system_prompt
+from video_metrics import LatencyHistogram
+
+
+SEGMENT_TEXT = (
+    "A transistor is a tiny switch. When voltage reaches the gate, a conductive channel "
+    "forms between source and drain, letting current flow and turning the switch on."
+)
+VISUAL_HINT = (
+    "SCENE TYPE: Diagram. LAYOUT: Center transistor cross-section. LEFT: purple Source. "
+    "TOP: yellow Gate with Vgs arrow. RIGHT: purple Drain. ANIMATION: gate slides down, "
+    "channel glows cyan. BACKGROUND: dark blue gradient (#0f172a to #1e293b)."
+)
+
+
+def _task(i: int) -> str:
+    return ANIMATION_GENERATION_TASK_TEMPLATE.format(
+        segment_text=SEGMENT_TEXT,
+        visual_hint=VISUAL_HINT,
+        segment_index=i
+    )
+
+
+async def _run_direct(args, base_url: str) -> dict:
+    client = LLMClient(provider=args.provider, api_key='stub', base_url=base_url, model='stub-model', max_tokens=8192)
+    system = system_prompt(ANIMATION_CODER_ROLE, ANIMATION_CODER_GOAL, ANIMATION_CODER_BACKSTORY)
+    latency = LatencyHistogram('direct', buckets=(0.5, 1, 1.5, 2, 3, 5, 8, 13))
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int) -> int:
+        async with semaphore:
+            started_at = time.time()
+            response = await client.complete(system, _task(i))
+            latency.observe(time.time() - started_at)
+        return len(response['text'])
+
+    start = time.time()
+    sizes = await asyncio.gather(*(one(i) for i in range(args.calls)))
+    wall = time.time() - start
+    await client.aclose()
+
+    return {'wall': wall, 'latency': latency, 'chars': sum(sizes), 'client': client.stats()}
+
+
+async def _run_crewai(args, base_url: str) -> dict:
+    from crewai import Agent, Crew, LLM, Task
+
+    # litellm routes "<provider>/<model>" to base_url
+    llm = LLM(
+        model=f"{'anthropic' if args.provider == 'anthropic' else 'openai'}/stub-model",
+        base_url=base_url,
+        api_key='stub',
+        max_tokens=8192
+    )
+    latency = LatencyHistogram('crewai', buckets=(0.5, 1, 1.5, 2, 3, 5, 8, 13))
+    executor = ThreadPoolExecutor(max_workers=args.concurrency)
+    loop = asyncio.get_running_loop()
+
+    def kickoff(i: int) -> str:
+        agent = Agent(
+            role=ANIMATION_CODER_ROLE,
+            goal=ANIMATION_CODER_GOAL,
+            backstory=ANIMATION_CODER_BACKSTORY,
+            llm=llm,
+            verbose=False,
+            allow_delegation=False,
+            tools=[]
+        )
+        task = Task(
+            description=_task(i),
+            agent=agent,
+            expected_output="Complete auto-playing scene HTML with topic-specific animations"
+        )
+        return str(Crew(agents=[agent], tasks=[task], verbose=False).kickoff())
+
+    async def one(i: int) -> int:
+        started_at = time.time()
+        text = await loop.run_in_executor(executor, kickoff, i)
+        latency.observe(time.time() - started_at)
+        return len(text)
+
+    start = time.time()
+    sizes = await asyncio.gather(*(one(i) for i in range(args.calls)))
+    wall = time.time() - start
+    executor.shutdown()
+
+    return {'wall': wall, 'latency': latency, 'chars': sum(sizes)}
+
+
+def _report(name: str, result: dict, requests: list, calls: int):
+    sent = max(1, len(requests))
+    print(f"{name}:")
+    print(f"  wall:        {result['wall']:.2f}s for {calls} calls ({len(requests)} HTTP requests)")
+    print(f"  latency:     {result['latency'].format()}")
+    print(f"  tokens/call: {sum(r['input_tokens'] for r in requests) / calls:.0f} in / "
+          f"{sum(r['output_tokens'] for r in requests) / calls:.0f} out "
+          f"({sum(r['input_tokens'] for r in requests) / sent:.0f} in per request)")
+    if 'client' in result:
+        print(f"  client:      {result['client']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--calls', type=int, default=12)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--ttft', type=float, default=0.3, help="stub seconds before the first token")
+    parser.add_argument('--tps', type=float, default=400.0, help="stub completion tokens per second")
+    parser.add_argument('--provider', choices=['anthropic', 'groq'], default='groq',
+                        help="wire protocol: anthropic Messages or OpenAI-compatible chat")
+    parser.add_argument('--direct-only', action='store_true', help="skip the CrewAI comparison")
+    args = parser.parse_args()
+
+    # Checked before any calls are made: a missing crewai must not pass for a direct-only run
+    if not args.direct_only and importlib.util.find_spec('crewai') is None:
+        parser.error("crewai is not installed; pip install crewai, or pass --direct-only")
+
+    server = start_stub_llm_server(ttft=args.ttft, tokens_per_second=args.tps)
+
+    try:
+        direct = asyncio.run(_run_direct(args, server.base_url))
+        _report("direct", direct, server.reset(), args.calls)
+
+        if not args.direct_only:
+            crewai = asyncio.run(_run_crewai(args, server.base_url))
+            _report("crewai", crewai, server.reset(), args.calls)
+            print(f"direct vs crewai: {direct['latency'].percentile(50):.2f}s vs "
+                  f"{crewai['latency'].percentile(50):.2f}s p50 per call")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
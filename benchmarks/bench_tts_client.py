@@ -0,0 +1,88 @@
+# benchmarks/bench_tts_client.py
+"""
+TTSClient against the local fake TTS server.
+
+Fires --requests synthesize calls split across --jobs concurrent "jobs" that share
+one process-wide client, with a share of responses throttled (429 + Retry-After).
+Reports wall time, latency histogram, retries, rate-limiter waits and how many
+TCP connections the server saw (keep-alive reuse), and checks every returned
+body parses as WAV.
+
+    python benchmarks/bench_tts_client.py --requests 48 --jobs 4 --throttle 0.2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_tts_server import start_fake_tts_server
+from video_audio_analysis import analyze_wav
+from video_tts_client import TokenBucket, TTSClient
+
+
+async def _job(client: TTSClient, job: int, count: int, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> float:
+        async with semaphore:
+            audio = await client.synthesize(f"job {job} segment {i}")
+        return analyze_wav(audio)['duration']
+
+    return await asyncio.gather(*(one(i) for i in range(count)))
+
+
+async def _run(args, base_url: str) -> dict:
+    client = TTSClient(
+        api_key='fake',
+        base_url=base_url,
+        rate_limiter=TokenBucket(args.rate, args.burst),
+        max_retries=args.retries,
+        backoff_base=0.2,
+        backoff_max=2.0
+    )
+
+    per_job = args.requests // args.jobs
+    start = time.time()
+    results = await asyncio.gather(*(_job(client, j, per_job, args.concurrency) for j in range(args.jobs)))
+    wall = time.time() - start
+    await client.aclose()
+
+    return {
+        'wall': wall,
+        'audio_seconds': sum(sum(durations) for durations in results),
+        'client': client
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=48)
+    parser.add_argument('--jobs', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=10, help="in-flight requests per job")
+    parser.add_argument('--latency', type=float, default=0.3)
+    parser.add_argument('--throttle', type=float, default=0.2)
+    parser.add_argument('--rate', type=float, default=20.0, help="token bucket requests/second")
+    parser.add_argument('--burst', type=float, default=10.0)
+    parser.add_argument('--retries', type=int, default=6)
+    args = parser.parse_args()
+
+    server = start_fake_tts_server(latency=args.latency, throttle=args.throttle, retry_after=0.5)
+
+    try:
+        result = asyncio.run(_run(args, server.base_url))
+    finally:
+        server.shutdown()
+
+    client = result['client']
+    print(f"wall:        {result['wall']:.2f}s for {args.requests} requests ({result['audio_seconds']:.1f}s of audio)")
+    print(f"latency:     {client.latency.format()}")
+    print(f"client:      {client.stats()}")
+    print(f"server:      {server.stats}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# benchmarks/fake_tts_server.py
+"""
+Local stand-in for the Groq /audio/speech endpoint.
+
+Answers POST .../audio/speech with the trn*.wav fixtures from the repo root (in
+rotation), after a configurable latency, and throttles a configurable share of
+requests with 429 + Retry-After. Keep-alive is on, so connection reuse in the
+client shows up in the per-connection request counts.
+
+    python benchmarks/fake_tts_server.py --port 8765 --latency 0.4 --throttle 0.2
+    TTS_API_BASE_URL=http://127.0.0.1:8765/openai/v1 ...
+
+Can also be started in-process with start_fake_tts_server().
+"""
+import argparse
+import glob
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_fixtures(pattern: str = 'trn*.wav') -> list:
+    paths = sorted(glob.glob(os.path.join(REPO_ROOT, pattern)))
+    if not paths:
+        raise FileNotFoundError(f"No fixtures matching {pattern} in {REPO_ROOT}")
+
+    fixtures = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            fixtures.append(f.read())
+    return fixtures
+
+
+class FakeTTSServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.3, jitter: float = 0.1,
+                 throttle: float = 0.0, retry_after: float = 1.0):
+        super().__init__(address, FakeTTSHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle = throttle
+        self.retry_after = retry_after
+        self.fixtures = itertools.cycle(load_fixtures())
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'throttled': 0, 'connections': 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/openai/v1"
+
+    def next_fixture(self) -> bytes:
+        with self.lock:
+            return next(self.fixtures)
+
+    def count(self, key: str):
+        with self.lock:
+            self.stats[key] += 1
+
+
+class FakeTTSHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        if not self.path.rstrip('/').endswith('/audio/speech'):
+            return self._reply(404, b'{"error": "not found"}', 'application/json')
+
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return self._reply(400, b'{"error": "invalid json"}', 'application/json')
+
+        if not payload.get('input'):
+            return self._reply(400, b'{"error": "input required"}', 'application/json')
+
+        self.server.count('requests')
+        time.sleep(max(0.0, self.server.latency + random.uniform(-1, 1) * self.server.jitter))
+
+        if random.random() < self.server.throttle:
+            self.server.count('throttled')
+            return self._reply(
+                429, b'{"error": "rate limited"}', 'application/json',
+                {'Retry-After': f"{self.server.retry_after:g}"}
+            )
+
+        self._reply(200, self.server.next_fixture(), 'audio/wav')
+
+    def _reply(self, status: int, body: bytes, content_type: str, headers: dict = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_tts_server(host: str = '127.0.0.1', port: int = 0, **options) -> FakeTTSServer:
+    """Serve in a background thread; call server.shutdown() when done"""
+    server = FakeTTSServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.3, help="seconds before each response")
+    parser.add_argument('--jitter', type=float, default=0.1, help="± seconds added to latency")
+    parser.add_argument('--throttle', type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument('--retry-after', type=float, default=1.0, help="Retry-After seconds on 429")
+    args = parser.parse_args()
+
+    server = FakeTTSServer(
+        (args.host, args.port),
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle=args.throttle,
+        retry_after=args.retry_after
+    )
+    print(f"🔊 Fake TTS server on {server.base_url} (latency {args.latency}s, throttle {args.throttle:.0%})")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 {server.stats}")
+
+
+if __name__ == '__main__':
+    main()
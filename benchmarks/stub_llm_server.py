@@ -0,0 +1,280 @@
+# benchmarks/stub_llm_server.py
+"""
+Local stand-in for the Anthropic Messages and OpenAI-compatible chat APIs.
+
+Answers POST .../messages and POST .../chat/completions with a canned scene HTML
+document, streamed (SSE) or in one JSON body, after a configurable time to first
+token and at a configurable token rate. Prompt and completion sizes are counted
+server-side (~4 characters per token), so clients can be compared on how many
+tokens they actually send for the same task.
+
+When the prompt asks for a ReAct-style "Final Answer:" (CrewAI agents do), the
+reply is wrapped in "Thought: ... Final Answer: ..." like a real model would.
+
+    python benchmarks/stub_llm_server.py --port 8766 --ttft 0.3 --tps 400
+    ANTHROPIC_API_BASE_URL=http://127.0.0.1:8766/v1 ...
+
+Can also be started in-process with start_stub_llm_server().
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CHARS_PER_TOKEN = 4
+
+SCENE_HTML = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>Scene</title>
+<link href="https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;700;800&display=swap" rel="stylesheet">
+<script src="https://cdnjs.cloudflare.com/ajax/libs/gsap/3.12.2/gsap.min.js"></script>
+<style>
+body { margin: 0; width: 1920px; height: 1080px; overflow: hidden; font-family: 'Poppins', sans-serif;
+       background: linear-gradient(135deg, #0f172a, #1e293b); color: #fff; }
+.title { position: absolute; top: 120px; width: 100%; text-align: center; font-size: 72px; font-weight: 800; }
+.box { position: absolute; width: 320px; height: 180px; border-radius: 24px; background: #7c3aed; }
+.caption { position: absolute; bottom: 80px; width: 100%; text-align: center; font-size: 36px; }
+</style>
+</head>
+<body>
+<div class="title" id="title">How Transistors Switch</div>
+<svg width="1920" height="1080" style="position:absolute;top:0;left:0">
+  <rect id="source" x="460" y="520" width="200" height="150" fill="#8b5cf6" rx="12"/>
+  <rect id="gate" x="660" y="440" width="600" height="30" fill="#facc15" rx="8"/>
+  <rect id="drain" x="1260" y="520" width="200" height="150" fill="#8b5cf6" rx="12"/>
+  <rect id="channel" x="660" y="560" width="600" height="30" fill="#22d3ee" opacity="0"/>
+</svg>
+<div class="caption" id="caption">When gate voltage exceeds threshold, a channel forms.</div>
+<script>
+const tl = gsap.timeline();
+tl.from('#title', { y: -80, opacity: 0, duration: 1 })
+  .from('#source, #drain', { scale: 0, transformOrigin: 'center', duration: 0.8, stagger: 0.2 })
+  .from('#gate', { y: -120, opacity: 0, duration: 0.8 })
+  .to('#channel', { opacity: 0.8, duration: 1.2 })
+  .from('#caption', { opacity: 0, y: 40, duration: 1 });
+</script>
+</body>
+</html>"""
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, ttft: float = 0.3, tokens_per_second: float = 400.0, reply: str = SCENE_HTML):
+        super().__init__(address, StubLLMHandler)
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.reply = reply
+        self.lock = threading.Lock()
+        self.requests = []
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def record(self, api: str, prompt_chars: int, completion_chars: int, stream: bool):
+        with self.lock:
+            self.requests.append({
+                'api': api,
+                'stream': stream,
+                'input_tokens': _tokens(prompt_chars),
+                'output_tokens': _tokens(completion_chars)
+            })
+
+    def reset(self) -> list:
+        with self.lock:
+            requests, self.requests = self.requests, []
+        return requests
+
+    @property
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'requests': len(self.requests),
+                'input_tokens': sum(r['input_tokens'] for r in self.requests),
+                'output_tokens': sum(r['output_tokens'] for r in self.requests)
+            }
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return self._reply(400, {'error': 'invalid json'})
+
+        path = self.path.rstrip('/')
+        if path.endswith('/messages'):
+            api = 'anthropic'
+        elif path.endswith('/chat/completions'):
+            api = 'openai'
+        else:
+            return self._reply(404, {'error': 'not found'})
+
+        prompt = _prompt_text(payload)
+        if not prompt:
+            return self._reply(400, {'error': 'messages required'})
+
+        text = self.server.reply
+        if 'Final Answer:' in prompt:
+            text = f"Thought: I now know the final answer\nFinal Answer: {text}"
+
+        stream = bool(payload.get('stream'))
+        self.server.record(api, len(prompt), len(text), stream)
+        time.sleep(self.server.ttft)
+
+        if not stream:
+            # Same generation time as the streamed reply, just delivered at the end
+            if self.server.tokens_per_second > 0:
+                time.sleep(_tokens(len(text)) / self.server.tokens_per_second)
+            return self._reply(200, _full_response(api, payload, prompt, text))
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        for event in _stream_events(api, payload, prompt, text, self.server.tokens_per_second):
+            self._chunk(event.encode('utf-8'))
+        self._chunk(b'')
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def _reply(self, status: int, payload: dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _tokens(chars: int) -> int:
+    return max(1, chars // CHARS_PER_TOKEN)
+
+
+def _prompt_text(payload: dict) -> str:
+    parts = []
+    system = payload.get('system')
+    if isinstance(system, str):
+        parts.append(system)
+    elif isinstance(system, list):
+        parts.extend(block.get('text', '') for block in system)
+
+    for message in payload.get('messages') or []:
+        content = message.get('content')
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(block.get('text', '') for block in content if isinstance(block, dict))
+    return '\n'.join(parts)
+
+
+def _usage(api: str, prompt: str, text: str) -> dict:
+    if api == 'anthropic':
+        return {'input_tokens': _tokens(len(prompt)), 'output_tokens': _tokens(len(text))}
+    return {
+        'prompt_tokens': _tokens(len(prompt)),
+        'completion_tokens': _tokens(len(text)),
+        'total_tokens': _tokens(len(prompt)) + _tokens(len(text))
+    }
+
+
+def _full_response(api: str, payload: dict, prompt: str, text: str) -> dict:
+    if api == 'anthropic':
+        return {
+            'id': 'msg_stub',
+            'type': 'message',
+            'role': 'assistant',
+            'model': payload.get('model'),
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'usage': _usage(api, prompt, text)
+        }
+    return {
+        'id': 'chatcmpl-stub',
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': payload.get('model'),
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+        'usage': _usage(api, prompt, text)
+    }
+
+
+def _stream_events(api: str, payload: dict, prompt: str, text: str, tokens_per_second: float):
+    chunk_chars = CHARS_PER_TOKEN * 8
+    delay = 8 / tokens_per_second if tokens_per_second > 0 else 0.0
+    usage = _usage(api, prompt, text)
+
+    def sse(data: dict, event: str = None) -> str:
+        prefix = f"event: {event}\n" if event else ""
+        return f"{prefix}data: {json.dumps(data)}\n\n"
+
+    if api == 'anthropic':
+        yield sse({'type': 'message_start', 'message': {
+            'id': 'msg_stub', 'type': 'message', 'role': 'assistant', 'model': payload.get('model'),
+            'content': [], 'usage': {'input_tokens': usage['input_tokens'], 'output_tokens': 1}
+        }}, 'message_start')
+        yield sse({'type': 'content_block_start', 'index': 0, 'content_block': {'type': 'text', 'text': ''}}, 'content_block_start')
+        for i in range(0, len(text), chunk_chars):
+            time.sleep(delay)
+            yield sse({'type': 'content_block_delta', 'index': 0,
+                       'delta': {'type': 'text_delta', 'text': text[i:i + chunk_chars]}}, 'content_block_delta')
+        yield sse({'type': 'content_block_stop', 'index': 0}, 'content_block_stop')
+        yield sse({'type': 'message_delta', 'delta': {'stop_reason': 'end_turn'},
+                   'usage': {'output_tokens': usage['output_tokens']}}, 'message_delta')
+        yield sse({'type': 'message_stop'}, 'message_stop')
+        return
+
+    base = {'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': payload.get('model')}
+    for i in range(0, len(text), chunk_chars):
+        time.sleep(delay)
+        yield sse(dict(base, choices=[{'index': 0, 'delta': {'content': text[i:i + chunk_chars]}, 'finish_reason': None}]))
+    yield sse(dict(base, choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]))
+    if (payload.get('stream_options') or {}).get('include_usage'):
+        yield sse(dict(base, choices=[], usage=usage))
+    yield "data: [DONE]\n\n"
+
+
+def start_stub_llm_server(host: str = '127.0.0.1', port: int = 0, **options) -> StubLLMServer:
+    """Serve in a background thread; call server.shutdown() when done"""
+    server = StubLLMServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--ttft', type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument('--tps', type=float, default=400.0, help="completion tokens per second")
+    args = parser.parse_args()
+
+    server = StubLLMServer((args.host, args.port), ttft=args.ttft, tokens_per_second=args.tps)
+    print(f"🧠 Stub LLM server on {server.base_url} (ttft {args.ttft}s, {args.tps:g} tok/s)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 {server.stats}")
+
+
+if __name__ == '__main__':
+    main()
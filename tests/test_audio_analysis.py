@@ -0,0 +1,149 @@
+import io
+import math
+import os
+import struct
+import wave
+
+import pytest
+
+from video_audio_analysis import (
+    WAVE_FORMAT_PCM,
+    AudioAnalysisError,
+    analyze_wav,
+    parse_wav_header
+)
+from video_config import AUDIO_MIN_DURATION, TRANSITION_DURATION
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 16-bit PCM samples the stdlib wave module can read too; some carry cue/LIST/bext chunks after data
+PCM16_SAMPLES = ['trn1.wav', 'trn2.wav', 'trn4.wav', 'trn7.wav', 'trn9.wav', 'trn10.wav']
+# 24-bit WAVE_FORMAT_EXTENSIBLE with a fact chunk before data
+EXTENSIBLE_SAMPLES = ['trn3.wav', 'trn6.wav', 'trn8.wav']
+
+
+def _sample(name):
+    with open(os.path.join(ROOT, name), 'rb') as f:
+        return f.read()
+
+
+def _wav(samples, sample_rate=8000, channels=1):
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(struct.pack(f'<{len(samples)}h', *samples))
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('name', PCM16_SAMPLES)
+def test_pcm_samples_match_stdlib_wave(name):
+    data = _sample(name)
+    with wave.open(io.BytesIO(data)) as w:
+        frames, rate, channels = w.getnframes(), w.getframerate(), w.getnchannels()
+
+    info = analyze_wav(data)
+
+    assert info['frames'] == frames
+    assert info['sample_rate'] == rate
+    assert info['channels'] == channels
+    assert info['bits_per_sample'] == 16
+    assert info['duration'] == pytest.approx(frames / rate)
+    assert 0 < info['peak'] <= 1.0
+    assert info['rms_dbfs'] == pytest.approx(20 * math.log10(info['rms']))
+
+
+@pytest.mark.parametrize('name', EXTENSIBLE_SAMPLES)
+def test_extensible_samples_resolve_subformat(name):
+    data = _sample(name)
+
+    header = parse_wav_header(data)
+    info = analyze_wav(data)
+
+    assert header['format_tag'] == WAVE_FORMAT_PCM
+    assert header['bits_per_sample'] == 24
+    assert header['data_offset'] == 80
+    assert info['frames'] == header['data_size'] // header['block_align']
+    assert 0 < info['peak'] <= 1.0
+
+
+def test_path_and_bytes_agree():
+    assert analyze_wav(os.path.join(ROOT, 'trn3.wav')) == analyze_wav(_sample('trn3.wav'))
+
+
+def test_chunks_after_data_are_not_audio():
+    data = _sample('trn1.wav')
+
+    header = parse_wav_header(data)
+
+    assert header['data_size'] == 88200
+    assert header['data_offset'] + header['data_size'] < len(data)
+
+
+def test_streaming_placeholder_sizes_run_to_end_of_buffer():
+    data = bytearray(_sample('trn10.wav'))
+    expected = analyze_wav(bytes(data))
+    data_offset = parse_wav_header(bytes(data))['data_offset']
+    struct.pack_into('<I', data, 4, 0xFFFFFFFF)
+    struct.pack_into('<I', data, data_offset - 4, 0xFFFFFFFF)
+
+    assert analyze_wav(bytes(data)) == expected
+
+
+def test_truncated_stream_drops_partial_frame():
+    data = _sample('trn10.wav')
+    header = parse_wav_header(data)
+    cut = header['data_offset'] + 1000 * header['block_align'] + 3
+
+    info = analyze_wav(data[:cut])
+
+    assert info['frames'] == 1000
+
+
+def test_silence_profile_and_loudness():
+    tone = [int(16384 * math.sin(2 * math.pi * 440 * i / 8000)) for i in range(4000)]
+    info = analyze_wav(_wav([0] * 2000 + tone + [0] * 4000))
+
+    assert info['duration'] == pytest.approx(1.25)
+    assert info['leading_silence'] == pytest.approx(0.25, abs=0.001)
+    assert info['trailing_silence'] == pytest.approx(0.5, abs=0.001)
+    assert info['peak'] == pytest.approx(0.5, abs=0.001)
+    assert info['rms_dbfs'] == pytest.approx(20 * math.log10(0.5 / math.sqrt(2) * math.sqrt(4000 / 10000)), abs=0.05)
+
+
+def test_all_silent_audio():
+    info = analyze_wav(_wav([0] * 800))
+
+    assert info['leading_silence'] == info['trailing_silence'] == pytest.approx(0.1)
+    assert info['rms_dbfs'] == float('-inf')
+
+
+def test_empty_data_chunk():
+    info = analyze_wav(_wav([]))
+
+    assert info['frames'] == 0 and info['duration'] == 0.0
+
+
+@pytest.mark.parametrize('data, message', [
+    (b'not a wav file at all', 'Not a RIFF'),
+    (b'RIFF\x04\x00\x00\x00WAVE', 'No data chunk'),
+    (b'RIFF\x10\x00\x00\x00WAVEdata\x04\x00\x00\x00\x00\x00\x00\x00', 'data chunk before fmt'),
+    (b'RIFF\x18\x00\x00\x00WAVEfmt \x08\x00\x00\x00' + b'\x00' * 8, 'fmt chunk too small')
+])
+def test_malformed_headers_are_rejected(data, message):
+    with pytest.raises(AudioAnalysisError, match=message):
+        parse_wav_header(data)
+
+
+def test_unsupported_format_is_rejected():
+    data = bytearray(_wav([0] * 10))
+    struct.pack_into('<H', data, 20, 0x0055)  # MPEG Layer 3
+
+    with pytest.raises(AudioAnalysisError, match='Unsupported WAV format tag'):
+        analyze_wav(bytes(data))
+
+
+def test_min_duration_outlasts_the_transition():
+    assert AUDIO_MIN_DURATION >= TRANSITION_DURATION + 1.0
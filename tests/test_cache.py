@@ -0,0 +1,178 @@
+import os
+
+import pytest
+
+from video_artifact_store import LocalArtifactStore
+from video_cache import ArtifactStoreCacheBackend, AudioCache, DiskLRUCache, RemoteCacheBackend
+
+
+def _key(n):
+    return f'{n:02d}' + 'f' * 62
+
+
+def _entry_bytes(cache, key):
+    size = os.path.getsize(cache._blob_path(key))
+    if os.path.exists(cache._meta_path(key)):
+        size += os.path.getsize(cache._meta_path(key))
+    return size
+
+
+def test_disk_cache_miss_then_hit(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), 10 ** 6)
+
+    assert cache.get(_key(0)) is None
+    cache.put(_key(0), b'audio', {'duration': 1.5})
+
+    assert cache.get(_key(0)) == (b'audio', {'duration': 1.5})
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_disk_cache_counts_blob_and_metadata_bytes(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), 10 ** 6)
+
+    cache.put(_key(0), b'x' * 100, {'duration': 1.5})
+    cache.put(_key(1), b'y' * 50)
+
+    assert cache.total_bytes == _entry_bytes(cache, _key(0)) + 50
+    assert _entry_bytes(cache, _key(0)) > 100
+
+
+def test_disk_cache_replacing_an_entry_does_not_double_count(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), 10 ** 6)
+
+    cache.put(_key(0), b'x' * 100)
+    cache.put(_key(0), b'x' * 300)
+
+    assert cache.total_bytes == 300
+    assert cache.stats()['entries'] == 1
+
+
+def test_disk_cache_evicts_least_recently_used_first(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), 350)
+    for n in range(3):
+        cache.put(_key(n), bytes([n]) * 100)
+
+    assert cache.get(_key(0)) is not None
+    cache.put(_key(3), b'z' * 100)
+
+    assert cache.get(_key(1)) is None
+    assert all(cache.get(_key(n)) is not None for n in (0, 2, 3))
+    assert cache.evictions == 1
+    assert cache.total_bytes == 300
+    assert not os.path.exists(cache._blob_path(_key(1)))
+
+
+def test_disk_cache_keeps_an_oversized_newest_entry(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), 100)
+    cache.put(_key(0), b'a' * 50)
+
+    cache.put(_key(1), b'b' * 500)
+
+    assert cache.get(_key(0)) is None
+    assert cache.get(_key(1)) == (b'b' * 500, None)
+
+
+def test_disk_cache_recency_and_size_survive_a_restart(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), 350)
+    for n in range(3):
+        cache.put(_key(n), b'x' * 100)
+        os.utime(cache._blob_path(_key(n)), (1000 + n, 1000 + n))
+    os.utime(cache._blob_path(_key(0)), (2000, 2000))
+
+    reopened = DiskLRUCache(str(tmp_path), 350)
+    reopened.put(_key(3), b'x' * 100)
+
+    assert reopened.total_bytes == 300
+    assert reopened.get(_key(1)) is None
+    assert reopened.get(_key(0)) is not None
+
+
+def test_disk_cache_delete(tmp_path):
+    cache = DiskLRUCache(str(tmp_path), 10 ** 6)
+    cache.put(_key(0), b'x' * 100, {'a': 1})
+
+    cache.delete(_key(0))
+
+    assert cache.get(_key(0)) is None
+    assert cache.total_bytes == 0
+
+
+def test_remote_backend_is_abstract():
+    with pytest.raises(TypeError):
+        RemoteCacheBackend()
+
+
+class MemoryBackend(RemoteCacheBackend):
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, data, meta=None):
+        self.entries[key] = (data, meta)
+
+
+ARGS = ('Hello there', 'alloy', 'tts-1', 'wav')
+INFO = {'duration': 2.0, 'sample_rate': 24000}
+
+
+def test_audio_cache_key_covers_every_input():
+    base = AudioCache.make_key(*ARGS)
+
+    for i in range(len(ARGS)):
+        changed = list(ARGS)
+        changed[i] += '-other'
+        assert AudioCache.make_key(*changed) != base
+    assert AudioCache.make_key(*ARGS) == base
+
+
+def test_audio_cache_miss_then_local_hit(tmp_path):
+    cache = AudioCache(DiskLRUCache(str(tmp_path), 10 ** 6))
+
+    assert cache.get(*ARGS) is None
+    cache.put(*ARGS, b'RIFF-audio', INFO)
+
+    assert cache.get(*ARGS) == (b'RIFF-audio', INFO)
+    assert cache.stats()['local_hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_audio_cache_remote_hit_is_copied_to_local(tmp_path):
+    remote = MemoryBackend()
+    AudioCache(DiskLRUCache(str(tmp_path / 'a'), 10 ** 6), remote).put(*ARGS, b'RIFF-audio', INFO)
+    cache = AudioCache(DiskLRUCache(str(tmp_path / 'b'), 10 ** 6), remote)
+
+    assert cache.get(*ARGS) == (b'RIFF-audio', INFO)
+    assert cache.get(*ARGS) == (b'RIFF-audio', INFO)
+    assert (cache.remote_hits, cache.local_hits) == (1, 1)
+
+
+def test_audio_cache_ignores_entries_without_info(tmp_path):
+    local = DiskLRUCache(str(tmp_path), 10 ** 6)
+    local.put(AudioCache.make_key(*ARGS), b'RIFF-audio')
+
+    assert AudioCache(local).get(*ARGS) is None
+
+
+def test_audio_cache_survives_remote_failures(tmp_path):
+    class BrokenBackend(RemoteCacheBackend):
+        def get(self, key):
+            raise OSError('volume unavailable')
+
+        def put(self, key, data, meta=None):
+            raise OSError('volume unavailable')
+
+    cache = AudioCache(DiskLRUCache(str(tmp_path), 10 ** 6), BrokenBackend())
+
+    assert cache.get(*ARGS) is None
+    cache.put(*ARGS, b'RIFF-audio', INFO)
+    assert cache.get(*ARGS) == (b'RIFF-audio', INFO)
+
+
+def test_artifact_store_backend_round_trip(tmp_path):
+    backend = ArtifactStoreCacheBackend(LocalArtifactStore(str(tmp_path)), 'cache/tts')
+
+    assert backend.get(_key(0)) is None
+    backend.put(_key(0), b'audio', INFO)
+
+    assert backend.get(_key(0)) == (b'audio', INFO)
@@ -0,0 +1,156 @@
+import json
+
+from video_artifact_store import LocalArtifactStore
+from video_checkpoint import JobCheckpoint
+
+
+def _segment(index, text):
+    return {'index': index, 'text': text, 'visual_hint': 'hint'}
+
+
+def _store(tmp_path):
+    return LocalArtifactStore(str(tmp_path))
+
+
+def _record_artifacts(checkpoint, store, index):
+    for field, ref in (('audio_ref', f'jobs/job/audio_{index}.mp3'), ('video_ref', f'jobs/job/video_{index}.mp4')):
+        store.put_bytes(ref, b'x' * 100)
+        checkpoint.update_segment(index, **{field: ref})
+
+
+def test_missing_checkpoint_starts_fresh(tmp_path):
+    store = _store(tmp_path)
+
+    checkpoint = JobCheckpoint.start(store, 'job', resume=True)
+
+    assert checkpoint.manifest['phases'] == {}
+    assert checkpoint.script_segments() is None
+    assert checkpoint.streamed_script_segments() == []
+    assert store.exists(checkpoint.ref)
+
+
+def test_resume_restores_phases_and_segments(tmp_path):
+    store = _store(tmp_path)
+    checkpoint = JobCheckpoint.start(store, 'job')
+    segments = [_segment(0, 'intro'), _segment(1, 'body')]
+    checkpoint.bind_script_segments(segments)
+    checkpoint.complete_phase('script', {'segments': segments})
+    _record_artifacts(checkpoint, store, 1)
+    checkpoint.flush()
+
+    resumed = JobCheckpoint.start(store, 'job', resume=True)
+
+    assert resumed.script_segments() == segments
+    assert resumed.segment_artifact(1, 'video_ref') == 'jobs/job/video_1.mp4'
+    assert resumed.segment_artifact(0, 'video_ref') is None
+
+
+def test_resume_ignores_other_version(tmp_path):
+    store = _store(tmp_path)
+    checkpoint = JobCheckpoint.start(store, 'job')
+    checkpoint.complete_phase('metadata', {'title': 'T'})
+    manifest = json.loads(open(store.path(checkpoint.ref)).read())
+    manifest['version'] = JobCheckpoint.VERSION + 1
+    store.put_bytes(checkpoint.ref, json.dumps(manifest).encode('utf-8'))
+
+    resumed = JobCheckpoint.start(store, 'job', resume=True)
+
+    assert resumed.phase('metadata') is None
+
+
+def test_mid_stream_resume_keeps_streamed_prefix(tmp_path):
+    store = _store(tmp_path)
+    checkpoint = JobCheckpoint.start(store, 'job')
+    for index, text in enumerate(['intro', 'first point']):
+        checkpoint.add_script_segment(_segment(index, text))
+        _record_artifacts(checkpoint, store, index)
+    # The job fails before the stream ends: pending updates are flushed, the
+    # script phase never completes
+    checkpoint.flush()
+
+    resumed = JobCheckpoint.start(store, 'job', resume=True)
+
+    assert resumed.script_segments() is None
+    assert resumed.streamed_script_segments() == [_segment(0, 'intro'), _segment(1, 'first point')]
+    assert resumed.segment_artifact(1, 'video_ref') == 'jobs/job/video_1.mp4'
+
+
+def test_rebinding_same_text_keeps_artifacts(tmp_path):
+    store = _store(tmp_path)
+    checkpoint = JobCheckpoint.start(store, 'job')
+    checkpoint.add_script_segment(_segment(0, 'intro'))
+    _record_artifacts(checkpoint, store, 0)
+
+    checkpoint.add_script_segment(_segment(0, 'intro'))
+
+    assert checkpoint.segment_artifact(0, 'audio_ref') == 'jobs/job/audio_0.mp3'
+
+
+def test_changed_text_drops_stale_artifacts(tmp_path):
+    store = _store(tmp_path)
+    checkpoint = JobCheckpoint.start(store, 'job')
+    for index, text in enumerate(['intro', 'first point', 'second point']):
+        checkpoint.add_script_segment(_segment(index, text))
+        _record_artifacts(checkpoint, store, index)
+    checkpoint.flush()
+
+    resumed = JobCheckpoint.start(store, 'job', resume=True)
+    resumed.add_script_segment(_segment(1, 'a different first point'))
+
+    assert resumed.segment_artifact(0, 'video_ref') == 'jobs/job/video_0.mp4'
+    assert resumed.segment_artifact(1, 'video_ref') is None
+    assert resumed.segment_artifact(1, 'audio_ref') is None
+    assert [s['text'] for s in resumed.streamed_script_segments()] == ['intro', 'a different first point']
+
+
+def test_new_script_drops_artifacts_recorded_without_text(tmp_path):
+    store = _store(tmp_path)
+    checkpoint = JobCheckpoint.start(store, 'job')
+    _record_artifacts(checkpoint, store, 0)
+
+    checkpoint.bind_script_segments([_segment(0, 'intro')])
+
+    assert checkpoint.segment_artifact(0, 'video_ref') is None
+
+
+def test_segment_updates_are_debounced_until_flush(tmp_path):
+    store = _store(tmp_path)
+    checkpoint = JobCheckpoint.start(store, 'job', commit_interval=60)
+    checkpoint.update_segment(0, audio_ref='a0')
+    saves = checkpoint.saves
+
+    for index in range(1, 6):
+        checkpoint.update_segment(index, audio_ref=f'a{index}')
+
+    assert checkpoint.saves == saves
+    assert JobCheckpoint.start(store, 'job', resume=True).segment(5) == {}
+
+    checkpoint.flush()
+    checkpoint.flush()
+
+    assert checkpoint.saves == saves + 1
+    assert JobCheckpoint.start(store, 'job', resume=True).segment(5) == {'audio_ref': 'a5'}
+
+
+def test_phase_completion_writes_pending_segment_updates(tmp_path):
+    store = _store(tmp_path)
+    checkpoint = JobCheckpoint.start(store, 'job', commit_interval=60)
+    checkpoint.update_segment(0, audio_ref='a0')
+    checkpoint.update_segment(1, audio_ref='a1')
+
+    checkpoint.complete_phase('concat', {'final_ref': 'final.mp4'})
+
+    resumed = JobCheckpoint.start(store, 'job', resume=True)
+    assert resumed.segment(1) == {'audio_ref': 'a1'}
+    assert resumed.phase('concat')['final_ref'] == 'final.mp4'
+
+
+def test_zero_interval_writes_every_update(tmp_path):
+    store = _store(tmp_path)
+    checkpoint = JobCheckpoint.start(store, 'job', commit_interval=0)
+    saves = checkpoint.saves
+
+    checkpoint.update_segment(0, audio_ref='a0')
+    checkpoint.update_segment(1, audio_ref='a1')
+
+    assert checkpoint.saves == saves + 2
@@ -0,0 +1,115 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from video_concat import ConcatError, ConcatPlanner, SmartConcatEngine
+
+
+class StubConcatEngine(SmartConcatEngine):
+    """SmartConcatEngine with every ffmpeg step replaced by writing an empty file"""
+
+    def __init__(self, **options):
+        super().__init__(ffmpeg_timeout=10, **options)
+        self.calls = []
+
+    def _touch(self, path: str) -> str:
+        open(path, 'w').close()
+        return path
+
+    def _split_body(self, tag, video, entry, total_frames, workdir):
+        self.calls.append(('split', tag))
+        return self._touch(os.path.join(workdir, f'body_{tag}.mp4'))
+
+    def _render_window(self, tag, outgoing, incoming, entry, head_frames, transition, transition_frames, workdir):
+        self.calls.append(('window', tag))
+        return self._touch(os.path.join(workdir, f'window_{tag}.mp4'))
+
+    def _render_xfade_node(self, inputs, node, transition_frames, node_path, tag):
+        self.calls.append(('xfade', tag))
+        return self._touch(node_path)
+
+    def _copy_concat(self, parts, output_path, label):
+        self.calls.append(('join', label))
+        return self._touch(output_path)
+
+    def _concat_audio(self, videos, workdir):
+        return self._touch(os.path.join(workdir, 'narration.wav'))
+
+    def _mux(self, parts, audio_path, video_duration, output_path, workdir, bgm_path, bgm_volume):
+        self.calls.append(('mux', len(parts)))
+        return self._touch(output_path)
+
+
+def _clips(tmp_path, durations):
+    paths = []
+    for i, _ in enumerate(durations):
+        path = tmp_path / f'segment_{i}.mp4'
+        path.write_bytes(b'')
+        paths.append(str(path))
+    return paths
+
+
+def _build(engine, tmp_path, durations, transition_frames=15):
+    videos = _clips(tmp_path, durations)
+    frames = [int(round(d * engine.fps)) for d in durations]
+    levels = ConcatPlanner(engine.fan_in, transition_frames).plan(frames, ['fade'] * (len(frames) - 1))
+    workdir = tmp_path / 'work'
+    workdir.mkdir()
+    stats = {'nodes': 0, 'windows': 0, 'reencoded_nodes': 0, 'encoded_frames': 0}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parts = engine._build_tree(executor, levels, videos, frames, transition_frames, str(workdir), stats)
+    return videos, levels, parts, stats
+
+
+def test_tree_with_more_than_fan_in_clips_stream_copies(tmp_path):
+    engine = StubConcatEngine()
+    videos, levels, parts, stats = _build(engine, tmp_path, [10.0] * 17)
+
+    assert len(levels) == 2
+    assert stats['reencoded_nodes'] == 0
+    # Level 0: 15 windows in the 16-clip node; level 1: one window joining the two nodes
+    assert stats['windows'] == 16
+    assert len(parts) == 3
+    assert all(os.path.exists(video) for video in videos)
+
+
+def test_tree_with_clip_too_short_to_stream_copy(tmp_path):
+    engine = StubConcatEngine()
+    durations = [10.0] * 17
+    durations[3] = 1.0
+    videos, levels, parts, stats = _build(engine, tmp_path, durations)
+
+    # The 16-clip node is re-encoded as one file and carried into the next level
+    assert ('xfade', '0_0') in engine.calls
+    assert stats['reencoded_nodes'] == 1
+    assert len(parts) == 3
+    # Input clips (including the single-clip node passed through) are never deleted
+    assert all(os.path.exists(video) for video in videos)
+
+
+def test_tree_xfade_node_output_is_owned_and_cleaned_up(tmp_path):
+    engine = StubConcatEngine(fan_in=2)
+    durations = [10.0, 1.0, 10.0, 10.0, 10.0]
+    videos, levels, parts, stats = _build(engine, tmp_path, durations)
+
+    assert stats['reencoded_nodes'] >= 1
+    # Intermediate node files are removed once the next level has consumed them
+    leftovers = {name for name in os.listdir(tmp_path / 'work') if name.startswith(('xfade_0_', 'node_0_'))}
+    assert not leftovers
+    assert all(os.path.exists(video) for video in videos)
+
+
+def test_unexpected_tree_error_is_a_concat_error(tmp_path):
+    class BrokenEngine(StubConcatEngine):
+        def _render_xfade_node(self, inputs, node, transition_frames, node_path, tag):
+            raise StopIteration
+
+    engine = BrokenEngine(workdir_root=str(tmp_path / 'concat'))
+    durations = [10.0] * 17
+    durations[3] = 1.0
+    videos = _clips(tmp_path, durations)
+
+    with pytest.raises(ConcatError):
+        engine.concatenate(videos, durations, ['fade'] * 16, 0.5, str(tmp_path / 'final.mp4'))
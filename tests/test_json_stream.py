@@ -0,0 +1,71 @@
+import json
+import random
+
+from video_json_stream import JSONArrayStreamParser, parse_json_array_chunks
+
+
+RAW = (
+    'Final Answer:\n```json\n['
+    '{"text": "Plain segment"}, '
+    '{"text": "Quotes \\"inside\\" and a brace } and a bracket ] in a string"}, '
+    '{"text": "Backslash at the end \\\\", "notes": ["a", "b, c"]}, '
+    '{"text": "Unicode \\u00e9 and a comma, here"}'
+    ']\n```'
+)
+
+EXPECTED = json.loads(RAW[RAW.index('['):RAW.rindex(']') + 1])
+
+
+def test_escaped_strings_do_not_split_elements():
+    assert parse_json_array_chunks([RAW]) == EXPECTED
+
+
+def test_arbitrary_chunking_matches_whole_parse():
+    raw = RAW
+    rng = random.Random(7)
+
+    for _ in range(50):
+        cuts = sorted(rng.sample(range(1, len(raw)), 12))
+        chunks = [raw[a:b] for a, b in zip([0] + cuts, cuts + [len(raw)])]
+        assert parse_json_array_chunks(chunks) == EXPECTED
+
+
+def test_single_character_chunks_split_escapes():
+    assert parse_json_array_chunks(list(RAW)) == EXPECTED
+
+
+def test_truncated_stream_keeps_completed_elements():
+    raw = RAW
+    cut = raw.index('Backslash')
+    parser = JSONArrayStreamParser()
+
+    elements = parser.feed(raw[:cut])
+    elements += parser.close()
+
+    assert elements == EXPECTED[:2]
+    assert not parser.finished
+    assert parser.errors == 0
+
+
+def test_truncated_trailing_scalar_is_flushed_by_close():
+    parser = JSONArrayStreamParser()
+
+    assert parser.feed('[1, 2, 3') == [1, 2]
+    assert parser.close() == [3]
+
+
+def test_malformed_element_is_skipped():
+    parser = JSONArrayStreamParser()
+
+    elements = parser.feed('[{"text": "ok"}, {"text": oops}, {"text": "also ok"}]')
+
+    assert elements == [{'text': 'ok'}, {'text': 'also ok'}]
+    assert parser.errors == 1
+    assert parser.finished
+
+
+def test_text_after_closing_bracket_is_ignored():
+    parser = JSONArrayStreamParser()
+
+    assert parser.feed('[{"a": 1}] trailing [{"b": 2}]') == [{'a': 1}]
+    assert parser.feed('[{"c": 3}]') == []
@@ -0,0 +1,93 @@
+import os
+
+import video_cache
+import video_renderer
+from video_cache import DiskLRUCache, RenderCache
+
+
+AUDIO_SHA = 'a' * 64
+
+
+def _mp4(tmp_path, name, size):
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def _cache(tmp_path, max_bytes=10 ** 6, on_write=None):
+    return RenderCache(DiskLRUCache(str(tmp_path / 'renders'), max_bytes), on_write=on_write)
+
+
+def test_miss_then_hit(tmp_path):
+    writes = []
+    cache = _cache(tmp_path, on_write=lambda: writes.append(1))
+    key = RenderCache.make_key('<html>scene</html>', AUDIO_SHA, 5.0)
+    src = _mp4(tmp_path, 'segment_0.mp4', 2000)
+
+    assert cache.get(key) is None
+    cache.put(key, src, segment_index=0)
+    cached = cache.get(key)
+
+    assert cached is not None and cached != src
+    assert open(cached, 'rb').read() == open(src, 'rb').read()
+    assert os.path.exists(src)
+    assert writes == [1]
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_entries_survive_reopening_the_directory(tmp_path):
+    key = RenderCache.make_key('<html>scene</html>', AUDIO_SHA, 5.0)
+    _cache(tmp_path).put(key, _mp4(tmp_path, 'segment_0.mp4', 2000))
+
+    assert _cache(tmp_path).get(key) is not None
+
+
+def test_key_covers_every_input():
+    base = RenderCache.make_key('<html>scene</html>', AUDIO_SHA, 5.0)
+
+    assert RenderCache.make_key('<html>other</html>', AUDIO_SHA, 5.0) != base
+    assert RenderCache.make_key('<html>scene</html>', 'b' * 64, 5.0) != base
+    assert RenderCache.make_key('<html>scene</html>', AUDIO_SHA, 5.5) != base
+    assert RenderCache.make_key('<html>scene</html>', AUDIO_SHA, 5.0) == base
+
+
+def test_renderer_version_invalidates_entries(tmp_path, monkeypatch):
+    cache = _cache(tmp_path)
+    key = RenderCache.make_key('<html>scene</html>', AUDIO_SHA, 5.0)
+    cache.put(key, _mp4(tmp_path, 'segment_0.mp4', 2000))
+
+    monkeypatch.setattr(video_renderer, 'RENDERER_VERSION', video_renderer.RENDERER_VERSION + '-next')
+
+    assert cache.get(RenderCache.make_key('<html>scene</html>', AUDIO_SHA, 5.0)) is None
+
+
+def test_capture_settings_invalidate_entries(monkeypatch):
+    fingerprint = RenderCache.settings_fingerprint()
+
+    for name, value in (
+        ('RENDER_FPS', 60),
+        ('RENDER_IDLE_TAIL', not video_cache.RENDER_IDLE_TAIL),
+        ('RENDER_IDLE_STATIC_SECONDS', video_cache.RENDER_IDLE_STATIC_SECONDS + 1),
+        ('RENDER_READY_TIMEOUT_MS', video_cache.RENDER_READY_TIMEOUT_MS + 1)
+    ):
+        with monkeypatch.context() as patch:
+            patch.setattr(video_cache, name, value)
+            assert RenderCache.settings_fingerprint() != fingerprint, name
+
+    assert RenderCache.settings_fingerprint() == fingerprint
+
+
+def test_least_recently_used_render_is_evicted_under_byte_budget(tmp_path):
+    cache = _cache(tmp_path, max_bytes=5000)
+    keys = [RenderCache.make_key(f'<html>{i}</html>', AUDIO_SHA, 5.0) for i in range(3)]
+
+    cache.put(keys[0], _mp4(tmp_path, '0.mp4', 2000), segment_index=0)
+    cache.put(keys[1], _mp4(tmp_path, '1.mp4', 2000), segment_index=1)
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], _mp4(tmp_path, '2.mp4', 2000), segment_index=2)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['bytes'] <= 5000
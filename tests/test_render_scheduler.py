@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+import pytest
+
+from video_render_scheduler import RenderScheduler
+
+
+class FakeMethod:
+    """Modal-style method: only the .aio form is used by the scheduler"""
+
+    def __init__(self, fn):
+        self.aio = fn
+
+
+class FakeCall:
+    def __init__(self, delay, result='ref', error=None):
+        self.delay = delay
+        self.result = result
+        self.error = error
+        self.waiting = False
+        self.wait_cancelled = False
+        self.cancelled = False
+        self.get = FakeMethod(self._get)
+        self.cancel = FakeMethod(self._cancel)
+
+    async def _get(self, timeout=None):
+        self.waiting = True
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.wait_cancelled = True
+            raise
+        finally:
+            self.waiting = False
+        if self.error:
+            raise self.error
+        return self.result
+
+    async def _cancel(self):
+        self.cancelled = True
+
+
+def _scheduler(calls, **options):
+    spawned = []
+
+    def spawn(*args):
+        call = calls[len(spawned)]
+        spawned.append(args)
+        return call
+
+    options.setdefault('poll_interval', 0.01)
+    return RenderScheduler(spawn, **options), spawned
+
+
+def test_first_attempt_result_is_returned():
+    scheduler, spawned = _scheduler([FakeCall(0.01, 'video_0')])
+
+    result = asyncio.run(scheduler.render(0, lambda attempt: (attempt,), time.time() + 5))
+
+    assert result == 'video_0'
+    assert spawned == [(0,)]
+    assert scheduler.latency.count == 1
+
+
+def test_failed_attempt_is_retried_from_budget():
+    calls = [FakeCall(0.01, error=RuntimeError('boom')), FakeCall(0.01, 'video_1')]
+    scheduler, spawned = _scheduler(calls, retry_budget=1)
+
+    result = asyncio.run(scheduler.render(1, lambda attempt: (attempt,), time.time() + 5))
+
+    assert result == 'video_1'
+    assert len(spawned) == 2
+    assert scheduler.retries_remaining == 0
+
+
+def test_speculative_copy_wins_and_straggler_wait_is_cancelled():
+    straggler = FakeCall(30)
+    scheduler, spawned = _scheduler([straggler, FakeCall(0.01, 'fast')], min_samples=1)
+    scheduler.latency.observe(0.01)
+
+    async def run():
+        result = await scheduler.render(2, lambda attempt: (attempt,), time.time() + 5)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == 'fast'
+    assert scheduler.speculative_wins == 1
+    assert straggler.wait_cancelled and not straggler.waiting
+    assert straggler.cancelled
+
+
+def test_cancelling_render_cancels_the_wait():
+    call = FakeCall(30)
+    scheduler, _ = _scheduler([call])
+
+    async def run():
+        task = asyncio.create_task(scheduler.render(3, lambda attempt: (attempt,), time.time() + 60))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert call.wait_cancelled and not call.waiting
+    assert call.cancelled
+
+
+def test_deadline_cancels_pending_attempts():
+    call = FakeCall(30)
+    scheduler, _ = _scheduler([call])
+
+    with pytest.raises(Exception, match='deadline'):
+        asyncio.run(scheduler.render(4, lambda attempt: (attempt,), time.time() + 0.05))
+
+    assert call.cancelled
+
+
+def test_speculative_render_draws_speculation_budget_and_is_not_retried():
+    calls = [FakeCall(0.01, error=RuntimeError('boom')), FakeCall(0.01, 'unused')]
+    scheduler, spawned = _scheduler(calls, max_speculative=1, retry_budget=4)
+
+    with pytest.raises(Exception, match='failed after 1'):
+        asyncio.run(scheduler.render(5, lambda attempt: (attempt,), time.time() + 5, speculative=True))
+    with pytest.raises(Exception, match='speculation budget'):
+        asyncio.run(scheduler.render(5, lambda attempt: (attempt,), time.time() + 5, speculative=True))
+
+    assert len(spawned) == 1
+    assert scheduler.retries_remaining == 4
+    assert not scheduler.speculation_available()
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import random
+
+from video_animation_agent import SceneBlockParser, VideoAnimationAgent
+from video_config import ANIMATION_BATCH_MAX, ANIMATION_BATCH_OUTPUT_HEADROOM, MODEL_CONFIG, MODEL_PROVIDER
+from video_pipeline import MicroBatcher
+from video_scene_templates import render_scene
+
+
+def _spec(index):
+    return {'scene_type': 'title', 'title': f'Scene {index}', 'subtitle': 'Subtitle'}
+
+
+def _block(index, body):
+    return f'===SCENE {index}===\n{body}\n===END SCENE {index}===\n'
+
+
+RAW = (
+    'Here are the scenes.\n'
+    + _block(0, json.dumps(_spec(0)))
+    + _block(1, '```json\n' + json.dumps(_spec(1)) + '\n```')
+    + _block(2, '{"scene_type": "freeform", "reason": "custom chart"}')
+    + _block(3, json.dumps(_spec(3)))
+)
+
+EXPECTED = [(0, json.dumps(_spec(0))), (1, '```json\n' + json.dumps(_spec(1)) + '\n```'),
+            (2, '{"scene_type": "freeform", "reason": "custom chart"}'), (3, json.dumps(_spec(3)))]
+
+BUDGET = MODEL_CONFIG[MODEL_PROVIDER]['max_tokens'] * ANIMATION_BATCH_OUTPUT_HEADROOM
+
+
+def _parse(chunks):
+    parser = SceneBlockParser()
+    blocks = []
+    for chunk in chunks:
+        blocks += parser.feed(chunk)
+    return blocks, parser
+
+
+def test_whole_response_yields_every_block():
+    blocks, parser = _parse([RAW])
+
+    assert blocks == EXPECTED
+    assert parser.blocks == 4
+
+
+def test_arbitrary_chunking_matches_whole_parse():
+    rng = random.Random(11)
+
+    for _ in range(50):
+        cuts = sorted(rng.sample(range(1, len(RAW)), 15))
+        chunks = [RAW[a:b] for a, b in zip([0] + cuts, cuts + [len(RAW)])]
+        assert _parse(chunks)[0] == EXPECTED
+
+
+def test_single_character_chunks_split_markers():
+    assert _parse(list(RAW))[0] == EXPECTED
+
+
+def test_block_is_emitted_as_soon_as_its_end_marker_arrives():
+    parser = SceneBlockParser()
+    end = RAW.index('===END SCENE 0===') + len('===END SCENE 0===')
+
+    assert parser.feed(RAW[:end - 1]) == []
+    assert parser.feed(RAW[end - 1:end]) == EXPECTED[:1]
+
+
+def test_truncated_final_block_is_dropped():
+    cut = RAW.index('===END SCENE 3===') + 5
+
+    blocks, parser = _parse([RAW[:cut]])
+
+    assert blocks == EXPECTED[:3]
+    assert parser.blocks == 3
+
+
+def test_mismatched_end_marker_does_not_close_a_block():
+    blocks, _ = _parse(['===SCENE 4===\n{}\n===END SCENE 5===\n' + _block(6, 'body')])
+
+    assert blocks == [(6, 'body')]
+
+
+class FakeLLMClient:
+    def __init__(self, chunks, output_tokens=1200, responses=()):
+        self.chunks = chunks
+        self.output_tokens = output_tokens
+        self.responses = list(responses)
+        self.streamed = []
+        self.completed = []
+
+    async def stream(self, system, task, max_tokens=None, usage=None):
+        self.streamed.append((task, max_tokens))
+        for chunk in self.chunks:
+            await asyncio.sleep(0)
+            yield chunk
+        usage.update(input_tokens=500, output_tokens=self.output_tokens, seconds=0.5)
+
+    async def complete(self, system, task, max_tokens=None):
+        self.completed.append(task)
+        return {'text': self.responses.pop(0), 'input_tokens': 10, 'output_tokens': 100, 'seconds': 0.1,
+                'first_token_seconds': 0.05}
+
+
+def _agent(client, mode='spec'):
+    agent = VideoAnimationAgent.__new__(VideoAnimationAgent)
+    agent.animation_mode = mode
+    agent.scene_tokens = {'spec': 400, 'html': 2500}
+    agent.llm_client = client
+    agent.system_prompt = 'system'
+    return agent
+
+
+def _segments(indices):
+    return [{'index': i, 'text': f'Narration {i}', 'visual_hint': f'hint {i}'} for i in indices]
+
+
+def _chunked(text, size=7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_batch_reports_each_scene_as_its_block_streams_in():
+    client = FakeLLMClient(_chunked(RAW))
+    agent = _agent(client)
+    reported = []
+
+    scenes = asyncio.run(agent.generate_scenes_batch(_segments(range(4)), lambda i, html: reported.append((i, html)), 'midnight'))
+
+    assert [i for i, _ in reported] == [0, 1, 2, 3]
+    assert scenes == {0: render_scene(_spec(0), 'midnight'), 1: render_scene(_spec(1), 'midnight'),
+                      2: None, 3: render_scene(_spec(3), 'midnight')}
+    assert dict(reported) == scenes
+    assert len(client.streamed) == 1
+
+
+def test_batch_omits_missing_invalid_and_truncated_scenes():
+    raw = (
+        _block(0, json.dumps(_spec(0)))
+        + _block(0, json.dumps(_spec(5)))
+        + _block(1, '{"scene_type": "stats", "title": "x", "cards": []}')
+        + _block(9, json.dumps(_spec(9)))
+        + '===SCENE 3===\n' + json.dumps(_spec(3))
+    )
+    agent = _agent(FakeLLMClient(_chunked(raw)))
+
+    scenes = asyncio.run(agent.generate_scenes_batch(_segments(range(4)), design_system='midnight'))
+
+    assert scenes == {0: render_scene(_spec(0), 'midnight')}
+
+
+def test_missing_scenes_fall_back_to_the_per_scene_path():
+    fragment = '<div class="centered"><h1 class="main-title">Free-form</h1></div>\n<script>\n' + \
+        "gsap.timeline().from('.main-title', {opacity: 0});\n// " + 'x' * 150 + '\n</script>'
+    raw = _block(0, json.dumps(_spec(0))) + _block(1, '{"scene_type": "freeform", "reason": "custom"}')
+    client = FakeLLMClient(_chunked(raw), responses=[fragment, json.dumps(_spec(2))])
+    agent = _agent(client)
+
+    async def handler(segments, resolve):
+        # The orchestrator's batch handler: results keyed back to batch positions
+        positions = {segment['index']: position for position, segment in enumerate(segments)}
+        await agent.generate_scenes_batch(
+            segments,
+            lambda index, html: resolve(positions[index], {'html': html} if html is not None else {'freeform': True}),
+            'midnight'
+        )
+
+    async def produce(batcher, segment):
+        batched = await batcher.submit(segment) or {}
+        if batched.get('html') is not None:
+            return batched['html']
+        return await agent.generate_scene(segment['text'], segment['visual_hint'], segment['index'],
+                                          freeform=batched.get('freeform', False), design_system='midnight')
+
+    async def run():
+        batcher = MicroBatcher('animation', handler, lambda: 3, 1.0)
+        return await asyncio.gather(*(produce(batcher, segment) for segment in _segments(range(3))))
+
+    scenes = asyncio.run(run())
+
+    assert scenes == [render_scene(_spec(0), 'midnight'), fragment, render_scene(_spec(2), 'midnight')]
+    assert len(client.streamed) == 1
+    # Scene 1 asked for free-form HTML directly; scene 2 went through its own spec request
+    assert 'Narration 1' in client.completed[0] and 'Narration 2' in client.completed[1]
+
+
+def test_batch_size_fits_the_output_budget():
+    agent = _agent(None)
+
+    agent.scene_tokens['spec'] = BUDGET / 2
+    assert agent.batch_size() == 2
+
+    agent.scene_tokens['spec'] = BUDGET * 3
+    assert agent.batch_size() == 1
+
+    agent.scene_tokens['spec'] = 1
+    assert agent.batch_size() == ANIMATION_BATCH_MAX
+
+
+def test_batch_size_follows_observed_output_tokens():
+    agent = _agent(FakeLLMClient(_chunked(RAW), output_tokens=4 * BUDGET))
+    agent.scene_tokens['spec'] = BUDGET / 4
+    assert agent.batch_size() == 4
+
+    asyncio.run(agent.generate_scenes_batch(_segments(range(4))))
+
+    # 0.7 * BUDGET / 4 + 0.3 * BUDGET per scene: only two scenes still fit
+    assert agent.scene_tokens['spec'] == 0.7 * BUDGET / 4 + 0.3 * BUDGET
+    assert agent.batch_size() == 2
+    assert agent.scene_tokens['html'] == 2500
+
+
+def test_empty_batch_response_leaves_the_estimate_alone():
+    agent = _agent(FakeLLMClient(['no blocks at all'], output_tokens=5000))
+
+    assert asyncio.run(agent.generate_scenes_batch(_segments(range(2)))) == {}
+    assert agent.scene_tokens['spec'] == 400
@@ -0,0 +1,245 @@
+import asyncio
+import json
+
+import pytest
+
+from video_animation_agent import VideoAnimationAgent
+from video_design_system import is_scene_fragment
+from video_scene_templates import (
+    SceneSpecError,
+    _check,
+    is_freeform,
+    parse_scene_spec,
+    render_scene,
+    validate_scene_spec
+)
+
+
+VALID_SPECS = {
+    'title': {'scene_type': 'title', 'title': 'Photosynthesis', 'subtitle': 'Light into sugar', 'icon': 'sun'},
+    'diagram': {
+        'scene_type': 'diagram',
+        'title': 'The leaf',
+        'description': 'Light and CO2 in, oxygen out',
+        'elements': [
+            {'shape': 'rect', 'x': 100, 'y': 300, 'w': 220, 'h': 120, 'label': 'Leaf'},
+            {'shape': 'circle', 'x': 700, 'y': 200, 'w': 140, 'label': 'Sun', 'color': '#f59e0b'},
+            {'shape': 'ellipse', 'x': 900, 'y': 500, 'w': 260, 'h': 120, 'label': 'Oxygen'}
+        ],
+        'connections': [{'from': 1, 'to': 0, 'label': 'light'}, {'from': 0, 'to': 2}]
+    },
+    'process-flow': {
+        'scene_type': 'process-flow',
+        'title': 'How it works',
+        'steps': [
+            {'title': 'Absorb', 'description': 'Chlorophyll takes in light', 'icon': 'sun'},
+            {'title': 'Split', 'description': 'Water splits'},
+            {'title': 'Store', 'icon': 'package'}
+        ]
+    },
+    'comparison': {
+        'scene_type': 'comparison',
+        'title': 'Day vs night',
+        'left': {'title': 'Night', 'points': ['No light', 'Respiration'], 'icon': 'moon'},
+        'right': {'title': 'Day', 'points': ['Light', 'Photosynthesis'], 'color': '#22c55e'}
+    },
+    'stats': {
+        'scene_type': 'stats',
+        'title': 'By the numbers',
+        'cards': [{'value': '70%', 'label': 'of oxygen'}, {'value': '3', 'label': 'stages', 'color': '#3b82f6'}]
+    }
+}
+
+MARKERS = {
+    'title': ['class="main-title', 'Light into sugar', 'data-lucide="sun"'],
+    'diagram': ['<rect class="part"', '<circle class="part"', '<ellipse class="part"', 'class="link"', '>light</text>', 'class="description"'],
+    'process-flow': ['class="flow"', 'Absorb', 'data-lucide="circle"', 'flow-arrow'],
+    'comparison': ['left-side', 'right-side', '<li>• No light</li>', '<li>✓ Light</li>'],
+    'stats': ['70%', 'repeat(2, 1fr)', '#3b82f6']
+}
+
+
+@pytest.mark.parametrize('scene_type', sorted(VALID_SPECS))
+def test_valid_specs_render_as_fragments(scene_type):
+    spec = VALID_SPECS[scene_type]
+    assert validate_scene_spec(spec) == []
+
+    fragment = render_scene(spec, 'forest')
+
+    assert is_scene_fragment(fragment)
+    assert 'gsap.timeline()' in fragment and 'lucide.createIcons()' in fragment
+    for marker in MARKERS[scene_type]:
+        assert marker in fragment, marker
+
+
+@pytest.mark.parametrize('scene_type', sorted(VALID_SPECS))
+def test_without_design_system_renders_standalone_document(scene_type):
+    document = render_scene(VALID_SPECS[scene_type])
+
+    assert not is_scene_fragment(document)
+    assert '<style>:root {' in document
+    assert '<title>' + VALID_SPECS[scene_type]['title'] in document
+
+
+def test_is_deterministic():
+    assert render_scene(VALID_SPECS['diagram'], 'midnight') == render_scene(VALID_SPECS['diagram'], 'midnight')
+
+
+def test_design_system_colors_fill_in_missing_colors():
+    assert render_scene(VALID_SPECS['stats'], 'ember') != render_scene(VALID_SPECS['stats'], 'aurora')
+
+
+def test_spec_colors_override_the_design_system():
+    spec = dict(VALID_SPECS['title'], background=['#000000', '#111111'], accent='#ff0000')
+
+    fragment = render_scene(spec, 'midnight')
+
+    assert '--bg-start: #000000; --bg-end: #111111;' in fragment
+    assert '--accent: #ff0000;' in fragment
+
+
+def test_text_is_html_escaped_everywhere():
+    payload = '<script>alert("x")</script> & co'
+    specs = [
+        dict(VALID_SPECS['title'], title=payload[:80], subtitle=payload),
+        dict(VALID_SPECS['diagram'], description=payload, elements=[{'shape': 'rect', 'x': 0, 'y': 0, 'label': payload[:40]}], connections=[]),
+        dict(VALID_SPECS['process-flow'], steps=[{'title': '<b>"x"</b>', 'description': payload[:60]}, {'title': 'y'}]),
+        dict(VALID_SPECS['comparison'], left={'title': '<i>', 'points': [payload]}),
+        dict(VALID_SPECS['stats'], cards=[{'value': '<1%', 'label': payload[:40]}])
+    ]
+
+    for spec in specs:
+        assert validate_scene_spec(spec) == [], spec['scene_type']
+        fragment = render_scene(spec, 'midnight')
+        body = fragment[:fragment.index('<script>\n')]
+        assert '<script>alert' not in body and '<b>' not in body and '<i>' not in body and '<1%' not in body, spec['scene_type']
+        assert '&lt;' in body
+
+
+def test_parse_ignores_fences_and_surrounding_text():
+    text = 'Here is the spec:\n```json\n' + json.dumps(VALID_SPECS['stats']) + '\n```\nDone.'
+
+    assert parse_scene_spec(text) == VALID_SPECS['stats']
+
+
+@pytest.mark.parametrize('text, message', [
+    ('no json here', 'No JSON object'),
+    ('{"scene_type": "title", "title": }', 'Invalid scene spec JSON'),
+    ('{"scene_type": "title"}', 'spec.title is required')
+])
+def test_parse_rejects(text, message):
+    with pytest.raises(SceneSpecError, match=message):
+        parse_scene_spec(text)
+
+
+def test_parse_error_carries_every_violation():
+    with pytest.raises(SceneSpecError) as error:
+        parse_scene_spec('{"scene_type": "stats", "title": "", "cards": []}')
+
+    assert error.value.errors == ['spec.title must not be empty', 'spec.cards needs at least 1 items']
+
+
+def test_freeform_spec_is_valid():
+    spec = parse_scene_spec('{"scene_type": "freeform", "reason": "needs a custom physics animation"}')
+
+    assert is_freeform(spec)
+
+
+@pytest.mark.parametrize('spec, error', [
+    ([], 'spec is not an object'),
+    ({'scene_type': 'chart'}, "unknown scene_type 'chart'"),
+    ({'title': 'x'}, 'unknown scene_type None'),
+    (dict(VALID_SPECS['title'], title=None), 'spec.title must be a string'),
+    (dict(VALID_SPECS['title'], title='x' * 81), 'spec.title is longer than 80 characters'),
+    (dict(VALID_SPECS['title'], icon='rocket'), "spec.icon 'rocket' is not allowed"),
+    (dict(VALID_SPECS['title'], accent='red'), "spec.accent 'red' does not match"),
+    (dict(VALID_SPECS['title'], background=['#000000']), 'spec.background needs at least 2 items'),
+    (dict(VALID_SPECS['title'], background='#000000'), 'spec.background must be an array'),
+    (dict(VALID_SPECS['stats'], cards=[{'value': '1', 'label': 'x'}] * 7), 'spec.cards allows at most 6 items'),
+    (dict(VALID_SPECS['stats'], cards=['70%']), 'spec.cards[0] must be an object'),
+    (dict(VALID_SPECS['stats'], cards=[{'value': '1'}]), 'spec.cards[0].label is required'),
+    (dict(VALID_SPECS['diagram'], elements=[{'shape': 'rect', 'x': '10', 'y': 0}]), 'spec.elements[0].x must be a number'),
+    (dict(VALID_SPECS['diagram'], elements=[{'shape': 'rect', 'x': True, 'y': 0}]), 'spec.elements[0].x must be a number'),
+    (dict(VALID_SPECS['diagram'], elements=[{'shape': 'rect', 'x': -1, 'y': 0}]), 'spec.elements[0].x must be >= 0'),
+    (dict(VALID_SPECS['diagram'], elements=[{'shape': 'rect', 'x': 0, 'y': 701}]), 'spec.elements[0].y must be <= 700'),
+    (dict(VALID_SPECS['diagram'], elements=[{'shape': 'star', 'x': 0, 'y': 0}]), "spec.elements[0].shape 'star' is not allowed"),
+    (dict(VALID_SPECS['diagram'], connections=[{'from': 0.5, 'to': 1}]), 'spec.connections[0].from must be an integer'),
+    (dict(VALID_SPECS['diagram'], connections=[{'from': 0, 'to': 3}]), 'spec.connections[0] refers to a missing element'),
+    (dict(VALID_SPECS['process-flow'], steps=[{'title': 'only one'}]), 'spec.steps needs at least 2 items'),
+    (dict(VALID_SPECS['comparison'], left={'title': 'x', 'points': []}), 'spec.left.points needs at least 1 items')
+])
+def test_rejection_paths(spec, error):
+    errors = validate_scene_spec(spec)
+
+    assert any(e.startswith(error) for e in errors), errors
+
+
+def test_const_mismatch():
+    errors = []
+
+    _check('diagram', {'const': 'title'}, 'spec.scene_type', errors)
+
+    assert errors == ["spec.scene_type must be 'title'"]
+
+
+FRAGMENT = '<div class="centered"><h1 class="main-title">Free-form scene</h1></div>\n<script>\n' + \
+    "gsap.timeline().from('.main-title', {opacity: 0, duration: 1});\n" + '// ' + 'x' * 120 + '\n</script>'
+
+
+class FakeLLMClient:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.tasks = []
+
+    async def complete(self, system, task, max_tokens=None):
+        self.tasks.append(task)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return {'text': response, 'input_tokens': 10, 'output_tokens': 100, 'seconds': 0.1, 'first_token_seconds': 0.05}
+
+
+def _agent(responses, mode='spec'):
+    agent = VideoAnimationAgent.__new__(VideoAnimationAgent)
+    agent.animation_mode = mode
+    agent.scene_tokens = {'spec': 400, 'html': 2500}
+    agent.llm_client = FakeLLMClient(responses)
+    agent.system_prompt = 'system'
+    return agent
+
+
+def _generate(agent):
+    return asyncio.run(agent.generate_scene('Narration', 'Leaf diagram', 3, design_system='midnight'))
+
+
+def test_generate_scene_renders_a_valid_spec():
+    agent = _agent([json.dumps(VALID_SPECS['diagram'])])
+
+    html_code = _generate(agent)
+
+    assert html_code == render_scene(VALID_SPECS['diagram'], 'midnight')
+    assert len(agent.llm_client.tasks) == 1
+
+
+@pytest.mark.parametrize('spec_response', [
+    '{"scene_type": "freeform", "reason": "custom"}',
+    '{"scene_type": "diagram", "title": "x", "elements": []}',
+    'not json',
+    RuntimeError('provider down')
+])
+def test_generate_scene_falls_back_to_freeform(spec_response):
+    agent = _agent([spec_response, FRAGMENT])
+
+    html_code = _generate(agent)
+
+    assert html_code == FRAGMENT.strip()
+    assert len(agent.llm_client.tasks) == 2
+
+
+def test_generate_scene_freeform_flag_skips_the_spec():
+    agent = _agent([FRAGMENT])
+
+    html_code = asyncio.run(agent.generate_scene('Narration', 'hint', 3, freeform=True, design_system='midnight'))
+
+    assert html_code == FRAGMENT.strip()
+    assert len(agent.llm_client.tasks) == 1
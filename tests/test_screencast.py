@@ -0,0 +1,108 @@
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+from video_renderer import IdleTailDetector, capture_screencast, encoder_pipe_error
+
+
+# Screencast timestamps are on the browser's clock, far from time.time()
+CDP_ORIGIN = 5000.0
+
+
+class FakeStdin:
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.frames = []
+
+    def write(self, data):
+        if self.broken:
+            raise BrokenPipeError(32, 'Broken pipe')
+        self.frames.append(data)
+
+
+class FakeEncoder:
+    def __init__(self, broken=False):
+        self.stdin = FakeStdin(broken)
+
+
+class FakeCDP:
+    """Delivers `timestamps` as screencast frames, one per page wait"""
+
+    def __init__(self, timestamps):
+        self.pending = list(timestamps)
+        self.handlers = {}
+        self.acks = 0
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def send(self, method, params=None):
+        if method == 'Page.screencastFrameAck':
+            self.acks += 1
+
+    def dispatch(self):
+        if self.pending:
+            timestamp = self.pending.pop(0)
+            data = 'ZnJhbWU='  # base64 "frame"
+            self.handlers['Page.screencastFrame']({'data': data, 'metadata': {'timestamp': timestamp}, 'sessionId': 1})
+
+
+class FakePage:
+    def __init__(self, cdp):
+        self.cdp = cdp
+
+    def wait_for_timeout(self, ms):
+        self.cdp.dispatch()
+        time.sleep(ms / 1000.0)
+
+    def evaluate(self, script):
+        return False
+
+
+def test_idle_stop_uses_the_screencast_clock():
+    cdp = FakeCDP([CDP_ORIGIN, CDP_ORIGIN + 0.1, CDP_ORIGIN + 0.2])
+    page = FakePage(cdp)
+    encoder = FakeEncoder()
+
+    frames = capture_screencast(page, cdp, encoder, 3.0, 10, 80, IdleTailDetector(page, 0.2, 0.4))
+
+    # Last frame at 0.2s on the screencast clock, held for the ~0.4s it was static
+    assert 5 <= frames <= 9
+    assert len(encoder.stdin.frames) == frames
+    assert cdp.acks == 3
+
+
+def test_without_idle_detector_fills_the_segment():
+    cdp = FakeCDP([CDP_ORIGIN, CDP_ORIGIN + 0.1])
+    page = FakePage(cdp)
+
+    assert capture_screencast(page, cdp, FakeEncoder(), 0.5, 10, 80) == 5
+
+
+def test_broken_encoder_pipe_stops_capture():
+    cdp = FakeCDP([CDP_ORIGIN, CDP_ORIGIN + 0.5, CDP_ORIGIN + 1.0])
+    page = FakePage(cdp)
+    started = time.time()
+
+    with pytest.raises(BrokenPipeError):
+        capture_screencast(page, cdp, FakeEncoder(broken=True), 3.0, 10, 80)
+
+    assert time.time() - started < 1.0
+
+
+def test_encoder_pipe_error_reports_exit_code_and_stderr():
+    stderr_file = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        [sys.executable, '-c', "import sys; sys.stderr.write('Invalid data found when processing input'); sys.exit(3)"],
+        stdin=subprocess.PIPE,
+        stderr=stderr_file
+    )
+
+    error = encoder_pipe_error(process, stderr_file)
+
+    assert str(error) == 'FFmpeg exited with code 3 during capture: Invalid data found when processing input'
+    assert stderr_file.closed
+    process.stdin.close()
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+from video_json_stream import scripted_token_stream
+from video_script_agent import VideoScriptAgent
+
+
+TEXT = ' '.join(['word'] * 30)
+
+
+class FakeLLMClient:
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+        self.prompts = []
+
+    async def complete(self, system, task):
+        self.prompts.append(task)
+        if self.error:
+            raise self.error
+        return {'text': self.response, 'input_tokens': 0, 'output_tokens': 0, 'seconds': 0.0}
+
+
+def _agent(client):
+    agent = VideoScriptAgent.__new__(VideoScriptAgent)
+    agent.llm_client = client
+    agent.system_prompt = 'system'
+    return agent
+
+
+def _segments_json(count, label='seg'):
+    return json.dumps([{'text': f'{label} {i} {TEXT}', 'visual_hint': 'hint'} for i in range(count)])
+
+
+def _collect(agent, chunks, num_segments, written=None):
+    async def run():
+        stream = scripted_token_stream(chunks)
+        return [s async for s in agent.stream_script_segments('Topic', 'science', num_segments, stream, written)]
+    return asyncio.run(run())
+
+
+def test_complete_stream_needs_no_top_up():
+    client = FakeLLMClient()
+    raw = _segments_json(5)
+
+    segments = _collect(_agent(client), [raw[:40], raw[40:]], 5)
+
+    assert [s['index'] for s in segments] == [0, 1, 2, 3, 4]
+    assert client.prompts == []
+
+
+def test_truncated_stream_is_topped_up(capsys):
+    client = FakeLLMClient(response=_segments_json(3, 'extra'))
+    raw = _segments_json(5)
+
+    segments = _collect(_agent(client), [raw[:raw.index('seg 2')]], 5)
+
+    assert [s['index'] for s in segments] == [0, 1, 2, 3, 4]
+    assert segments[2]['text'].startswith('extra 0')
+    assert 'CONTINUATION REQUEST' in client.prompts[0]
+    assert 'topped up' in capsys.readouterr().out
+
+
+def test_failed_top_up_pads_with_fallback(capsys):
+    client = FakeLLMClient(error=RuntimeError('provider down'))
+    raw = _segments_json(5)
+
+    segments = _collect(_agent(client), [raw[:raw.index('seg 1')]], 5)
+
+    assert [s['index'] for s in segments] == [0, 1, 2, 3, 4]
+    assert 'Topic' in segments[-1]['text']
+    assert 'padding with 4 fallback segments' in capsys.readouterr().out
+
+
+def test_resumed_stream_continues_after_written_segments():
+    client = FakeLLMClient()
+    written = json.loads(_segments_json(2))
+    for i, segment in enumerate(written):
+        segment['index'] = i
+
+    segments = _collect(_agent(client), [_segments_json(3, 'more')], 5, written)
+
+    assert [s['index'] for s in segments] == [2, 3, 4]
+    assert client.prompts == []
+
+
+def test_written_complete_script_streams_nothing():
+    written = [{'index': i, 'text': TEXT} for i in range(5)]
+
+    assert _collect(_agent(FakeLLMClient()), [_segments_json(5)], 5, written) == []
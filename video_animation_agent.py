@@ -1,17 +1,68 @@
 # video_animation_agent.py
 import os
 import re
-from typing import Optional
-from crewai import Agent, Task, Crew, LLM
-from video_config import MODEL_PROVIDER, MODEL_CONFIG
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from video_config import (
+    MODEL_PROVIDER,
+    MODEL_CONFIG,
+    LLM_BACKEND,
+    ANIMATION_GENERATION_CONCURRENCY,
+    ANIMATION_MODE,
+    SCENE_SPEC_MAX_TOKENS,
+    ANIMATION_BATCH_MAX,
+    ANIMATION_BATCH_OUTPUT_HEADROOM,
+    ANIMATION_SCENE_TOKEN_ESTIMATE
+)
+from video_design_system import get_design_system, is_scene_fragment, scene_document
+from video_llm_client import get_llm_client, system_prompt
+from video_scene_templates import SceneSpecError, is_freeform, parse_scene_spec, render_scene
 from video_animation_prompts import (
     ANIMATION_CODER_ROLE,
     ANIMATION_CODER_GOAL,
     ANIMATION_CODER_BACKSTORY,
-    ANIMATION_GENERATION_TASK_TEMPLATE
+    ANIMATION_GENERATION_TASK_TEMPLATE,
+    ANIMATION_FRAGMENT_TASK_TEMPLATE,
+    SCENE_SPEC_TASK_TEMPLATE,
+    ANIMATION_BATCH_SEGMENT_TEMPLATE,
+    ANIMATION_BATCH_TASK_TEMPLATE,
+    ANIMATION_FRAGMENT_BATCH_TASK_TEMPLATE,
+    SCENE_SPEC_BATCH_TASK_TEMPLATE
 )
 
 
+class SceneBlockParser:
+    """
+    Splits a batch response into its ===SCENE i=== ... ===END SCENE i=== blocks,
+    incrementally, so each scene can be used as soon as its end marker streams in.
+    """
+
+    BLOCK_PATTERN = re.compile(r'===\s*SCENE\s+(\d+)\s*===\s*(.*?)\s*===\s*END SCENE\s+\1\s*===', re.DOTALL)
+
+    def __init__(self):
+        self.blocks = 0
+        self._buffer = ''
+        self._position = 0
+
+    def feed(self, text: str) -> List[Tuple[int, str]]:
+        """Consume the next chunk; returns (segment index, block body) for every block it completed"""
+        scan_from = max(self._position, len(self._buffer) - 32)
+        self._buffer += text
+
+        # Only rescan once an end marker may have arrived
+        if 'END SCENE' not in self._buffer[scan_from:]:
+            return []
+
+        blocks = []
+        for match in self.BLOCK_PATTERN.finditer(self._buffer, self._position):
+            blocks.append((int(match.group(1)), match.group(2)))
+            self._position = match.end()
+
+        self.blocks += len(blocks)
+        return blocks
+
+
 class VideoAnimationAgent:
     """
     AI agent that generates complete scene-based HTML animations for educational explainer videos.
@@ -25,11 +76,29 @@ class VideoAnimationAgent:
         print(f"📊 Model: {MODEL_CONFIG[MODEL_PROVIDER]['model']}")
         print(f"🎯 Output: Complete auto-playing scene HTML files")
         print(f"🎯 Style: Topic-specific SVG diagrams + GSAP animations")
+        print(f"📊 Backend: {LLM_BACKEND} | Mode: {ANIMATION_MODE}")
         
-        self.llm = self._initialize_llm()
+        self.animation_mode = ANIMATION_MODE
+        self.llm_backend = LLM_BACKEND
+        self.scene_tokens = dict(ANIMATION_SCENE_TOKEN_ESTIMATE)
+        self.llm_client = None
+        
+        if self.llm_backend == "crewai":
+            self.llm = self._initialize_llm()
+            
+            # crew.kickoff() is synchronous; run it on dedicated threads so concurrent
+            # segments don't block the event loop and asyncio timeouts can fire
+            self._executor = ThreadPoolExecutor(
+                max_workers=ANIMATION_GENERATION_CONCURRENCY,
+                thread_name_prefix="animation-llm"
+            )
+        else:
+            self.llm_client = get_llm_client(MODEL_PROVIDER)
+            self.system_prompt = system_prompt(ANIMATION_CODER_ROLE, ANIMATION_CODER_GOAL, ANIMATION_CODER_BACKSTORY)
         
     def _initialize_llm(self):
-        """Initialize LLM based on MODEL_PROVIDER"""
+        """Initialize the CrewAI LLM based on MODEL_PROVIDER (crewai backend only)"""
+        from crewai import LLM
         
         if MODEL_PROVIDER == "anthropic":
             return LLM(
@@ -48,11 +117,206 @@ class VideoAnimationAgent:
         else:
             raise ValueError(f"Unknown MODEL_PROVIDER: {MODEL_PROVIDER}")
     
+    async def generate_scene(
+        self,
+        segment_text: str,
+        visual_hint: str,
+        segment_index: int,
+        freeform: bool = False,
+        design_system: Optional[str] = None
+    ) -> str:
+        """
+        Scene HTML for a segment: rendered from a model-written scene spec when the
+        scene fits one of the templates, otherwise generated as free-form HTML.
+        
+        Args:
+            segment_text: The narration text for this segment
+            visual_hint: Detailed description of what to visualize
+            segment_index: Index of the segment (0-based)
+            freeform: Skip the spec step (a spec already asked for free-form HTML)
+            design_system: The video's design system; the scene is then a body fragment
+            
+        Returns:
+            Complete HTML document, or body fragment under a design system
+        """
+        if self.animation_mode == "spec" and not freeform:
+            spec = await self._generate_scene_spec(segment_text, visual_hint, segment_index)
+            
+            if spec is not None:
+                html_code = render_scene(spec, design_system)
+                print(f"✅ Scene {segment_index} rendered from {spec['scene_type']} spec: {len(html_code)} chars")
+                return html_code
+        
+        return await self.generate_animation_code(segment_text, visual_hint, segment_index, design_system)
+    
+    async def _generate_scene_spec(self, segment_text: str, visual_hint: str, segment_index: int) -> Optional[dict]:
+        """Validated scene spec, or None when the segment should take the free-form path"""
+        print(f"🧩 Generating scene spec {segment_index}...")
+        
+        task_description = SCENE_SPEC_TASK_TEMPLATE.format(
+            segment_text=segment_text,
+            visual_hint=visual_hint,
+            segment_index=segment_index
+        )
+        
+        if self.llm_client is not None:
+            try:
+                response = await self.llm_client.complete(self.system_prompt, task_description, max_tokens=SCENE_SPEC_MAX_TOKENS)
+            except Exception as e:
+                print(f"  ⚠️  Scene spec request failed: {e} - using free-form HTML")
+                return None
+            
+            print(f"  ✓ Scene spec: {response['input_tokens']} in / {response['output_tokens']} out tokens ({response['seconds']:.1f}s)")
+            self._observe_scene_tokens('spec', response['output_tokens'])
+            result = response['text']
+        else:
+            try:
+                result = await self._generate_with_crew(task_description, segment_index, "One JSON scene spec object")
+            except Exception as e:
+                print(f"  ⚠️  {e} - using free-form HTML")
+                return None
+        
+        try:
+            spec = parse_scene_spec(result)
+        except SceneSpecError as e:
+            print(f"  ⚠️  {e} - using free-form HTML")
+            return None
+        
+        if is_freeform(spec):
+            print(f"  ↪️  Scene {segment_index} needs free-form HTML")
+            return None
+        
+        return spec
+    
+    def batch_size(self) -> int:
+        """Scenes per batch request: as many as fit the provider's output token limit, up to ANIMATION_BATCH_MAX"""
+        budget = MODEL_CONFIG[MODEL_PROVIDER]['max_tokens'] * ANIMATION_BATCH_OUTPUT_HEADROOM
+        return max(1, min(ANIMATION_BATCH_MAX, int(budget // self.scene_tokens[self.animation_mode])))
+    
+    async def generate_scenes_batch(
+        self,
+        segments: List[Dict[str, Any]],
+        on_scene: Optional[Callable[[int, Optional[str]], None]] = None,
+        design_system: Optional[str] = None
+    ) -> Dict[int, Optional[str]]:
+        """
+        Generate scenes for several segments in one request.
+        
+        The response holds one delimited block per segment; each block is parsed
+        and validated on its own as soon as it has streamed in, and reported through
+        on_scene(segment_index, html). A spec block asking for free-form HTML is
+        reported as None. Under a design system every scene is a body fragment.
+        
+        Returns:
+            {segment index: scene HTML, or None for free-form} for every block that
+            parsed; segments missing from it should be retried with generate_scene()
+        """
+        spec_mode = self.animation_mode == "spec"
+        if spec_mode:
+            template = SCENE_SPEC_BATCH_TASK_TEMPLATE
+        elif design_system is not None:
+            template = ANIMATION_FRAGMENT_BATCH_TASK_TEMPLATE
+        else:
+            template = ANIMATION_BATCH_TASK_TEMPLATE
+        
+        task_description = template.format(
+            count=len(segments),
+            design_system=get_design_system(design_system).reference(),
+            segments='\n'.join(
+                ANIMATION_BATCH_SEGMENT_TEMPLATE.format(
+                    segment_index=segment['index'],
+                    segment_text=segment['text'],
+                    visual_hint=segment.get('visual_hint', '')
+                )
+                for segment in segments
+            )
+        )
+        
+        wanted = {segment['index'] for segment in segments}
+        scenes: Dict[int, Optional[str]] = {}
+        parser = SceneBlockParser()
+        
+        def accept(blocks: List[Tuple[int, str]]):
+            for index, block in blocks:
+                if index not in wanted or index in scenes:
+                    continue
+                
+                ok, html_code = self._scene_from_block(block, index, spec_mode, design_system)
+                if ok:
+                    scenes[index] = html_code
+                    if on_scene is not None:
+                        on_scene(index, html_code)
+        
+        print(f"🎨 Generating {len(segments)} scenes in one request ({self.animation_mode}): {sorted(wanted)}")
+        
+        if self.llm_client is not None:
+            usage: Dict[str, Any] = {}
+            max_tokens = SCENE_SPEC_MAX_TOKENS * len(segments) if spec_mode else None
+            
+            async for text in self.llm_client.stream(self.system_prompt, task_description, max_tokens=max_tokens, usage=usage):
+                accept(parser.feed(text))
+            
+            print(f"  ✓ Batch response: {usage['input_tokens']} in / {usage['output_tokens']} out tokens ({usage['seconds']:.1f}s)")
+            if parser.blocks:
+                self._observe_scene_tokens(self.animation_mode, usage['output_tokens'] / parser.blocks)
+        else:
+            result = await self._generate_with_crew(
+                task_description,
+                segments[0]['index'],
+                f"{len(segments)} delimited scene blocks"
+            )
+            accept(parser.feed(result))
+        
+        missing = sorted(wanted - set(scenes))
+        print(f"✅ Batch: {len(scenes)}/{len(segments)} scenes" + (f", {missing} to retry individually" if missing else ""))
+        
+        return scenes
+    
+    def _scene_from_block(
+        self,
+        block: str,
+        segment_index: int,
+        spec_mode: bool,
+        design_system: Optional[str] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """(parsed, html) for one batch block; html is None when the spec asks for free-form HTML"""
+        if spec_mode:
+            try:
+                spec = parse_scene_spec(block)
+            except SceneSpecError as e:
+                print(f"  ⚠️  Scene {segment_index}: {e}")
+                return False, None
+            
+            if is_freeform(spec):
+                print(f"  ↪️  Scene {segment_index} needs free-form HTML")
+                return True, None
+            
+            html_code = render_scene(spec, design_system)
+            print(f"  ✓ Scene {segment_index} rendered from {spec['scene_type']} spec: {len(html_code)} chars")
+            return True, html_code
+        
+        html_code = self._extract_fragment(block) if design_system is not None else self._extract_html(block)
+        if not html_code:
+            print(f"  ⚠️  Scene {segment_index}: no valid HTML in its block")
+            return False, None
+        
+        validation_result = self._validate_animation_code(self._validation_document(html_code, design_system), segment_index)
+        if not validation_result['valid']:
+            print(f"  ⚠️  Scene {segment_index} validation warnings: {', '.join(validation_result['issues'])}")
+        
+        return True, html_code
+    
+    def _observe_scene_tokens(self, kind: str, output_tokens: float):
+        """Fold observed output tokens per scene into the estimate batch_size() plans with"""
+        if output_tokens > 0:
+            self.scene_tokens[kind] = 0.7 * self.scene_tokens[kind] + 0.3 * output_tokens
+    
     async def generate_animation_code(
         self,
         segment_text: str,
         visual_hint: str,
-        segment_index: int
+        segment_index: int,
+        design_system: Optional[str] = None
     ) -> str:
         """
         Generate complete scene-based HTML animation code for a specific segment.
@@ -61,9 +325,10 @@ class VideoAnimationAgent:
             segment_text: The narration text for this segment
             visual_hint: Detailed description of what to visualize
             segment_index: Index of the segment (0-based)
+            design_system: The video's design system; only the body fragment is generated
             
         Returns:
-            Complete HTML document with auto-playing scene animation
+            Complete HTML document, or body fragment under a design system
             
         Raises:
             Exception: If generation or validation fails
@@ -72,6 +337,75 @@ class VideoAnimationAgent:
         print(f"   Narration: {segment_text[:70]}...")
         print(f"   Visual: {visual_hint[:70]}...")
         
+        if design_system is not None:
+            task_description = ANIMATION_FRAGMENT_TASK_TEMPLATE.format(
+                segment_text=segment_text,
+                visual_hint=visual_hint,
+                segment_index=segment_index,
+                design_system=get_design_system(design_system).reference()
+            )
+        else:
+            task_description = ANIMATION_GENERATION_TASK_TEMPLATE.format(
+                segment_text=segment_text,
+                visual_hint=visual_hint,
+                segment_index=segment_index
+            )
+        
+        if self.llm_client is not None:
+            result = await self._generate_direct(task_description, segment_index)
+        else:
+            result = await self._generate_with_crew(task_description, segment_index)
+        
+        try:
+            # Extract HTML code from response
+            if design_system is not None:
+                html_code = self._extract_fragment(str(result))
+            else:
+                html_code = self._extract_html(str(result))
+            
+            if not html_code:
+                raise Exception(f"Segment {segment_index}: No valid HTML found in AI response")
+            
+            # Validate the code (fragments as the page they will be rendered in)
+            validation_result = self._validate_animation_code(self._validation_document(html_code, design_system), segment_index)
+            
+            if not validation_result['valid']:
+                issues_str = ', '.join(validation_result['issues'])
+                print(f"  ⚠️  Validation warnings: {issues_str}")
+                # Don't fail, just warn - AI might have created good content anyway
+            
+            print(f"✅ Scene generated: {len(html_code)} chars")
+            print(f"   Quality: {validation_result['quality_score']}/100")
+            print(f"   Features: {', '.join(validation_result['features'])}")
+            
+            return html_code
+            
+        except Exception as e:
+            print(f"❌ HTML extraction/validation failed: {e}")
+            raise
+    
+    async def _generate_direct(self, task_description: str, segment_index: int) -> str:
+        """One streamed request straight to the provider, no agent framework in between"""
+        try:
+            response = await self.llm_client.complete(self.system_prompt, task_description)
+            print(f"  ✓ LLM response: {response['input_tokens']} in / {response['output_tokens']} out tokens "
+                  f"({response['seconds']:.1f}s, first token {response['first_token_seconds'] or 0:.1f}s)")
+            self._observe_scene_tokens('html', response['output_tokens'])
+            return response['text']
+            
+        except Exception as e:
+            print(f"  ✗ LLM request failed: {e}")
+            raise Exception(f"Segment {segment_index}: LLM request failed - {e}")
+    
+    async def _generate_with_crew(
+        self,
+        task_description: str,
+        segment_index: int,
+        expected_output: str = "Complete auto-playing scene HTML with topic-specific animations"
+    ) -> str:
+        """Agent/Task/Crew path (crewai backend)"""
+        from crewai import Agent, Task, Crew
+        
         try:
             # Create the animation coder agent
             animation_coder = Agent(
@@ -91,16 +425,10 @@ class VideoAnimationAgent:
         
         try:
             # Create the task
-            task_description = ANIMATION_GENERATION_TASK_TEMPLATE.format(
-                segment_text=segment_text,
-                visual_hint=visual_hint,
-                segment_index=segment_index
-            )
-            
             animation_task = Task(
                 description=task_description,
                 agent=animation_coder,
-                expected_output="Complete auto-playing scene HTML with topic-specific animations"
+                expected_output=expected_output
             )
             print(f"  ✓ Task created successfully")
             
@@ -117,37 +445,14 @@ class VideoAnimationAgent:
             )
             print(f"  ✓ Crew created successfully")
             
-            result = crew.kickoff()
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, crew.kickoff)
             print(f"  ✓ Crew execution complete")
+            return str(result)
             
         except Exception as e:
             print(f"  ✗ Crew execution failed: {e}")
             raise Exception(f"Segment {segment_index}: Crew execution failed - {e}")
-        
-        try:
-            # Extract HTML code from response
-            html_code = self._extract_html(str(result))
-            
-            if not html_code:
-                raise Exception(f"Segment {segment_index}: No valid HTML found in AI response")
-            
-            # Validate the code
-            validation_result = self._validate_animation_code(html_code, segment_index)
-            
-            if not validation_result['valid']:
-                issues_str = ', '.join(validation_result['issues'])
-                print(f"  ⚠️  Validation warnings: {issues_str}")
-                # Don't fail, just warn - AI might have created good content anyway
-            
-            print(f"✅ Scene generated: {len(html_code)} chars")
-            print(f"   Quality: {validation_result['quality_score']}/100")
-            print(f"   Features: {', '.join(validation_result['features'])}")
-            
-            return html_code
-            
-        except Exception as e:
-            print(f"❌ HTML extraction/validation failed: {e}")
-            raise
     
     def _extract_html(self, response: str) -> Optional[str]:
         """Extract complete HTML document from AI response"""
@@ -197,6 +502,38 @@ class VideoAnimationAgent:
         print(f"  ✗ Could not extract valid HTML from response")
         return None
     
+    def _extract_fragment(self, response: str) -> Optional[str]:
+        """Extract a scene body fragment; a complete document is accepted as is"""
+        response = re.sub(r'```html\s*', '', response, flags=re.IGNORECASE)
+        response = re.sub(r'```\s*', '', response)
+        response = response.strip()
+        
+        if 'Final Answer:' in response:
+            response = response.split('Final Answer:')[-1].strip()
+        
+        if not is_scene_fragment(response):
+            return self._extract_html(response)
+        
+        # Drop a stray <body> wrapper and anything before the first tag
+        start = response.find('<')
+        end = response.rfind('>') + 1
+        if start == -1 or end == 0:
+            print(f"  ✗ Could not extract a scene fragment from response")
+            return None
+        
+        fragment = re.sub(r'</?body[^>]*>', '', response[start:end], flags=re.IGNORECASE).strip()
+        if '<script' not in fragment or len(fragment) < 200:
+            print(f"  ✗ Scene fragment has no timeline script or is too short ({len(fragment)} chars)")
+            return None
+        
+        print(f"  ✓ Extracted scene fragment ({len(fragment)} chars)")
+        return fragment
+    
+    def _validation_document(self, html_code: str, design_system: Optional[str]) -> str:
+        if design_system is None or not is_scene_fragment(html_code):
+            return html_code
+        return scene_document(html_code, design_system, inline=True)
+    
     def _validate_animation_code(self, html_code: str, segment_index: int) -> dict:
         """
         Validate scene-based animation code quality.
@@ -6,15 +6,7 @@ ANIMATION_CODER_GOAL = """Create complete auto-playing HTML scenes with topic-sp
 
 ANIMATION_CODER_BACKSTORY = """You create educational animation scenes like Kurzgesagt, TED-Ed, and 3Blue1Brown. Each HTML file is a complete auto-playing scene with topic-specific diagrams, smooth GSAP animations, and full-screen educational content. You NEVER create generic backgrounds - every visual element must be directly related to the topic being explained."""
 
-ANIMATION_GENERATION_TASK_TEMPLATE = """Create a complete AUTO-PLAYING scene HTML file for this educational explainer video segment.
-
-SEGMENT INFO:
-- Scene Index: {segment_index}
-- Narration Text: "{segment_text}"
-- Visual Description: "{visual_hint}"
-- Duration: 10-12 seconds (auto-play)
-
-YOUR MISSION:
+ANIMATION_SCENE_RULES = """YOUR MISSION:
 Create a COMPLETE scene (like the combustion engine example) that:
 1. AUTO-PLAYS when loaded (GSAP timeline)
 2. Shows TOPIC-SPECIFIC animations (NOT generic backgrounds)
@@ -373,7 +365,17 @@ IMPORTANT GUIDELINES:
    <script src="https://unpkg.com/lucide@latest/dist/umd/lucide.js"></script>
 ```
 
-NOW CREATE THE SCENE:
+"""
+
+ANIMATION_GENERATION_TASK_TEMPLATE = """Create a complete AUTO-PLAYING scene HTML file for this educational explainer video segment.
+
+SEGMENT INFO:
+- Scene Index: {segment_index}
+- Narration Text: "{segment_text}"
+- Visual Description: "{visual_hint}"
+- Duration: 10-12 seconds (auto-play)
+
+""" + ANIMATION_SCENE_RULES + """NOW CREATE THE SCENE:
 
 Based on the segment text and visual hint above, create a COMPLETE auto-playing scene HTML.
 
@@ -387,4 +389,167 @@ CHECKLIST BEFORE OUTPUTTING:
 ✅ Does it look like a professional educational video?
 
 Return ONLY the complete HTML code (no markdown, no explanations, just the HTML).
-"""
\ No newline at end of file
+"""
+SCENE_SPEC_RULES = """SCENE TYPES (optional fields marked ?):
+
+1️⃣ title - intros, section openers, closing messages
+{{"scene_type": "title", "title": "HOW TRANSISTORS WORK", "subtitle"?: "The Tiny Switches Powering Modern Electronics", "icon"?: "cpu"}}
+
+2️⃣ diagram - structures and components, drawn as SVG shapes in a 1200x700 canvas
+{{"scene_type": "diagram", "title": "Three-Terminal Structure",
+  "elements": [
+    {{"shape": "rect", "x": 150, "y": 300, "w": 200, "h": 150, "color": "#8b5cf6", "label": "Source"}},
+    {{"shape": "rect", "x": 400, "y": 180, "w": 400, "h": 40, "color": "#f59e0b", "label": "Gate"}},
+    {{"shape": "rect", "x": 850, "y": 300, "w": 200, "h": 150, "color": "#8b5cf6", "label": "Drain"}}
+  ],
+  "connections"?: [{{"from": 0, "to": 2, "label"?: "electrons"}}],
+  "description"?: "Gate voltage controls current between source and drain"}}
+- shape: rect (x, y = top-left corner) | circle (x, y = centre, w = diameter) | ellipse (x, y = centre)
+- up to 12 elements; connections refer to elements by position in the list (0-based)
+
+3️⃣ process-flow - steps, sequences, workflows (2-5 steps)
+{{"scene_type": "process-flow", "title": "Transistor Switching", "color"?: "#22c55e",
+  "steps": [{{"title": "OFF State", "description"?: "No gate voltage", "icon"?: "circle"}}, {{"title": "Voltage Applied", "icon": "zap"}}, {{"title": "ON State", "icon": "check-circle"}}]}}
+
+4️⃣ comparison - before/after, pros/cons, alternatives (1-5 points per side)
+{{"scene_type": "comparison", "title": "Voltage States",
+  "left": {{"title": "OFF (Vgs < Vth)", "icon"?: "x-circle", "color"?: "#ef4444", "points": ["No channel", "High resistance"]}},
+  "right": {{"title": "ON (Vgs > Vth)", "icon"?: "check-circle", "color"?: "#22c55e", "points": ["Channel forms", "Current flows"]}}}}
+
+5️⃣ stats - numbers, metrics, key takeaways (1-6 cards, values up to 12 characters)
+{{"scene_type": "stats", "title": "Performance Metrics", "cards": [{{"value": "10nm", "label": "Feature Size"}}, {{"value": "5GHz", "label": "Switching Speed", "color"?: "#f59e0b"}}]}}
+
+Colors left out come from the video's design system, so scenes stay consistent; only set "color", "background"?: ["#0f172a", "#1e293b"] (two-stop gradient) or "accent"?: "#00d4ff" when the topic needs a specific color.
+
+RULES:
+- Colors are 6-digit hex codes (#rrggbb)
+- Icons ONLY from: check-circle, x-circle, alert-circle, info, zap, star, heart, trending-up, trending-down, cpu, database, server, wifi, arrow-right, arrow-left, arrow-up, arrow-down, chevron-right, play-circle, pause-circle, circle, square, triangle, users, user, mail, phone, calendar, clock, settings, tool, wrench, package, folder, file, lightbulb, flame, droplet, wind, cloud, sun, moon, car, plane, ship, git-branch, rotate-cw, repeat
+- Titles up to 80 characters, step titles up to 30, labels up to 40
+- If the scene truly cannot be expressed with these types (e.g. it needs a custom animated illustration), return exactly {{"scene_type": "freeform"}}
+
+"""
+
+SCENE_SPEC_TASK_TEMPLATE = """Design the scene for this educational explainer video segment as a compact JSON scene spec. The HTML, styling and GSAP timeline are generated from your spec by fixed templates.
+
+SEGMENT INFO:
+- Scene Index: {segment_index}
+- Narration Text: "{segment_text}"
+- Visual Description: "{visual_hint}"
+
+Pick the ONE scene type that fits the visual description and fill in its fields. All text must be TOPIC-SPECIFIC (real names, labels, numbers from the narration), short, and in the narration's language.
+
+""" + SCENE_SPEC_RULES + """Return ONLY the JSON object (no markdown, no explanations).
+"""
+
+# Batch mode: one request covers several segments; the shared rules are sent once
+ANIMATION_BATCH_SEGMENT_TEMPLATE = """SCENE {segment_index}:
+- Narration Text: "{segment_text}"
+- Visual Description: "{visual_hint}"
+"""
+
+ANIMATION_BATCH_OUTPUT_FORMAT = """OUTPUT FORMAT (MANDATORY):
+Write one block per scene, in the order listed, each wrapped in its markers:
+
+===SCENE <index>===
+...scene...
+===END SCENE <index>===
+
+- Use each scene's own index in both markers (e.g. ===SCENE 4=== ... ===END SCENE 4===)
+- Every scene is independent and complete; never refer to another scene
+- No text outside the blocks
+"""
+
+ANIMATION_BATCH_TASK_TEMPLATE = """Create complete AUTO-PLAYING scene HTML files for {count} segments of an educational explainer video. Each scene is its own complete HTML document (10-12 seconds, auto-play).
+
+SEGMENTS:
+{segments}
+""" + ANIMATION_SCENE_RULES + """NOW CREATE THE {count} SCENES:
+
+For each segment above, create a COMPLETE auto-playing scene HTML based on its narration and visual description, following every rule above.
+
+""" + ANIMATION_BATCH_OUTPUT_FORMAT
+
+SCENE_SPEC_BATCH_TASK_TEMPLATE = """Design the scenes for {count} segments of an educational explainer video as compact JSON scene specs, one per segment. The HTML, styling and GSAP timeline are generated from your specs by fixed templates.
+
+SEGMENTS:
+{segments}
+For each segment pick the ONE scene type that fits its visual description and fill in its fields. All text must be TOPIC-SPECIFIC (real names, labels, numbers from the narration), short, and in the narration's language.
+
+""" + SCENE_SPEC_RULES + """Each block holds exactly one JSON object (no markdown).
+
+""" + ANIMATION_BATCH_OUTPUT_FORMAT
+
+# Design system mode: scenes are body fragments rendered inside the video's shared prelude
+ANIMATION_FRAGMENT_RULES = """THE PAGE AROUND YOUR SCENE (already provided - do NOT repeat it):
+{design_system}
+
+CRITICAL RULES:
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+✅ BODY FRAGMENT ONLY - No <!DOCTYPE>, <html>, <head>, <body>, font <link> or library <script src> tags
+✅ USE THE DESIGN SYSTEM - Its classes and var(--...) colors instead of restating fonts, sizes, backgrounds
+✅ TOPIC-SPECIFIC - SVG diagrams of the actual subject (real parts, real labels), never generic shapes
+✅ AUTO-PLAY - One <script> at the end with a gsap.timeline() that starts immediately (8-10 seconds)
+✅ NO CANVAS - SVG + CSS only
+✅ SAFE ICONS - Only verified Lucide icons; call lucide.createIcons() first in your script
+✅ SMALL <style> ONLY FOR SCENE-SPECIFIC POSITIONS - Absolute positions in the 1920x1080 page
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+VERIFIED LUCIDE ICONS (USE ONLY THESE):
+check-circle, x-circle, alert-circle, info, zap, star, heart,
+trending-up, trending-down, cpu, database, server, wifi,
+arrow-right, arrow-left, arrow-up, arrow-down, chevron-right,
+play-circle, pause-circle, circle, square, triangle,
+users, user, mail, phone, calendar, clock,
+settings, tool, wrench, package, folder, file,
+lightbulb, flame, droplet, wind, cloud, sun, moon,
+car, plane, ship, git-branch, rotate-cw, repeat
+
+EXAMPLE FRAGMENT (diagram scene):
+<h1 class="scene-title">How a Transistor Switches</h1>
+<svg class="diagram" viewBox="0 0 1200 700" width="1200" height="700">
+  <rect class="part source" x="150" y="300" width="200" height="150" rx="14" style="fill: var(--c3)"/>
+  <rect class="part gate" x="400" y="180" width="400" height="40" rx="10" style="fill: var(--c2)"/>
+  <rect class="part drain" x="850" y="300" width="200" height="150" rx="14" style="fill: var(--c3)"/>
+  <rect class="channel" x="350" y="360" width="500" height="30" style="fill: var(--accent)" opacity="0"/>
+  <text class="label" x="250" y="280" fill="white" font-size="32" text-anchor="middle">Source</text>
+  <text class="label" x="600" y="160" fill="white" font-size="32" text-anchor="middle">Gate</text>
+  <text class="label" x="950" y="280" fill="white" font-size="32" text-anchor="middle">Drain</text>
+</svg>
+<p class="description">Gate voltage opens a channel between source and drain</p>
+<script>
+  if (typeof lucide !== 'undefined') lucide.createIcons();
+
+  gsap.timeline()
+    .from('.scene-title', {{y: -50, opacity: 0, duration: 0.8}})
+    .from('.part', {{scale: 0, opacity: 0, transformOrigin: '50% 50%', duration: 0.6, stagger: 0.3}})
+    .from('.label', {{opacity: 0, duration: 0.4, stagger: 0.1}})
+    .to('.channel', {{opacity: 0.9, duration: 1.2}})
+    .from('.description', {{y: 30, opacity: 0, duration: 0.6}});
+</script>
+
+GUIDELINES:
+- Pick the scene type that fits: title (.centered + .main-title), diagram (SVG), process flow (.flow), comparison (.comparison), stats (.stats-grid)
+- Color SVG shapes with style="fill: var(--c1)" / style="stroke: var(--accent)" (var() does not work in fill="..." attributes); labels 32-48px
+- Stagger the main elements (0.2-0.4s), labels and text last
+- Everything must animate; nothing unrelated to the topic
+
+"""
+
+ANIMATION_FRAGMENT_TASK_TEMPLATE = """Create the body of an AUTO-PLAYING scene for this educational explainer video segment. The page around it (fonts, GSAP, Lucide and the video's design system stylesheet) is added when the scene is rendered.
+
+SEGMENT INFO:
+- Scene Index: {segment_index}
+- Narration Text: "{segment_text}"
+- Visual Description: "{visual_hint}"
+- Duration: 10-12 seconds (auto-play)
+
+""" + ANIMATION_FRAGMENT_RULES + """Return ONLY the body fragment: markup, an optional small <style>, and one <script> with the GSAP timeline (no markdown, no explanations).
+"""
+
+ANIMATION_FRAGMENT_BATCH_TASK_TEMPLATE = """Create the bodies of AUTO-PLAYING scenes for {count} segments of an educational explainer video. The page around each scene (fonts, GSAP, Lucide and the video's design system stylesheet) is added when it is rendered.
+
+SEGMENTS:
+{segments}
+""" + ANIMATION_FRAGMENT_RULES + """Each block holds ONLY that scene's body fragment: markup, an optional small <style>, and one <script> with its GSAP timeline.
+
+""" + ANIMATION_BATCH_OUTPUT_FORMAT
@@ -0,0 +1,149 @@
+# video_artifact_store.py
+import os
+import shutil
+import threading
+import uuid
+from typing import Iterable, Optional
+
+from video_config import (
+    ARTIFACT_STORE_BACKEND,
+    ARTIFACT_LOCAL_ROOT,
+    ARTIFACT_VOLUME_NAME,
+    ARTIFACT_VOLUME_MOUNT
+)
+
+
+class ArtifactStore:
+    """
+    File-backed store for binary artifacts (segment audio, rendered MP4s) that the
+    orchestrator and render workers exchange by reference instead of base64.
+
+    A ref is a relative POSIX path such as 'jobs/<video_id>/audio/segment_3.wav'.
+    Writes go to a temp file first and are renamed into place, so readers never
+    see partial artifacts.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, ref: str) -> str:
+        """Local filesystem path of an artifact"""
+        full = os.path.normpath(os.path.join(self.root, ref))
+        if not full.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Artifact ref escapes store root: {ref}")
+        return full
+
+    def put_bytes(self, ref: str, data: bytes) -> str:
+        return self.put_stream(ref, [data])
+
+    def put_stream(self, ref: str, chunks: Iterable[bytes]) -> str:
+        """Write an artifact chunk by chunk without holding it in memory"""
+        target = self.path(ref)
+        tmp_path = self._tmp_path(target)
+
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    if chunk:
+                        f.write(chunk)
+            os.replace(tmp_path, target)
+        except Exception:
+            self._remove_quietly(tmp_path)
+            raise
+
+        return ref
+
+    def put_file(self, ref: str, src_path: str, move: bool = False) -> str:
+        target = self.path(ref)
+        tmp_path = self._tmp_path(target)
+
+        try:
+            if move:
+                shutil.move(src_path, tmp_path)
+            else:
+                shutil.copyfile(src_path, tmp_path)
+            os.replace(tmp_path, target)
+        except Exception:
+            self._remove_quietly(tmp_path)
+            raise
+
+        return ref
+
+    def exists(self, ref: str) -> bool:
+        return os.path.exists(self.path(ref))
+
+    def size(self, ref: str) -> int:
+        try:
+            return os.path.getsize(self.path(ref))
+        except OSError:
+            return 0
+
+    def delete(self, ref: str):
+        self._remove_quietly(self.path(ref))
+
+    def delete_prefix(self, prefix: str):
+        shutil.rmtree(self.path(prefix), ignore_errors=True)
+
+    def commit(self):
+        """Publish local writes to other containers (no-op for local disk)"""
+        pass
+
+    def reload(self):
+        """Pick up writes made by other containers (no-op for local disk)"""
+        pass
+
+    def _tmp_path(self, target: str) -> str:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        return f"{target}.{uuid.uuid4().hex}.partial"
+
+    def _remove_quietly(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class LocalArtifactStore(ArtifactStore):
+    """Plain local directory; used for tests and single-machine runs"""
+    pass
+
+
+class VolumeArtifactStore(ArtifactStore):
+    """
+    Modal Volume mounted into both the orchestrator and the render containers.
+    Writers commit after producing an artifact, readers reload before consuming one.
+    """
+
+    def __init__(self, mount_path: str, volume_name: str):
+        import modal
+
+        super().__init__(mount_path)
+        self.volume = modal.Volume.from_name(volume_name, create_if_missing=True)
+        self._lock = threading.Lock()
+
+    def commit(self):
+        with self._lock:
+            self.volume.commit()
+
+    def reload(self):
+        with self._lock:
+            try:
+                self.volume.reload()
+            except RuntimeError as e:
+                # reload refuses while files on the volume are open; the data we
+                # need was committed before the ref was handed over, so carry on
+                print(f"⚠️  Artifact volume reload skipped: {e}")
+
+
+def get_artifact_store(backend: Optional[str] = None) -> ArtifactStore:
+    backend = backend or ARTIFACT_STORE_BACKEND
+
+    if backend == "volume":
+        return VolumeArtifactStore(ARTIFACT_VOLUME_MOUNT, ARTIFACT_VOLUME_NAME)
+
+    elif backend == "local":
+        return LocalArtifactStore(ARTIFACT_LOCAL_ROOT)
+
+    else:
+        raise ValueError(f"Unknown ARTIFACT_STORE_BACKEND: {backend}")
@@ -0,0 +1,214 @@
+# video_assets.py
+"""
+Pinned, vendored copies of the third-party assets generated scenes load from
+CDNs (GSAP, Lucide, Poppins from Google Fonts), served to the capture browser
+from memory via Playwright request routing.
+
+The bundle is built into the render image (`python video_assets.py build DIR`)
+as a directory of files plus manifest.json. At render time AssetBundle loads it
+once per container and fulfils matching requests without touching the network;
+anything it does not carry falls through to the network and is counted as a miss.
+
+Standard library only: imported inside the render container and at image build.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+
+GSAP_VERSION = "3.12.2"
+LUCIDE_VERSION = "0.454.0"
+
+# `match` is applied to request URLs, so any GSAP version / lucide@latest the
+# model writes is served the pinned copy
+PINNED_ASSETS = [
+    {
+        'name': 'gsap',
+        'url': f'https://cdnjs.cloudflare.com/ajax/libs/gsap/{GSAP_VERSION}/gsap.min.js',
+        'match': r'^https://cdnjs\.cloudflare\.com/ajax/libs/gsap/[^/]+/gsap\.min\.js(\?.*)?$',
+        'content_type': 'application/javascript; charset=utf-8'
+    },
+    {
+        'name': 'lucide',
+        'url': f'https://unpkg.com/lucide@{LUCIDE_VERSION}/dist/umd/lucide.js',
+        'match': r'^https://unpkg\.com/lucide(@[^/]+)?/dist/umd/lucide(\.min)?\.js(\?.*)?$',
+        'content_type': 'application/javascript; charset=utf-8'
+    },
+    {
+        # Superset of the weights the prompts ask for; font files are added by the build
+        'name': 'poppins-css',
+        'url': 'https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700;800&display=swap',
+        'match': r'^https://fonts\.googleapis\.com/css2?\?family=Poppins(:[^&]*)?(&display=\w+)?$',
+        'content_type': 'text/css; charset=utf-8'
+    }
+]
+
+# Only requests to these hosts are routed through the bundle
+ROUTED_HOSTS = ('cdnjs.cloudflare.com', 'unpkg.com', 'fonts.googleapis.com', 'fonts.gstatic.com')
+
+# Google Fonts serves woff2 + unicode-range subsets only to modern browsers
+BUILD_USER_AGENT = (
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+MANIFEST_NAME = 'manifest.json'
+
+
+class AssetBundle:
+    """
+    In-memory copy of a built asset bundle that fulfils routed browser requests.
+
+    install(context) adds one route per browser context; hit / miss counters are
+    kept per asset and are safe to share across threads.
+    """
+
+    def __init__(self, root: str):
+        with open(os.path.join(root, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        self.root = root
+        self.assets: List[Dict[str, Any]] = []
+        for entry in manifest['assets']:
+            with open(os.path.join(root, entry['file']), 'rb') as f:
+                body = f.read()
+            self.assets.append(dict(entry, body=body, pattern=re.compile(entry['match'])))
+
+        self.route_pattern = re.compile(
+            r'^https?://(' + '|'.join(re.escape(host) for host in ROUTED_HOSTS) + r')/'
+        )
+        self.hits: Dict[str, int] = {}
+        self.misses = 0
+        self.missed_urls: List[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(len(asset['body']) for asset in self.assets)
+
+    def match(self, url: str) -> Optional[Dict[str, Any]]:
+        for asset in self.assets:
+            if asset['pattern'].match(url):
+                return asset
+        return None
+
+    def install(self, context):
+        """Serve bundled assets to every page of a Playwright browser context"""
+        context.route(self.route_pattern, self._handle_route)
+
+    def _handle_route(self, route):
+        url = route.request.url
+        asset = self.match(url)
+
+        with self._lock:
+            if asset is not None:
+                self.hits[asset['name']] = self.hits.get(asset['name'], 0) + 1
+            else:
+                self.misses += 1
+                if len(self.missed_urls) < 20:
+                    self.missed_urls.append(url)
+
+        if asset is None:
+            route.continue_()
+            return
+
+        route.fulfill(
+            status=200,
+            body=asset['body'],
+            headers={
+                'Content-Type': asset['content_type'],
+                'Access-Control-Allow-Origin': '*',
+                'Cache-Control': 'public, max-age=31536000, immutable'
+            }
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'assets': len(self.assets),
+                'bytes': self.total_bytes,
+                'hits': sum(self.hits.values()),
+                'misses': self.misses,
+                'by_asset': dict(self.hits),
+                'missed_urls': list(self.missed_urls)
+            }
+
+
+_bundle = None
+_bundle_lock = threading.Lock()
+
+
+def get_asset_bundle(root: str) -> Optional[AssetBundle]:
+    """Process-wide bundle loaded from `root`, or None when no bundle was built there"""
+    global _bundle
+
+    with _bundle_lock:
+        if _bundle is None or _bundle.root != root:
+            if not os.path.exists(os.path.join(root, MANIFEST_NAME)):
+                print(f"⚠️  No asset bundle at {root}, scenes load CDN assets from the network")
+                return None
+            _bundle = AssetBundle(root)
+            print(f"📦 Asset bundle loaded: {len(_bundle.assets)} assets ({_bundle.total_bytes // 1024} KB)")
+        return _bundle
+
+
+def _download(url: str) -> bytes:
+    request = urllib.request.Request(url, headers={'User-Agent': BUILD_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.read()
+
+
+def _asset_file_name(name: str, url: str) -> str:
+    extension = os.path.splitext(url.split('?')[0])[1] or '.bin'
+    return f"{name}-{hashlib.sha256(url.encode('utf-8')).hexdigest()[:12]}{extension}"
+
+
+def build_asset_bundle(root: str) -> Dict[str, Any]:
+    """
+    Download the pinned assets (and every font file the Poppins CSS references)
+    into `root` and write the manifest. Run at image build time.
+    """
+    os.makedirs(root, exist_ok=True)
+    entries = []
+
+    def add(name: str, url: str, match: str, content_type: str, body: bytes):
+        file_name = _asset_file_name(name, url)
+        with open(os.path.join(root, file_name), 'wb') as f:
+            f.write(body)
+        entries.append({
+            'name': name,
+            'url': url,
+            'match': match,
+            'content_type': content_type,
+            'file': file_name,
+            'size': len(body),
+            'sha256': hashlib.sha256(body).hexdigest()
+        })
+        print(f"  ✓ {name}: {url} ({len(body) // 1024} KB)")
+
+    for asset in PINNED_ASSETS:
+        body = _download(asset['url'])
+        add(asset['name'], asset['url'], asset['match'], asset['content_type'], body)
+
+        if asset['content_type'].startswith('text/css'):
+            for font_url in sorted(set(re.findall(r'url\((https://fonts\.gstatic\.com/[^)]+)\)', body.decode('utf-8')))):
+                add('font', font_url, '^' + re.escape(font_url) + '$', 'font/woff2', _download(font_url))
+
+    manifest = {'gsap': GSAP_VERSION, 'lucide': LUCIDE_VERSION, 'assets': entries}
+    with open(os.path.join(root, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+
+    print(f"📦 Asset bundle built in {root}: {len(entries)} files")
+    return manifest
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3 or sys.argv[1] != 'build':
+        print("usage: python video_assets.py build <dir>")
+        sys.exit(2)
+    build_asset_bundle(sys.argv[2])
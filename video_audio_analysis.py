@@ -0,0 +1,176 @@
+# video_audio_analysis.py
+import struct
+from typing import Any, Dict, Union
+
+import numpy as np
+
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Samples quieter than this (relative to full scale) count as silence
+DEFAULT_SILENCE_THRESHOLD_DB = -50.0
+
+
+class AudioAnalysisError(ValueError):
+    """Raised when a buffer is not a RIFF/WAVE file we can decode"""
+    pass
+
+
+def parse_wav_header(data: bytes) -> Dict[str, Any]:
+    """
+    Walk the RIFF chunks of a WAV file and describe its PCM payload.
+
+    Streaming TTS responses often carry a placeholder RIFF/data size
+    (0xFFFFFFFF or 0); the data chunk is then taken to run to the end of the buffer.
+
+    Returns:
+        dict with format_tag, channels, sample_rate, bits_per_sample,
+        block_align, data_offset, data_size
+    """
+    if len(data) < 12 or data[0:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise AudioAnalysisError("Not a RIFF/WAVE file")
+
+    fmt = None
+    offset = 12
+
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        chunk_size = struct.unpack_from('<I', data, offset + 4)[0]
+        body = offset + 8
+
+        if chunk_id == b'fmt ':
+            if chunk_size < 16:
+                raise AudioAnalysisError(f"fmt chunk too small: {chunk_size} bytes")
+
+            format_tag, channels, sample_rate, _, block_align, bits_per_sample = struct.unpack_from(
+                '<HHIIHH', data, body
+            )
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                # First two bytes of the SubFormat GUID carry the real format tag
+                format_tag = struct.unpack_from('<H', data, body + 24)[0]
+
+            fmt = {
+                'format_tag': format_tag,
+                'channels': channels,
+                'sample_rate': sample_rate,
+                'bits_per_sample': bits_per_sample,
+                'block_align': block_align
+            }
+
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise AudioAnalysisError("data chunk before fmt chunk")
+
+            available = len(data) - body
+            data_size = chunk_size if 0 < chunk_size <= available else available
+            # Drop a trailing partial frame from truncated streams
+            data_size -= data_size % max(1, fmt['block_align'])
+
+            return dict(fmt, data_offset=body, data_size=data_size)
+
+        offset = body + chunk_size + (chunk_size & 1)
+
+    raise AudioAnalysisError("No data chunk found")
+
+
+def _decode_samples(data: bytes, header: Dict[str, Any]) -> np.ndarray:
+    """PCM payload as float32 array of shape (frames, channels) in [-1, 1]"""
+    start = header['data_offset']
+    payload = memoryview(data)[start:start + header['data_size']]
+    bits = header['bits_per_sample']
+    channels = max(1, header['channels'])
+
+    if header['format_tag'] == WAVE_FORMAT_IEEE_FLOAT:
+        if bits == 32:
+            samples = np.frombuffer(payload, dtype='<f4').astype(np.float32)
+        elif bits == 64:
+            samples = np.frombuffer(payload, dtype='<f8').astype(np.float32)
+        else:
+            raise AudioAnalysisError(f"Unsupported float sample size: {bits}")
+
+    elif header['format_tag'] == WAVE_FORMAT_PCM:
+        if bits == 8:
+            samples = (np.frombuffer(payload, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif bits == 16:
+            samples = np.frombuffer(payload, dtype='<i2').astype(np.float32) / 32768.0
+        elif bits == 24:
+            raw = np.frombuffer(payload, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            ints = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+            ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+            samples = ints.astype(np.float32) / 8388608.0
+        elif bits == 32:
+            samples = np.frombuffer(payload, dtype='<i4').astype(np.float32) / 2147483648.0
+        else:
+            raise AudioAnalysisError(f"Unsupported PCM sample size: {bits}")
+
+    else:
+        raise AudioAnalysisError(f"Unsupported WAV format tag: {header['format_tag']:#x}")
+
+    frames = len(samples) // channels
+    return samples[:frames * channels].reshape(frames, channels)
+
+
+def analyze_wav(
+    source: Union[bytes, str],
+    silence_threshold_db: float = DEFAULT_SILENCE_THRESHOLD_DB
+) -> Dict[str, Any]:
+    """
+    Exact duration and loudness profile of a PCM WAV file.
+
+    Args:
+        source: WAV bytes or a path to a WAV file
+        silence_threshold_db: level (dBFS) below which a frame counts as silent
+
+    Returns:
+        dict with duration, sample_rate, channels, bits_per_sample, frames,
+        leading_silence, trailing_silence (seconds), rms, rms_dbfs, peak
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            data = f.read()
+    else:
+        data = source
+
+    header = parse_wav_header(data)
+    sample_rate = header['sample_rate']
+    if sample_rate <= 0:
+        raise AudioAnalysisError(f"Invalid sample rate: {sample_rate}")
+
+    samples = _decode_samples(data, header)
+    frames = samples.shape[0]
+
+    info = {
+        'duration': frames / sample_rate,
+        'sample_rate': sample_rate,
+        'channels': header['channels'],
+        'bits_per_sample': header['bits_per_sample'],
+        'frames': frames,
+        'leading_silence': 0.0,
+        'trailing_silence': 0.0,
+        'rms': 0.0,
+        'rms_dbfs': float('-inf'),
+        'peak': 0.0
+    }
+
+    if frames == 0:
+        return info
+
+    # Loudest channel per frame decides whether the frame is silent
+    frame_peak = np.abs(samples).max(axis=1)
+    threshold = 10.0 ** (silence_threshold_db / 20.0)
+    voiced = np.flatnonzero(frame_peak > threshold)
+
+    if voiced.size == 0:
+        info['leading_silence'] = info['trailing_silence'] = info['duration']
+    else:
+        info['leading_silence'] = int(voiced[0]) / sample_rate
+        info['trailing_silence'] = (frames - 1 - int(voiced[-1])) / sample_rate
+
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    info['rms'] = rms
+    info['rms_dbfs'] = float(20.0 * np.log10(rms)) if rms > 0 else float('-inf')
+    info['peak'] = float(frame_peak.max())
+
+    return info
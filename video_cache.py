@@ -0,0 +1,431 @@
+# video_cache.py
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from video_config import (
+    AUDIO_CACHE_ENABLED,
+    AUDIO_CACHE_DIR,
+    AUDIO_CACHE_MAX_BYTES,
+    AUDIO_CACHE_REMOTE,
+    RENDER_CACHE_ENABLED,
+    RENDER_CACHE_MAX_BYTES,
+    RENDER_CAPTURE_MODE,
+    RENDER_FPS,
+    RENDER_FRAME_QUALITY,
+    RENDER_IDLE_CONFIRM_SECONDS,
+    RENDER_IDLE_STATIC_SECONDS,
+    RENDER_IDLE_TAIL,
+    RENDER_READY_TIMEOUT_MS
+)
+
+
+class DiskLRUCache:
+    """
+    Content-addressed blob cache on local disk with least-recently-used eviction
+    under a byte budget. Each entry is a blob plus an optional JSON metadata
+    sidecar; both count toward the budget and are evicted together.
+
+    Recency survives restarts through file mtimes (touched on every hit).
+    """
+
+    BLOB_SUFFIX = '.bin'
+    META_SUFFIX = '.json'
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.root, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith(self.BLOB_SUFFIX):
+                    continue
+                key = name[:-len(self.BLOB_SUFFIX)]
+                blob_path = os.path.join(dirpath, name)
+                try:
+                    found.append((os.path.getmtime(blob_path), key, self._entry_size(key)))
+                except OSError:
+                    continue
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _blob_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + self.BLOB_SUFFIX)
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + self.META_SUFFIX)
+
+    def _entry_size(self, key: str) -> int:
+        size = os.path.getsize(self._blob_path(key))
+        if os.path.exists(self._meta_path(key)):
+            size += os.path.getsize(self._meta_path(key))
+        return size
+
+    def get_path(self, key: str) -> Optional[str]:
+        """Local path of a cached blob (marks it recently used), or None on a miss"""
+        with self._lock:
+            blob_path = self._blob_path(key)
+            if not os.path.exists(blob_path):
+                self._forget(key)
+                self.misses += 1
+                return None
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            else:
+                # Written by another process sharing this directory
+                try:
+                    self._entries[key] = self._entry_size(key)
+                    self._total_bytes += self._entries[key]
+                except OSError:
+                    self.misses += 1
+                    return None
+            self.hits += 1
+
+        try:
+            os.utime(blob_path)
+        except OSError:
+            pass
+        return blob_path
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Optional[Dict[str, Any]]]]:
+        """(blob bytes, metadata) or None on a miss"""
+        blob_path = self.get_path(key)
+        if blob_path is None:
+            return None
+
+        try:
+            with open(blob_path, 'rb') as f:
+                data = f.read()
+            return data, self.get_meta(key)
+        except OSError:
+            # Evicted by another process between lookup and read
+            with self._lock:
+                self._forget(key)
+                self.hits -= 1
+                self.misses += 1
+            return None
+
+    def get_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, data: bytes, meta: Optional[Dict[str, Any]] = None):
+        self._write(key, meta, lambda tmp_path: _write_bytes(tmp_path, data))
+
+    def put_file(self, key: str, src_path: str, meta: Optional[Dict[str, Any]] = None, move: bool = False):
+        transfer = shutil.move if move else shutil.copyfile
+        self._write(key, meta, lambda tmp_path: transfer(src_path, tmp_path))
+
+    def _write(self, key: str, meta: Optional[Dict[str, Any]], write_blob):
+        blob_path = self._blob_path(key)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = f"{blob_path}.{uuid.uuid4().hex}.partial"
+
+        try:
+            write_blob(tmp_path)
+            if meta is not None:
+                meta_tmp = f"{self._meta_path(key)}.{uuid.uuid4().hex}.partial"
+                with open(meta_tmp, 'w', encoding='utf-8') as f:
+                    json.dump(meta, f)
+                os.replace(meta_tmp, self._meta_path(key))
+            # Blob last: its presence is what marks the entry complete
+            os.replace(tmp_path, blob_path)
+        except Exception:
+            _remove_quietly(tmp_path)
+            raise
+
+        with self._lock:
+            self._forget(key)
+            size = self._entry_size(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._forget(key)
+            _remove_quietly(self._blob_path(key))
+            _remove_quietly(self._meta_path(key))
+
+    def _forget(self, key: str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self):
+        # Never evict the entry just written, even if it alone exceeds the budget
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            _remove_quietly(self._blob_path(key))
+            _remove_quietly(self._meta_path(key))
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class RemoteCacheBackend(ABC):
+    """
+    Second-tier cache shared between containers. Implementations must be safe to
+    call from worker threads; get returns (bytes, metadata) or None.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Tuple[bytes, Optional[Dict[str, Any]]]]:
+        ...
+
+    @abstractmethod
+    def put(self, key: str, data: bytes, meta: Optional[Dict[str, Any]] = None):
+        ...
+
+
+class ArtifactStoreCacheBackend(RemoteCacheBackend):
+    """Remote tier on an ArtifactStore (the shared Modal Volume in production)"""
+
+    def __init__(self, store, prefix: str):
+        self.store = store
+        self.prefix = prefix.rstrip('/')
+
+    def _ref(self, key: str, suffix: str) -> str:
+        return f"{self.prefix}/{key[:2]}/{key}{suffix}"
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Optional[Dict[str, Any]]]]:
+        blob_ref = self._ref(key, DiskLRUCache.BLOB_SUFFIX)
+
+        if not self.store.exists(blob_ref):
+            self.store.reload()
+            if not self.store.exists(blob_ref):
+                return None
+
+        try:
+            with open(self.store.path(blob_ref), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        meta = None
+        try:
+            with open(self.store.path(self._ref(key, DiskLRUCache.META_SUFFIX)), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        return data, meta
+
+    def put(self, key: str, data: bytes, meta: Optional[Dict[str, Any]] = None):
+        if meta is not None:
+            self.store.put_bytes(self._ref(key, DiskLRUCache.META_SUFFIX), json.dumps(meta).encode('utf-8'))
+        self.store.put_bytes(self._ref(key, DiskLRUCache.BLOB_SUFFIX), data)
+        self.store.commit()
+
+
+class AudioCache:
+    """
+    TTS output cache keyed by sha256 of (text, voice, model, response_format).
+
+    Stores the audio together with its analyze_wav info so a hit needs neither the
+    TTS API nor a re-parse. Lookups go local disk first, then the optional remote
+    tier (whose hits are copied down to local disk).
+    """
+
+    KEY_VERSION = 1
+
+    def __init__(self, local: DiskLRUCache, remote: Optional[RemoteCacheBackend] = None):
+        self.local = local
+        self.remote = remote
+        self.local_hits = 0
+        self.remote_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def make_key(cls, text: str, voice: str, model: str, response_format: str) -> str:
+        material = json.dumps([cls.KEY_VERSION, text, voice, model, response_format], ensure_ascii=False)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, text: str, voice: str, model: str, response_format: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        key = self.make_key(text, voice, model, response_format)
+
+        entry = self.local.get(key)
+        if entry is not None and entry[1] is not None:
+            self._count('local_hits')
+            return entry
+
+        if self.remote is not None:
+            try:
+                entry = self.remote.get(key)
+            except Exception as e:
+                print(f"⚠️  Remote audio cache lookup failed: {e}")
+                entry = None
+
+            if entry is not None and entry[1] is not None:
+                self.local.put(key, entry[0], entry[1])
+                self._count('remote_hits')
+                return entry
+
+        self._count('misses')
+        return None
+
+    def put(self, text: str, voice: str, model: str, response_format: str, audio: bytes, info: Dict[str, Any]):
+        key = self.make_key(text, voice, model, response_format)
+        self.local.put(key, audio, info)
+
+        if self.remote is not None:
+            try:
+                self.remote.put(key, audio, info)
+            except Exception as e:
+                print(f"⚠️  Remote audio cache write failed: {e}")
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> dict:
+        return {
+            'local_hits': self.local_hits,
+            'remote_hits': self.remote_hits,
+            'misses': self.misses,
+            'local_bytes': self.local.total_bytes,
+            'evictions': self.local.evictions
+        }
+
+
+class RenderCache:
+    """
+    Finished segment MP4s keyed by digest of (animation HTML, audio bytes, duration,
+    encoder/capture settings, renderer version), so a segment whose inputs did not
+    change is never rendered twice. Backed by a DiskLRUCache; `on_write` lets a
+    shared volume publish new entries (e.g. ArtifactStore.commit).
+    """
+
+    def __init__(self, local: DiskLRUCache, on_write=None):
+        self.local = local
+        self.on_write = on_write
+
+    @staticmethod
+    def settings_fingerprint() -> str:
+        from video_assets import GSAP_VERSION, LUCIDE_VERSION
+        from video_renderer import (
+            CAPTURE_CONTEXT_OPTIONS,
+            READY_POLL_MS,
+            RENDERER_VERSION,
+            SEGMENT_AUDIO_ENCODE_ARGS,
+            SEGMENT_VIDEO_ENCODE_ARGS
+        )
+
+        return json.dumps([
+            RENDERER_VERSION,
+            GSAP_VERSION,
+            LUCIDE_VERSION,
+            RENDER_CAPTURE_MODE,
+            RENDER_FPS,
+            RENDER_FRAME_QUALITY,
+            RENDER_READY_TIMEOUT_MS,
+            READY_POLL_MS,
+            RENDER_IDLE_TAIL,
+            RENDER_IDLE_CONFIRM_SECONDS,
+            RENDER_IDLE_STATIC_SECONDS,
+            CAPTURE_CONTEXT_OPTIONS,
+            SEGMENT_VIDEO_ENCODE_ARGS,
+            SEGMENT_AUDIO_ENCODE_ARGS
+        ])
+
+    @classmethod
+    def make_key(cls, animation_html: str, audio_sha256: str, audio_duration: float) -> str:
+        digest = hashlib.sha256()
+        digest.update(cls.settings_fingerprint().encode('utf-8'))
+        digest.update(b'\0' + audio_sha256.encode('ascii'))
+        digest.update(b'\0' + f"{audio_duration:.6f}".encode('ascii'))
+        digest.update(b'\0' + animation_html.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of the cached MP4, or None. Copy it before handing it to anything that deletes inputs."""
+        return self.local.get_path(key)
+
+    def put(self, key: str, mp4_path: str, segment_index: Optional[int] = None):
+        self.local.put_file(key, mp4_path, meta={'segment_index': segment_index})
+        if self.on_write is not None:
+            self.on_write()
+
+    def stats(self) -> dict:
+        return self.local.stats()
+
+
+def get_render_cache(artifact_store=None) -> Optional[RenderCache]:
+    """RenderCache under cache/renders of the artifact store; None when disabled"""
+    if not RENDER_CACHE_ENABLED:
+        return None
+
+    if artifact_store is None:
+        from video_artifact_store import get_artifact_store
+        artifact_store = get_artifact_store()
+
+    return RenderCache(
+        DiskLRUCache(artifact_store.path('cache/renders'), RENDER_CACHE_MAX_BYTES),
+        on_write=artifact_store.commit
+    )
+
+
+def get_audio_cache(artifact_store=None) -> Optional[AudioCache]:
+    """AudioCache from config; None when disabled"""
+    if not AUDIO_CACHE_ENABLED:
+        return None
+
+    remote = None
+    if AUDIO_CACHE_REMOTE == "artifacts":
+        if artifact_store is None:
+            from video_artifact_store import get_artifact_store
+            artifact_store = get_artifact_store()
+        remote = ArtifactStoreCacheBackend(artifact_store, 'cache/tts')
+    elif AUDIO_CACHE_REMOTE:
+        raise ValueError(f"Unknown AUDIO_CACHE_REMOTE: {AUDIO_CACHE_REMOTE}")
+
+    return AudioCache(DiskLRUCache(AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_BYTES), remote)
+
+
+def _write_bytes(path: str, data: bytes):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
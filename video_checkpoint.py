@@ -0,0 +1,201 @@
+# video_checkpoint.py
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from video_artifact_store import ArtifactStore
+from video_config import CHECKPOINT_COMMIT_INTERVAL
+
+
+class JobCheckpoint:
+    """
+    Durable per-job manifest so a failed video job can resume from its last
+    completed step instead of starting over.
+
+    Stored as jobs/<job_id>/checkpoint.json in the artifact store (Modal Volume in
+    production, LocalArtifactStore for tests) next to the artifacts it points to:
+
+        {
+          "job_id": ..., "version": 1, "updated_at": ...,
+          "phases":   {"metadata": {...}, "script": {"segments": [...]},
+                       "concat": {"final_ref", "duration", ...}, "upload": {...}},
+          "script_stream": [...],
+          "segments": {"3": {"text_sha256", "audio_ref", "duration", "audio", "html_ref", "video_ref"}}
+        }
+
+    script_stream holds the segments of a streamed script as they arrive, so a
+    job interrupted mid-stream continues the same script. Segment artifacts are
+    bound to a hash of their segment's text: binding a different text drops them.
+
+    Phase completions are written through (and committed) immediately. Segment
+    updates are debounced: the manifest is rewritten at most once per
+    `commit_interval`, and flush() writes whatever is still pending (the
+    orchestrator calls it when a stage ends or the job fails). A crash loses at
+    most the updates of the last interval; each write is a consistent snapshot,
+    so a segment's artifacts are never recorded without its text binding.
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        store: ArtifactStore,
+        job_id: str,
+        manifest: Optional[Dict[str, Any]] = None,
+        commit_interval: float = CHECKPOINT_COMMIT_INTERVAL
+    ):
+        self.store = store
+        self.job_id = job_id
+        self.manifest = manifest or self._empty_manifest()
+        self.commit_interval = commit_interval
+        self.saves = 0
+        self._dirty = False
+        self._saved_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ref(self) -> str:
+        return f'jobs/{self.job_id}/checkpoint.json'
+
+    @classmethod
+    def start(
+        cls,
+        store: ArtifactStore,
+        job_id: str,
+        resume: bool = False,
+        commit_interval: float = CHECKPOINT_COMMIT_INTERVAL
+    ) -> 'JobCheckpoint':
+        """Load the job's manifest when resuming, otherwise start a fresh one"""
+        checkpoint = cls(store, job_id, commit_interval=commit_interval)
+
+        if resume:
+            manifest = checkpoint._read()
+            if manifest is not None:
+                checkpoint.manifest = manifest
+                return checkpoint
+            print(f"⚠️  No checkpoint found for {job_id}, starting from scratch")
+
+        checkpoint.save()
+        return checkpoint
+
+    def _empty_manifest(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'version': self.VERSION,
+            'created_at': time.time(),
+            'updated_at': time.time(),
+            'phases': {},
+            'segments': {}
+        }
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        self.store.reload()
+        if not self.store.exists(self.ref):
+            return None
+
+        try:
+            with open(self.store.path(self.ref), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Unreadable checkpoint for {self.job_id}: {e}")
+            return None
+
+        if manifest.get('version') != self.VERSION:
+            print(f"⚠️  Checkpoint version {manifest.get('version')} != {self.VERSION}, ignoring")
+            return None
+
+        return manifest
+
+    def save(self):
+        with self._lock:
+            self.manifest['updated_at'] = time.time()
+            data = json.dumps(self.manifest, indent=1).encode('utf-8')
+            self.store.put_bytes(self.ref, data)
+            self._dirty = False
+            self._saved_at = time.time()
+            self.saves += 1
+        self.store.commit()
+
+    def flush(self):
+        """Write debounced updates that are still pending"""
+        if self._dirty:
+            self.save()
+
+    def _changed(self):
+        """Called under the lock after a debounced update; True when it is time to write"""
+        self._dirty = True
+        return time.time() - self._saved_at >= self.commit_interval
+
+    def phase(self, name: str) -> Optional[Dict[str, Any]]:
+        """Recorded output of a completed phase, or None"""
+        return self.manifest['phases'].get(name)
+
+    def complete_phase(self, name: str, data: Optional[Dict[str, Any]] = None):
+        with self._lock:
+            self.manifest['phases'][name] = dict(data or {}, completed_at=time.time())
+        self.save()
+
+    def segment(self, index: int) -> Dict[str, Any]:
+        return dict(self.manifest['segments'].get(str(index), {}))
+
+    def update_segment(self, index: int, **fields):
+        with self._lock:
+            self.manifest['segments'].setdefault(str(index), {}).update(fields)
+            due = self._changed()
+        if due:
+            self.save()
+
+    def segment_artifact(self, index: int, field: str, min_size: int = 1) -> Optional[str]:
+        """Ref recorded for a segment if the artifact still exists on the store"""
+        ref = self.segment(index).get(field)
+        if ref and self.store.size(ref) >= min_size:
+            return ref
+        return None
+
+    def script_segments(self) -> Optional[List[Dict[str, Any]]]:
+        script = self.phase('script')
+        return script['segments'] if script else None
+
+    def streamed_script_segments(self) -> List[Dict[str, Any]]:
+        """Segments of an unfinished streamed script, in order"""
+        return [dict(segment) for segment in self.manifest.get('script_stream', [])]
+
+    def add_script_segment(self, segment: Dict[str, Any]):
+        """Record a streamed segment at its index and bind that index's artifacts to its text"""
+        with self._lock:
+            stream = self.manifest.setdefault('script_stream', [])
+            del stream[segment['index']:]
+            stream.append(dict(segment))
+            self._bind_segment_text(segment['index'], segment['text'])
+            due = self._changed()
+        if due:
+            self.save()
+
+    def bind_script_segments(self, segments: List[Dict[str, Any]]):
+        """Bind every segment's artifacts to its text, dropping those recorded for other text"""
+        with self._lock:
+            for segment in segments:
+                self._bind_segment_text(segment['index'], segment['text'])
+            due = self._changed()
+        if due:
+            self.save()
+
+    def _bind_segment_text(self, index: int, text: str):
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        entry = self.manifest['segments'].get(str(index))
+        if entry is None or entry.get('text_sha256') != digest:
+            if entry and len(entry) > 1:
+                print(f"  🗑️  Segment {index} text changed, dropping its checkpointed artifacts")
+            self.manifest['segments'][str(index)] = {'text_sha256': digest}
+
+    def summary(self) -> str:
+        segments = self.manifest['segments'].values()
+        return (
+            f"phases={sorted(self.manifest['phases'])} "
+            f"streamed={len(self.manifest.get('script_stream', []))} "
+            f"audio={sum(1 for s in segments if s.get('audio_ref'))} "
+            f"html={sum(1 for s in segments if s.get('html_ref'))} "
+            f"video={sum(1 for s in segments if s.get('video_ref'))}"
+        )
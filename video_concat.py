@@ -0,0 +1,581 @@
+# video_concat.py
+"""
+Smart-render concatenation for normalized segment clips.
+
+Segments come out of the renderer with identical encode settings (CFR, fixed
+timescale, a keyframe every SEGMENT_GOP_FRAMES), so most of every clip can be
+stream-copied. Only the transition windows are decoded and re-encoded:
+
+    seg0: [ body (copied) | tail ]
+                             \\ xfade window 0 (encoded) /
+    seg1:                  [ head | body (copied) | tail ]
+                                                     \\ window 1 /
+    seg2:                                          [ head | body (copied) ]
+
+Each body starts and ends on a keyframe, each window re-encodes the rest of the
+outgoing clip (< 1 GOP + transition) and the head of the incoming clip up to its
+first usable keyframe with the same encode args, and the concat demuxer joins
+bodies and windows without touching their bitstream. Encode work therefore
+scales with the number of transitions, not with the length of the video.
+
+Long timelines are joined as a tree (ConcatPlanner): clips are grouped into
+nodes of at most `fan_in` inputs, every node of a level is built in parallel,
+and the node outputs become the inputs of the next level. Durations and keyframe
+positions are tracked in frames through every level, so upper-level joins still
+cut exactly on keyframes and stream-copy; a node whose inputs are too short to
+keep a keyframe-aligned body is re-encoded with a bounded xfade graph instead.
+No ffmpeg process ever opens more than `fan_in` inputs.
+"""
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from video_renderer import SEGMENT_FPS, SEGMENT_GOP_FRAMES, SEGMENT_VIDEO_ENCODE_ARGS
+
+
+class ConcatError(Exception):
+    pass
+
+
+def plan_smart_concat(
+    frames: List[int],
+    transition_frames: int,
+    keyframes: List[List[int]]
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Split every clip into keyframe-aligned head / body / tail ranges.
+
+    Args:
+        frames: clip lengths in frames, in timeline order
+        transition_frames: xfade length in frames
+        keyframes: keyframe positions (frame numbers) of every clip
+
+    Returns:
+        One dict per clip with body_start / body_end frame numbers (body_end None =
+        to the end of the clip) and tail_frames, or None when a clip is too short
+        to keep a keyframe-aligned body (callers should then re-encode instead).
+        The head of clip i (what window i-1 encodes) is frames [0, body_start).
+    """
+    count = len(frames)
+    if count < 2:
+        return None
+
+    plan = []
+
+    for i, (total, keys) in enumerate(zip(frames, keyframes)):
+        first = i == 0
+        last = i == count - 1
+
+        if first:
+            body_start = 0
+        else:
+            # The incoming clip contributes at least a full transition to the window
+            body_start = next((k for k in keys if k >= transition_frames), None)
+            if body_start is None or body_start > total:
+                return None
+
+        if last:
+            plan.append({'body_start': body_start, 'body_end': None, 'tail_frames': 0})
+            continue
+
+        # Last keyframe that still leaves a full transition after it
+        body_end = max((k for k in keys if body_start <= k <= total - transition_frames), default=None)
+        if body_end is None:
+            return None
+
+        plan.append({'body_start': body_start, 'body_end': body_end, 'tail_frames': total - body_end})
+
+    return plan
+
+
+class ConcatPlanner:
+    """
+    Groups a timeline of clips into a join tree with at most `fan_in` inputs per node.
+
+    plan() returns the levels bottom-up. Each node records:
+        inputs       indices into the previous level (level 0: into the clips)
+        transitions  the xfades between its inputs
+        offsets      frame at which each input starts inside the node output
+        frames       node output length (sum of inputs minus the overlaps)
+        start        frame at which the node starts on the final timeline
+    The transition between two neighbouring nodes is applied one level up.
+    """
+
+    def __init__(self, fan_in: int, transition_frames: int):
+        if fan_in < 2:
+            raise ValueError("fan_in must be at least 2")
+        self.fan_in = fan_in
+        self.transition_frames = transition_frames
+
+    def plan(self, frames: List[int], transitions: List[str]) -> List[List[Dict[str, Any]]]:
+        if not frames:
+            raise ValueError("Nothing to concatenate")
+        if len(transitions) != len(frames) - 1:
+            raise ValueError(f"Need {len(frames) - 1} transitions, got {len(transitions)}")
+
+        levels = []
+        sizes = list(frames)
+        boundaries = list(transitions)
+
+        while True:
+            nodes = []
+            for first in range(0, len(sizes), self.fan_in):
+                inputs = list(range(first, min(first + self.fan_in, len(sizes))))
+
+                offsets = []
+                position = 0
+                for i in inputs:
+                    offsets.append(position)
+                    position += sizes[i] - self.transition_frames
+
+                nodes.append({
+                    'inputs': inputs,
+                    'transitions': boundaries[first:inputs[-1]],
+                    'offsets': offsets,
+                    'frames': position + self.transition_frames,
+                    'start': 0
+                })
+
+            levels.append(nodes)
+            if len(nodes) == 1:
+                break
+
+            # Transitions that fell between two groups are applied by the next level
+            boundaries = [boundaries[node['inputs'][-1]] for node in nodes[:-1]]
+            sizes = [node['frames'] for node in nodes]
+
+        for depth in range(len(levels) - 1, 0, -1):
+            for node in levels[depth]:
+                for i, offset in zip(node['inputs'], node['offsets']):
+                    levels[depth - 1][i]['start'] = node['start'] + offset
+
+        return levels
+
+
+class SmartConcatEngine:
+    """
+    Runs a ConcatPlanner tree: per node, splits clip bodies out with stream copy
+    and renders the xfade windows (or re-encodes the whole node when it cannot be
+    split), all nodes of a level in parallel; the narration is concatenated
+    alongside and everything is stream-copied into the final MP4 with the
+    background music mixed in.
+    """
+
+    def __init__(
+        self,
+        ffmpeg_timeout: int,
+        workers: int = 4,
+        fan_in: int = 16,
+        workdir_root: Optional[str] = None,
+        fps: int = SEGMENT_FPS,
+        gop_frames: int = SEGMENT_GOP_FRAMES,
+        video_encode_args: Optional[List[str]] = None
+    ):
+        self.ffmpeg_timeout = ffmpeg_timeout
+        self.workers = max(1, workers)
+        self.fan_in = max(2, fan_in)
+        self.workdir_root = workdir_root
+        self.fps = fps
+        self.gop_frames = gop_frames
+        self.video_encode_args = video_encode_args or SEGMENT_VIDEO_ENCODE_ARGS
+        # Every piece must share one MP4 timescale or the concat demuxer mis-times them
+        self.timescale = fps * 1000
+
+    def concatenate(
+        self,
+        videos: List[str],
+        durations: List[float],
+        transitions: List[str],
+        transition_duration: float,
+        output_path: str,
+        bgm_path: Optional[str] = None,
+        bgm_volume: float = 0.12
+    ) -> Dict[str, Any]:
+        """
+        Join the clips with an xfade between each pair and mix narration + BGM.
+
+        Returns:
+            Stats dict (levels, nodes, windows, reencoded_nodes, encoded_seconds,
+            copied_seconds, seconds)
+
+        Raises:
+            ConcatError: when any ffmpeg step fails
+        """
+        if len(videos) < 2:
+            raise ConcatError("Need at least two clips")
+        if len(transitions) != len(videos) - 1:
+            raise ConcatError(f"Need {len(videos) - 1} transitions, got {len(transitions)}")
+
+        transition_frames = int(round(transition_duration * self.fps))
+        frames = [int(round(d * self.fps)) for d in durations]
+        levels = ConcatPlanner(self.fan_in, transition_frames).plan(frames, transitions)
+
+        start = time.time()
+        if self.workdir_root:
+            os.makedirs(self.workdir_root, exist_ok=True)
+        workdir = tempfile.mkdtemp(prefix='concat_', dir=self.workdir_root)
+        stats = {'levels': len(levels), 'nodes': 0, 'windows': 0, 'reencoded_nodes': 0, 'encoded_frames': 0}
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                audio_future = executor.submit(self._concat_audio, videos, workdir)
+                try:
+                    parts = self._build_tree(executor, levels, videos, frames, transition_frames, workdir, stats)
+                    audio_path = audio_future.result()
+                except ConcatError:
+                    raise
+                except Exception as e:
+                    # Anything else (e.g. a planner bug) must still reach the caller's fallback
+                    raise ConcatError(f"concat tree failed: {e.__class__.__name__}: {e}") from e
+
+            video_duration = levels[-1][0]['frames'] / self.fps
+            self._mux(parts, audio_path, video_duration, output_path, workdir, bgm_path, bgm_volume)
+
+            encoded = stats.pop('encoded_frames') / self.fps
+            stats.update({
+                'engine': 'smart',
+                'encoded_seconds': round(encoded, 2),
+                'copied_seconds': round(max(0.0, video_duration - encoded), 2),
+                'seconds': round(time.time() - start, 2)
+            })
+            return stats
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _build_tree(
+        self,
+        executor: ThreadPoolExecutor,
+        levels: List[List[Dict[str, Any]]],
+        videos: List[str],
+        frames: List[int],
+        transition_frames: int,
+        workdir: str,
+        stats: Dict[str, Any]
+    ) -> List[str]:
+        """Build the tree level by level; returns the root's parts for the final mux"""
+        items = [
+            {'path': video, 'frames': count, 'keyframes': list(range(0, count, self.gop_frames)), 'owned': False}
+            for video, count in zip(videos, frames)
+        ]
+        input_paths = set(videos)
+
+        for depth, level in enumerate(levels):
+            finishers = [
+                self._start_node(executor, node, items, f'{depth}_{n}', transition_frames, workdir, stats)
+                for n, node in enumerate(level)
+            ]
+            results = [finish() for finish in finishers]
+            stats['nodes'] += len(level)
+
+            if depth == len(levels) - 1:
+                return results[0][0]
+
+            # Collapse each node's parts into one file for the next level
+            next_items = []
+            joins = []
+            for n, (node, (parts, keyframes)) in enumerate(zip(level, results)):
+                if len(parts) == 1:
+                    # Either a carried-over item or a re-encoded xfade node (not in `items`)
+                    next_items.append({
+                        'path': parts[0],
+                        'frames': node['frames'],
+                        'keyframes': keyframes,
+                        'owned': parts[0] not in input_paths
+                    })
+                    continue
+
+                node_path = os.path.join(workdir, f'node_{depth}_{n}.mp4')
+                joins.append(executor.submit(self._copy_concat, parts, node_path, f"join node {depth}.{n}"))
+                next_items.append({'path': node_path, 'frames': node['frames'], 'keyframes': keyframes, 'owned': True})
+
+            for join in joins:
+                join.result()
+
+            kept = {item['path'] for item in next_items}
+            _remove(item['path'] for item in items if item['owned'] and item['path'] not in kept)
+            items = next_items
+
+        raise ConcatError("Empty concat plan")
+
+    def _start_node(
+        self,
+        executor: ThreadPoolExecutor,
+        node: Dict[str, Any],
+        items: List[Dict[str, Any]],
+        tag: str,
+        transition_frames: int,
+        workdir: str,
+        stats: Dict[str, Any]
+    ) -> Callable[[], Tuple[List[str], List[int]]]:
+        """
+        Submit a node's ffmpeg work and return a callable that waits for it and
+        yields (parts in timeline order, keyframe positions of the joined output).
+        """
+        inputs = [items[i] for i in node['inputs']]
+
+        if len(inputs) == 1:
+            item = inputs[0]
+            return lambda: ([item['path']], item['keyframes'])
+
+        plan = plan_smart_concat(
+            [item['frames'] for item in inputs],
+            transition_frames,
+            [item['keyframes'] for item in inputs]
+        )
+
+        if plan is None:
+            node_path = os.path.join(workdir, f'xfade_{tag}.mp4')
+            future = executor.submit(self._render_xfade_node, inputs, node, transition_frames, node_path, tag)
+            stats['reencoded_nodes'] += 1
+            stats['encoded_frames'] += node['frames']
+            keyframes = list(range(0, node['frames'], self.gop_frames))
+            return lambda: ([future.result()], keyframes)
+
+        body_futures = [
+            executor.submit(self._split_body, f'{tag}_{j}', item['path'], entry, item['frames'], workdir)
+            for j, (item, entry) in enumerate(zip(inputs, plan))
+        ]
+        window_frames = [
+            plan[j]['tail_frames'] + plan[j + 1]['body_start'] - transition_frames
+            for j in range(len(plan) - 1)
+        ]
+        window_futures = [
+            executor.submit(
+                self._render_window, f'{tag}_{j}', inputs[j]['path'], inputs[j + 1]['path'],
+                plan[j], plan[j + 1]['body_start'], node['transitions'][j], transition_frames, workdir
+            )
+            for j in range(len(plan) - 1)
+        ]
+        stats['windows'] += len(window_futures)
+        stats['encoded_frames'] += sum(window_frames)
+
+        def finish() -> Tuple[List[str], List[int]]:
+            parts = []
+            keyframes = []
+            position = 0
+
+            for j, entry in enumerate(plan):
+                body = body_futures[j].result()
+                if body:
+                    body_start = entry['body_start']
+                    body_end = entry['body_end'] if entry['body_end'] is not None else inputs[j]['frames']
+                    keyframes += [position + k - body_start for k in inputs[j]['keyframes'] if body_start <= k < body_end]
+                    parts.append(body)
+                    position += body_end - body_start
+
+                if j < len(window_futures):
+                    parts.append(window_futures[j].result())
+                    keyframes += [position + k for k in range(0, window_frames[j], self.gop_frames)]
+                    position += window_frames[j]
+
+            return parts, keyframes
+
+        return finish
+
+    def _split_body(
+        self,
+        tag: str,
+        video: str,
+        entry: Dict[str, Any],
+        total_frames: int,
+        workdir: str
+    ) -> Optional[str]:
+        """Stream-copy the keyframe-aligned body of one clip (None if it is empty)"""
+        body_start, body_end = entry['body_start'], entry['body_end']
+        if (body_end if body_end is not None else total_frames) <= body_start:
+            return None
+
+        cut_frames = [f for f in (body_start, body_end) if f]
+        pattern = os.path.join(workdir, f'body_{tag}_%d.mp4')
+
+        if not cut_frames:
+            args = ['-i', video, '-map', '0:v', '-c', 'copy',
+                    '-video_track_timescale', str(self.timescale), pattern % 0]
+        else:
+            # Split on frame numbers: keyframe positions are known exactly, and
+            # frame-based cuts are immune to the B-frame DTS offset
+            args = [
+                '-i', video, '-map', '0:v', '-c', 'copy',
+                '-f', 'segment',
+                '-segment_frames', ','.join(str(f) for f in cut_frames),
+                '-segment_format', 'mp4',
+                '-segment_format_options', f'video_track_timescale={self.timescale}',
+                '-reset_timestamps', '1',
+                pattern
+            ]
+
+        self._ffmpeg(args, f"split {tag}")
+
+        body_path = pattern % (1 if body_start else 0)
+        if not os.path.exists(body_path):
+            raise ConcatError(f"split {tag}: body piece missing")
+
+        # The other pieces are heads / tails that the windows re-encode
+        _remove(pattern % piece for piece in range(3) if pattern % piece != body_path)
+
+        return body_path
+
+    def _render_window(
+        self,
+        tag: str,
+        outgoing: str,
+        incoming: str,
+        entry: Dict[str, Any],
+        head_frames: int,
+        transition: str,
+        transition_frames: int,
+        workdir: str
+    ) -> str:
+        """Re-encode tail(outgoing) xfade head(incoming) with the segment encode args"""
+        tail = entry['tail_frames'] / self.fps
+        head = head_frames / self.fps
+        transition_duration = transition_frames / self.fps
+        window_path = os.path.join(workdir, f'window_{tag}.mp4')
+
+        filter_graph = (
+            # Clone-pad so a clip a frame shorter than its nominal duration still fills the window
+            # (fps last: xfade needs a declared constant rate, which trimmed seeks lose)
+            f"[0:v]tpad=stop_mode=clone:stop_duration={transition_duration},"
+            f"trim=duration={tail:.6f},setpts=PTS-STARTPTS,fps={self.fps}[a];"
+            f"[1:v]trim=duration={head:.6f},setpts=PTS-STARTPTS,fps={self.fps}[b];"
+            f"[a][b]xfade=transition={transition}:duration={transition_duration}:"
+            f"offset={tail - transition_duration:.6f},format=yuv420p[v]"
+        )
+
+        self._ffmpeg([
+            '-ss', f"{entry['body_end'] / self.fps:.6f}", '-i', outgoing,
+            '-t', f"{head + 1.0 / self.fps:.6f}", '-i', incoming,
+            '-filter_complex', filter_graph,
+            '-map', '[v]', '-an'
+        ] + self.video_encode_args + [window_path], f"transition window {tag}")
+
+        return window_path
+
+    def _render_xfade_node(
+        self,
+        inputs: List[Dict[str, Any]],
+        node: Dict[str, Any],
+        transition_frames: int,
+        node_path: str,
+        tag: str
+    ) -> str:
+        """Re-encode a whole node with one xfade chain (at most fan_in inputs)"""
+        transition_duration = transition_frames / self.fps
+        input_args = []
+        filters = []
+
+        for j, item in enumerate(inputs):
+            input_args += ['-i', item['path']]
+            # Pin every input to its booked length so the xfade offsets stay exact
+            filters.append(
+                f"[{j}:v]tpad=stop_mode=clone:stop_duration=1,trim=end_frame={item['frames']},"
+                f"setpts=PTS-STARTPTS,fps={self.fps}[s{j}]"
+            )
+
+        label = '[s0]'
+        for j, transition in enumerate(node['transitions']):
+            out_label = f'[x{j}]'
+            filters.append(
+                f"{label}[s{j + 1}]xfade=transition={transition}:duration={transition_duration}:"
+                f"offset={node['offsets'][j + 1] / self.fps:.6f}{out_label}"
+            )
+            label = out_label
+        filters.append(f"{label}format=yuv420p[v]")
+
+        self._ffmpeg(input_args + [
+            '-filter_complex', ';'.join(filters),
+            '-map', '[v]', '-an'
+        ] + self.video_encode_args + [node_path], f"xfade node {tag}")
+
+        return node_path
+
+    def _copy_concat(self, parts: List[str], output_path: str, label: str) -> str:
+        list_path = _write_concat_list(output_path + '.txt', parts)
+        self._ffmpeg([
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-c', 'copy', '-video_track_timescale', str(self.timescale),
+            output_path
+        ], label)
+        _remove(parts + [list_path])
+        return output_path
+
+    def _concat_audio(self, videos: List[str], workdir: str) -> str:
+        list_path = _write_concat_list(os.path.join(workdir, 'audio_list.txt'), videos)
+        audio_path = os.path.join(workdir, 'narration.wav')
+
+        self._ffmpeg([
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-vn', '-c:a', 'pcm_s16le', '-ar', '48000', '-ac', '2',
+            audio_path
+        ], "concat narration")
+
+        return audio_path
+
+    def _mux(
+        self,
+        parts: List[str],
+        audio_path: str,
+        video_duration: float,
+        output_path: str,
+        workdir: str,
+        bgm_path: Optional[str],
+        bgm_volume: float
+    ):
+        list_path = _write_concat_list(os.path.join(workdir, 'video_list.txt'), parts)
+        args = ['-f', 'concat', '-safe', '0', '-i', list_path, '-i', audio_path]
+
+        if bgm_path:
+            args += [
+                '-stream_loop', '-1', '-i', bgm_path,
+                '-filter_complex',
+                f'[2:a]volume={bgm_volume},afade=t=in:st=0:d=2,'
+                f'afade=t=out:st={max(0.0, video_duration - 2)}:d=2,aloop=loop=-1:size=2e9[bgm];'
+                f'[1:a][bgm]amix=inputs=2:duration=first[aout]',
+                '-map', '0:v', '-map', '[aout]'
+            ]
+        else:
+            args += ['-map', '0:v', '-map', '1:a']
+
+        self._ffmpeg(args + [
+            '-c:v', 'copy',
+            '-video_track_timescale', str(self.timescale),
+            '-c:a', 'aac',
+            '-b:a', '192k',
+            '-ar', '48000',
+            '-movflags', '+faststart',
+            output_path
+        ], "final mux")
+
+    def _ffmpeg(self, args: List[str], label: str):
+        try:
+            result = subprocess.run(
+                ['ffmpeg', '-y', '-loglevel', 'error', '-nostats'] + args,
+                capture_output=True,
+                text=True,
+                timeout=self.ffmpeg_timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise ConcatError(f"{label}: timeout after {self.ffmpeg_timeout}s")
+
+        if result.returncode != 0:
+            raise ConcatError(f"{label}: {result.stderr.strip()[-300:]}")
+
+
+def _write_concat_list(path: str, files: List[str]) -> str:
+    with open(path, 'w', encoding='utf-8') as f:
+        for file_path in files:
+            escaped = os.path.abspath(file_path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    return path
+
+
+def _remove(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
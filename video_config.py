@@ -16,23 +16,178 @@ MODEL_CONFIG = {
     }
 }
 
+# "direct" sends the agents' prompts straight to the provider API through
+# video_llm_client (streaming, token usage accounting); "crewai" keeps the
+# Agent/Task/Crew path and needs crewai installed
+LLM_BACKEND = "direct"
+LLM_API_BASE_URLS = {
+    "anthropic": os.getenv("ANTHROPIC_API_BASE_URL", "https://api.anthropic.com/v1"),
+    "groq": os.getenv("GROQ_API_BASE_URL", "https://api.groq.com/openai/v1")
+}
+LLM_API_KEY_ENV = {
+    "anthropic": "ANTHROPIC_API_KEY",
+    "groq": "GROQ_API_KEY"
+}
+LLM_MAX_CONNECTIONS = 16
+LLM_MAX_RETRIES = 3  # only before the first token; a broken stream is not replayed
+LLM_BACKOFF_BASE = 2.0
+LLM_BACKOFF_MAX = 30.0
+LLM_REQUEST_TIMEOUT = 300  # seconds between bytes, not for the whole response
+
 VIDEO_LENGTH_MINUTES = 2
 SEGMENTS_PER_MINUTE = 6
 TOTAL_SEGMENTS = int(VIDEO_LENGTH_MINUTES * SEGMENTS_PER_MINUTE)
 
 RENDER_BATCH_SIZE = 20
+RENDER_BATCH_TIMEOUT = 600  # one deadline for a whole render batch, not per segment
+RENDER_SEGMENT_TIMEOUT = 300  # deadline for a single segment in the streamed pipeline
+
+# Straggler mitigation: duplicate a render running longer than FACTOR x the
+# PERCENTILE latency of finished renders; failed renders retry under a per-job budget
+SPECULATIVE_RENDER_PERCENTILE = 75
+SPECULATIVE_RENDER_FACTOR = 1.5
+SPECULATIVE_RENDER_MIN_SAMPLES = 3
+SPECULATIVE_RENDER_MIN_SECONDS = 30  # never speculate on renders younger than this
+SPECULATIVE_RENDER_MAX = 4  # speculative duplicates per job
+RENDER_RETRY_BUDGET = 4  # retries of failed renders per job
+RENDER_MAX_ATTEMPTS_PER_SEGMENT = 3
 
 FFMPEG_TIMEOUT_SECONDS = 180
 AUDIO_API_TIMEOUT = 30
 
+# TTS output checks (exact duration/loudness come from parsing the WAV itself)
+AUDIO_SILENCE_THRESHOLD_DB = -50.0  # frames quieter than this count as silence
+AUDIO_MIN_RMS_DBFS = -45.0  # reject near-silent TTS output below this loudness
+
 MAX_RETRY_ATTEMPTS = 2
 
 AUDIO_GENERATION_WORKERS = 10
 VIDEO_RENDER_WORKERS = 6
 
+# Async TTS client: one pooled keep-alive connection set and one rate limiter per
+# process, shared by every job running in it. Point TTS_API_BASE_URL at
+# benchmarks/fake_tts_server.py to test without Groq.
+TTS_API_BASE_URL = os.getenv("TTS_API_BASE_URL", "https://api.groq.com/openai/v1")
+TTS_MODEL = "playai-tts"
+TTS_VOICE = "Cheyenne-PlayAI"
+TTS_RESPONSE_FORMAT = "wav"
+TTS_MAX_CONNECTIONS = AUDIO_GENERATION_WORKERS
+TTS_RATE_LIMIT_PER_SECOND = 4.0  # sustained requests/second across all jobs
+TTS_RATE_LIMIT_BURST = 8
+TTS_MAX_RETRIES = 4  # HTTP-level retries (429, 5xx, connection errors)
+TTS_BACKOFF_BASE = 1.0  # seconds; doubled per attempt with full jitter
+TTS_BACKOFF_MAX = 20.0
+
+# Content-addressed TTS cache: local-disk LRU, optionally backed by a shared tier
+# ("artifacts" = the artifact store / Modal Volume, None = local only)
+AUDIO_CACHE_ENABLED = True
+AUDIO_CACHE_DIR = "/tmp/garliq-cache/tts"
+AUDIO_CACHE_MAX_BYTES = 512 * 1024 * 1024
+AUDIO_CACHE_REMOTE = "artifacts"
+
+# Segment capture: "virtual" steps the page clock frame-by-frame (faster than realtime,
+# frame-accurate), "realtime" records the live page via the CDP screencast. Both
+# pipe frames straight into one ffmpeg encode with the audio
+RENDER_CAPTURE_MODE = "virtual"
+RENDER_FPS = 30
+RENDER_FRAME_QUALITY = 90  # JPEG quality of captured frames
+RENDER_READY_TIMEOUT_MS = 10000  # start capture anyway if the scene never signals ready
+
+# Idle tail: stop capturing once the scene is static and clone the last frame to
+# the end of the narration. Idle = picture unchanged for CONFIRM seconds and no
+# running/scheduled GSAP, CSS animation or timer; or unchanged for STATIC seconds
+RENDER_IDLE_TAIL = True
+RENDER_IDLE_CONFIRM_SECONDS = 0.5
+RENDER_IDLE_STATIC_SECONDS = 4.0
+
+# Pinned GSAP / Lucide / Poppins copies built into the render image and served to
+# the capture browser from memory (see video_assets.py); missing dir = network
+ASSET_BUNDLE_DIR = "/opt/garliq-assets"
+
+# "pool" renders on SegmentRenderWorker containers that keep warm browsers across
+# segments and videos, "function" launches a fresh browser per segment
+RENDER_WORKER_MODE = "pool"
+RENDER_BROWSER_POOL_SIZE = 1
+RENDER_BROWSER_MAX_PAGES = 50  # recycle a browser after this many segments
+RENDER_SEGMENTS_PER_CALL = 4  # upper bound on segments rendered by one batched render call
+# Streamed pipeline: group segments reaching the render stage into batched render
+# calls (fewer containers, one warm browser per call) instead of one call each.
+# Segments in a call render one after another, so calls are sized to spread the
+# job over VIDEO_RENDER_WORKERS containers; stragglers still get speculative copies
+RENDER_STREAM_BATCHING = True
+RENDER_STREAM_BATCH_MAX_WAIT = 2.0  # seconds a partial render batch waits for more segments
+
+# Artifact hand-off between orchestrator and render workers (audio, MP4s)
+# "volume" uses a shared Modal Volume, "local" a plain directory (tests, single machine)
+ARTIFACT_STORE_BACKEND = "volume"
+ARTIFACT_VOLUME_NAME = "garliq-video-artifacts"
+ARTIFACT_VOLUME_MOUNT = "/artifacts"
+ARTIFACT_LOCAL_ROOT = "/tmp/garliq-artifacts"
+
+# Segment-level checkpoint updates are written (and the volume committed) at most
+# once per interval; phase completions and flush() write immediately
+CHECKPOINT_COMMIT_INTERVAL = 2.0
+
+# Per-job / per-render scratch directories (see video_workspace.py), removed when the
+# job or render ends. Optionally on tmpfs when it has at least MIN_FREE_BYTES free
+WORKSPACE_ROOT = "/tmp/garliq-work"
+WORKSPACE_USE_TMPFS = False
+WORKSPACE_TMPFS_ROOT = "/dev/shm"
+WORKSPACE_TMPFS_MIN_FREE_BYTES = 2 * 1024 * 1024 * 1024
+
+# Finished segment MP4s keyed by digest of (HTML, audio, duration, encode settings,
+# renderer version); kept under cache/renders in the artifact store so re-runs of a
+# job skip unchanged segments
+RENDER_CACHE_ENABLED = True
+RENDER_CACHE_MAX_BYTES = 5 * 1024 * 1024 * 1024
+
 # Scene-based animation system (replaces old background+overlay approach)
 USE_AI_ANIMATIONS = True
 ANIMATION_GENERATION_TIMEOUT = 90  # Increased for complex scenes
+ANIMATION_GENERATION_CONCURRENCY = 4  # Max LLM animation calls in flight per orchestrator
+
+# "spec": the model writes a compact JSON scene spec (title / diagram / process-flow /
+# comparison / stats) rendered locally by video_scene_templates, falling back to a
+# free-form document for scenes that don't fit; "html": always free-form HTML
+ANIMATION_MODE = "spec"
+SCENE_SPEC_MAX_TOKENS = 2000
+
+# Per-video design system (video_design_system): one shared prelude of CSS variables,
+# base classes and library tags per video, picked by topic category. Scenes are then
+# generated as body fragments and wrapped in the prelude at render time
+DESIGN_SYSTEM_ENABLED = True
+CATEGORY_DESIGN_SYSTEMS = {
+    "technology": "midnight",
+    "science": "forest",
+    "business": "ember",
+    "health": "aurora",
+    "biology": "aurora"
+}
+
+# Batch mode: up to ANIMATION_BATCH_MAX segments share one LLM request (the rules and
+# persona are sent once). The batch size is the number of scenes whose estimated output
+# fits ANIMATION_BATCH_OUTPUT_HEADROOM of the provider's max_tokens; the estimates are
+# refined from observed usage. Segments missing from a batch are retried individually.
+ANIMATION_BATCH_ENABLED = True
+ANIMATION_BATCH_MAX = 6
+ANIMATION_BATCH_MAX_WAIT = 4.0  # seconds a partial batch waits for more segments
+ANIMATION_BATCH_OUTPUT_HEADROOM = 0.7
+ANIMATION_SCENE_TOKEN_ESTIMATE = {"spec": 400, "html": 2500 if DESIGN_SYSTEM_ENABLED else 5000}  # output tokens per scene
+ANIMATION_BATCH_SECONDS_PER_SCENE = 30  # added to ANIMATION_GENERATION_TIMEOUT per extra scene
+
+# Streamed per-segment pipeline (TTS -> animation -> render as soon as inputs exist)
+# "streamed" flows each segment independently, "phased" keeps the old barrier phases
+PIPELINE_MODE = "streamed"
+PIPELINE_TTS_CONCURRENCY = AUDIO_GENERATION_WORKERS
+# Batched animation needs enough stage workers waiting to fill every batch in flight
+PIPELINE_ANIMATION_CONCURRENCY = ANIMATION_GENERATION_CONCURRENCY * (ANIMATION_BATCH_MAX if ANIMATION_BATCH_ENABLED else 1)
+# Batched rendering needs enough stage workers waiting to fill every call in flight
+PIPELINE_RENDER_CONCURRENCY = VIDEO_RENDER_WORKERS * (RENDER_SEGMENTS_PER_CALL if RENDER_STREAM_BATCHING else 1)
+PIPELINE_REPORT_INTERVAL = 15  # seconds between queue-depth reports
+
+# Parse the script as the model writes it and submit each segment to the streamed
+# pipeline as soon as its JSON object closes (PIPELINE_MODE="streamed" only)
+SCRIPT_STREAMING = True
 
 # Removed fallback - AI must succeed or fail clearly
 ENABLE_FALLBACK_ANIMATIONS = False
@@ -48,6 +203,11 @@ BGM_VOLUME = 12
 
 TRANSITION_DURATION = 0.5
 
+# Shortest TTS clip accepted for a segment. Concat overlaps neighbours by
+# TRANSITION_DURATION (xfade offset = cumulative - transition), so a clip has to
+# outlast the transition with margin or offsets go zero or negative
+AUDIO_MIN_DURATION = TRANSITION_DURATION + 1.5  # seconds
+
 TRANSITION_TYPES = [
     "fade",
     "fadeblack",
@@ -67,6 +227,12 @@ TRANSITION_TYPES = [
     "dissolve"
 ]
 
+# Concatenation: "smart" stream-copies keyframe-aligned clip bodies and only
+# re-encodes the transition windows, "legacy" re-encodes the whole timeline
+CONCAT_ENGINE = "smart"
+CONCAT_WORKERS = 4  # parallel ffmpeg splits / window encodes
+CONCAT_FAN_IN = 16  # max clips per join node; longer timelines are joined as a tree
+
 print("\n" + "╔" + "="*60 + "╗")
 print("║" + " VIDEO GENERATION CONFIGURATION".center(60) + "║")
 print("╠" + "="*60 + "╣")
@@ -76,10 +242,19 @@ print(f"║  Video Length:        {VIDEO_LENGTH_MINUTES} minute(s){''.ljust(36)}
 print(f"║  Total Segments:      {TOTAL_SEGMENTS:<42} ║")
 print(f"║  Segments/Minute:     {SEGMENTS_PER_MINUTE:<42} ║")
 print(f"║  Render Batch Size:   {RENDER_BATCH_SIZE:<42} ║")
+print(f"║  Pipeline Mode:       {PIPELINE_MODE:<42} ║")
+print(f"║  LLM Backend:         {LLM_BACKEND:<42} ║")
 print(f"║  FFmpeg Timeout:      {FFMPEG_TIMEOUT_SECONDS}s{''.ljust(40)} ║")
+print(f"║  Capture Mode:        {RENDER_CAPTURE_MODE:<42} ║")
+print(f"║  Render Workers:      {RENDER_WORKER_MODE:<42} ║")
+print(f"║  Artifact Store:      {ARTIFACT_STORE_BACKEND:<42} ║")
 print(f"║  Animation System:    Scene-based (Topic-Specific){''.ljust(18)} ║")
 print(f"║  Animation Timeout:   {ANIMATION_GENERATION_TIMEOUT}s{''.ljust(40)} ║")
+print(f"║  Animation Workers:   {ANIMATION_GENERATION_CONCURRENCY:<42} ║")
+print(f"║  Animation Mode:      {ANIMATION_MODE:<42} ║")
+print(f"║  Design System:       {'per video' if DESIGN_SYSTEM_ENABLED else 'off':<42} ║")
 print(f"║  Background Music:    {len(BACKGROUND_MUSIC_FILES)} tracks (volume: {BGM_VOLUME}%){''.ljust(20)} ║")
+print(f"║  Concat Engine:       {CONCAT_ENGINE:<42} ║")
 print(f"║  Transitions:         {len(TRANSITION_TYPES)} types ({TRANSITION_DURATION}s duration){''.ljust(18)} ║")
 print(f"║  Architecture:        Complete auto-playing scenes{''.ljust(18)} ║")
 print(f"║  Visual Style:        SVG diagrams + GSAP animations{''.ljust(14)} ║")
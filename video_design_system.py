@@ -0,0 +1,286 @@
+# video_design_system.py
+"""
+Per-video design system: one shared prelude (CSS variables, base classes and the
+library tags) that every scene of a video is rendered inside.
+
+Scenes are generated as body fragments only (markup + their GSAP timeline
+script). At render time scene_document() wraps a fragment in the page shell;
+the shell links the design system's stylesheet from a routed URL that
+PreludeRoutes serves from memory to every page of a capture browser context,
+the same way AssetBundle serves vendored CDN assets. The stylesheet URL carries
+a digest of its content, so a changed design system is never served stale and
+the rendered document (and so the render cache key) changes with it.
+
+Standard library only: imported inside the render container.
+"""
+import hashlib
+import html
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from video_assets import GSAP_VERSION, LUCIDE_VERSION
+
+
+DEFAULT_DESIGN_SYSTEM = "midnight"
+
+# Never resolves (RFC 2606); only ever answered by PreludeRoutes
+PRELUDE_HOST = "design-system.invalid"
+
+FONT_URL = "https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;700;800&display=swap"
+
+# Tokens per preset; palette is the order element / card colors are assigned in
+DESIGN_SYSTEMS: Dict[str, Dict[str, Any]] = {
+    'midnight': {
+        'background': ['#0f172a', '#1e293b'],
+        'accent': '#00d4ff',
+        'palette': ['#3b82f6', '#f59e0b', '#8b5cf6', '#22c55e', '#ec4899', '#14b8a6'],
+        'positive': '#22c55e',
+        'negative': '#ef4444'
+    },
+    'forest': {
+        'background': ['#052e16', '#134e4a'],
+        'accent': '#34d399',
+        'palette': ['#22c55e', '#14b8a6', '#84cc16', '#f59e0b', '#38bdf8', '#a78bfa'],
+        'positive': '#4ade80',
+        'negative': '#f87171'
+    },
+    'ember': {
+        'background': ['#1c1917', '#292524'],
+        'accent': '#f59e0b',
+        'palette': ['#f59e0b', '#3b82f6', '#f97316', '#22c55e', '#e11d48', '#a855f7'],
+        'positive': '#22c55e',
+        'negative': '#ef4444'
+    },
+    'aurora': {
+        'background': ['#1e1b4b', '#312e81'],
+        'accent': '#f472b6',
+        'palette': ['#ec4899', '#22c55e', '#38bdf8', '#f59e0b', '#a78bfa', '#2dd4bf'],
+        'positive': '#4ade80',
+        'negative': '#fb7185'
+    }
+}
+
+# Base classes shared by the scene templates and free-form fragments
+_BASE_CSS = """
+body { width: 1920px; height: 1080px; margin: 0; overflow: hidden; position: relative; color: var(--text);
+       font-family: var(--font); background: linear-gradient(135deg, var(--bg-start) 0%, var(--bg-end) 100%); }
+svg text { font-family: var(--font); }
+.centered { position: absolute; inset: 0; display: flex; flex-direction: column; align-items: center; justify-content: center; text-align: center; }
+.main-title { font-size: 6rem; font-weight: 800; margin: 0 80px; line-height: 1.2; }
+.gradient-text { background: linear-gradient(90deg, var(--text), var(--accent)); -webkit-background-clip: text; background-clip: text; color: transparent; }
+.subtitle { font-size: 2.5rem; font-weight: 300; color: var(--text-muted); margin: 30px 120px 0; }
+.icon-container { margin-top: 50px; }
+.scene-title { position: absolute; top: 80px; left: 0; right: 0; margin: 0; text-align: center; font-size: 4rem; font-weight: 700; }
+.diagram { position: absolute; top: 200px; left: 360px; }
+.description { position: absolute; bottom: 70px; left: 10%; width: 80%; margin: 0; text-align: center; font-size: 2rem; }
+.card { border-radius: 25px; padding: 40px; background: var(--surface); border: 3px solid var(--accent); }
+.accent { color: var(--accent); }
+.muted { color: var(--text-muted); }
+.flow { position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); display: flex; gap: 50px; align-items: center; }
+.step { text-align: center; width: 260px; }
+.step-box { width: 150px; height: 150px; border-radius: 20px; display: flex; align-items: center; justify-content: center; margin: 0 auto 20px; }
+.step-title { font-size: 1.8rem; margin: 0 0 10px; }
+.step-description { font-size: 1.2rem; color: var(--text-muted); margin: 0; }
+.flow-arrow { font-size: 3rem; }
+.comparison { position: absolute; top: 55%; left: 50%; transform: translate(-50%, -50%); display: flex; gap: 60px; width: 90%; align-items: center; }
+.side { flex: 1; border-radius: 30px; padding: 50px 60px; text-align: center; }
+.side h2 { font-size: 3rem; margin: 0 0 20px; }
+.side-icon { margin: 10px auto 20px; }
+.side ul { list-style: none; padding: 0; margin: 0; text-align: left; font-size: 1.5rem; }
+.side li { margin: 15px 0; }
+.vs { width: 120px; height: 120px; flex: none; border-radius: 50%; display: flex; align-items: center; justify-content: center; font-size: 3rem; font-weight: 800; background: var(--accent); }
+.stats-grid { position: absolute; top: 55%; left: 50%; transform: translate(-50%, -50%); display: grid; gap: 40px; width: 80%; }
+.stat-card { border-radius: 25px; padding: 50px; text-align: center; }
+.stat-number { font-size: 5rem; font-weight: 800; }
+.stat-label { font-size: 1.5rem; margin-top: 15px; }
+"""
+
+_DOCUMENT = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>{title}</title>
+<link href="{font_url}" rel="stylesheet">
+{stylesheet}
+<script src="https://cdnjs.cloudflare.com/ajax/libs/gsap/{gsap_version}/gsap.min.js"></script>
+<script src="https://unpkg.com/lucide@{lucide_version}/dist/umd/lucide.js"></script>
+</head>
+<body>
+{fragment}
+</body>
+</html>
+"""
+
+_DOCUMENT_PATTERN = re.compile(r'<!doctype\s+html|<html[\s>]', re.IGNORECASE)
+
+
+class DesignSystem:
+    """One preset's tokens, its prelude stylesheet and the URL it is served under"""
+
+    def __init__(self, name: str, tokens: Dict[str, Any]):
+        self.name = name
+        self.tokens = tokens
+        self.css = _build_css(tokens)
+        self.digest = hashlib.sha256(self.css.encode('utf-8')).hexdigest()[:12]
+        self.stylesheet_url = f"https://{PRELUDE_HOST}/{name}-{self.digest}.css"
+
+    @property
+    def accent(self) -> str:
+        return self.tokens['accent']
+
+    @property
+    def palette(self) -> List[str]:
+        return self.tokens['palette']
+
+    def reference(self) -> str:
+        """Prompt-ready summary of what the prelude provides"""
+        start, end = self.tokens['background']
+        return (
+            f"- Background gradient {start} → {end}, white text, Poppins font, body already 1920x1080\n"
+            f"- CSS variables: --accent ({self.accent}), --bg-start, --bg-end, --text, --text-muted, --surface, "
+            f"--positive ({self.tokens['positive']}), --negative ({self.tokens['negative']}), "
+            + ', '.join(f"--c{i + 1} ({color})" for i, color in enumerate(self.palette)) + "\n"
+            "- Classes: .centered (full-screen centred column), .main-title (6rem), .gradient-text, .subtitle (2.5rem), "
+            ".scene-title (4rem, top centre), .description (2rem, bottom centre), .icon-container, .card, .accent, .muted, "
+            ".flow/.step/.step-box/.step-title/.step-description/.flow-arrow, .comparison/.side/.vs, "
+            ".stats-grid/.stat-card/.stat-number/.stat-label\n"
+            "- Libraries already loaded: GSAP (gsap), Lucide (lucide)"
+        )
+
+
+_instances: Dict[str, DesignSystem] = {}
+_instances_lock = threading.Lock()
+
+
+def get_design_system(name: Optional[str] = None) -> DesignSystem:
+    """Built once per process; unknown names fall back to DEFAULT_DESIGN_SYSTEM"""
+    if name not in DESIGN_SYSTEMS:
+        name = DEFAULT_DESIGN_SYSTEM
+
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = DesignSystem(name, DESIGN_SYSTEMS[name])
+        return _instances[name]
+
+
+def is_scene_fragment(animation_html: str) -> bool:
+    """True for body fragments, False for complete HTML documents"""
+    return _DOCUMENT_PATTERN.search(animation_html) is None
+
+
+def scene_document(fragment: str, design_system: Optional[str] = None, inline: bool = False, title: str = "Scene") -> str:
+    """
+    Wrap a scene body fragment in the page shell of its design system.
+
+    The prelude stylesheet is linked from its routed URL, or embedded when
+    `inline` (standalone documents, code validation).
+    """
+    design = get_design_system(design_system)
+    if inline:
+        stylesheet = f"<style>{design.css}</style>"
+    else:
+        stylesheet = f'<link href="{design.stylesheet_url}" rel="stylesheet">'
+
+    return _DOCUMENT.format(
+        title=html.escape(title, quote=True),
+        font_url=FONT_URL,
+        stylesheet=stylesheet,
+        gsap_version=GSAP_VERSION,
+        lucide_version=LUCIDE_VERSION,
+        fragment=fragment.strip()
+    )
+
+
+def render_document(animation_html: str, design_system: Optional[str] = None) -> str:
+    """What the capture browser loads: fragments are wrapped, complete documents pass through"""
+    if not is_scene_fragment(animation_html):
+        return animation_html
+    return scene_document(animation_html, design_system)
+
+
+class PreludeRoutes:
+    """
+    Serves design system stylesheets to capture pages from memory.
+
+    install(context) adds one route per browser context; each stylesheet is
+    built once per process and shared by every page the browser pool opens.
+    """
+
+    def __init__(self):
+        self.route_pattern = re.compile(r'^https://' + re.escape(PRELUDE_HOST) + r'/')
+        self.url_pattern = re.compile(r'^https://' + re.escape(PRELUDE_HOST) + r'/([\w-]+)-([0-9a-f]{12})\.css$')
+        self.hits: Dict[str, int] = {}
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def install(self, context):
+        """Serve design system preludes to every page of a Playwright browser context"""
+        context.route(self.route_pattern, self._handle_route)
+
+    def _handle_route(self, route):
+        match = self.url_pattern.match(route.request.url)
+        design = get_design_system(match.group(1)) if match and match.group(1) in DESIGN_SYSTEMS else None
+        if design is not None and design.digest != match.group(2):
+            design = None
+
+        with self._lock:
+            if design is not None:
+                self.hits[design.name] = self.hits.get(design.name, 0) + 1
+            else:
+                self.misses += 1
+
+        if design is None:
+            route.fulfill(status=404, body='', headers={'Content-Type': 'text/css; charset=utf-8'})
+            return
+
+        route.fulfill(
+            status=200,
+            body=design.css,
+            headers={
+                'Content-Type': 'text/css; charset=utf-8',
+                'Access-Control-Allow-Origin': '*',
+                'Cache-Control': 'public, max-age=31536000, immutable'
+            }
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'hits': sum(self.hits.values()),
+                'misses': self.misses,
+                'by_design_system': dict(self.hits)
+            }
+
+
+_routes = None
+_routes_lock = threading.Lock()
+
+
+def get_prelude_routes() -> PreludeRoutes:
+    """Process-wide PreludeRoutes (one set of counters per render container)"""
+    global _routes
+
+    with _routes_lock:
+        if _routes is None:
+            _routes = PreludeRoutes()
+        return _routes
+
+
+def _build_css(tokens: Dict[str, Any]) -> str:
+    variables = {
+        '--bg-start': tokens['background'][0],
+        '--bg-end': tokens['background'][1],
+        '--text': '#ffffff',
+        '--text-muted': 'rgba(255,255,255,0.85)',
+        '--surface': 'rgba(255,255,255,0.06)',
+        '--accent': tokens['accent'],
+        '--positive': tokens['positive'],
+        '--negative': tokens['negative'],
+        '--font': "'Poppins', sans-serif"
+    }
+    for i, color in enumerate(tokens['palette']):
+        variables[f'--c{i + 1}'] = color
+
+    declarations = ' '.join(f"{name}: {value};" for name, value in variables.items())
+    return f":root {{ {declarations} }}" + _BASE_CSS
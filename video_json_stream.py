@@ -0,0 +1,124 @@
+# video_json_stream.py
+import asyncio
+import json
+from typing import Any, AsyncIterator, Iterable, List
+
+
+class JSONArrayStreamParser:
+    """
+    Incremental parser for a JSON array that arrives in arbitrary text chunks
+    (LLM tokens), yielding each top-level element as soon as it is complete.
+
+        parser = JSONArrayStreamParser()
+        for chunk in chunks:
+            for segment in parser.feed(chunk):
+                ...
+
+    Anything before the first '[' (markdown fences, "Final Answer:", prose) and
+    after the closing ']' is ignored. Objects and arrays are emitted the moment
+    their closing bracket arrives; scalars at the following ',' or ']'. An element
+    that is not valid JSON is counted in `errors` and skipped, so one malformed
+    segment does not lose the rest of the stream.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self.emitted = 0
+        self.errors = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._pending: List[str] = []
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume the next chunk of text and return the elements it completed"""
+        elements = []
+        if self.finished or not chunk:
+            return elements
+
+        i = 0
+        if not self.started:
+            i = chunk.find('[')
+            if i == -1:
+                return elements
+            self.started = True
+            self._depth = 1
+            i += 1
+
+        start = i
+        length = len(chunk)
+
+        while i < length:
+            c = chunk[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == '{' or c == '[':
+                self._depth += 1
+            elif c == '}' or c == ']':
+                self._depth -= 1
+                if self._depth == 1:
+                    self._emit(chunk[start:i + 1], elements)
+                    start = i + 1
+                elif self._depth == 0:
+                    self._emit(chunk[start:i], elements)
+                    self.finished = True
+                    return elements
+            elif c == ',' and self._depth == 1:
+                self._emit(chunk[start:i], elements)
+                start = i + 1
+
+            i += 1
+
+        if start < length:
+            self._pending.append(chunk[start:])
+
+        return elements
+
+    def close(self) -> List[Any]:
+        """Flush a trailing scalar of an array whose closing ']' never arrived"""
+        elements = []
+        if self.started and not self.finished and self._depth == 1:
+            self._emit('', elements)
+        return elements
+
+    def _emit(self, tail: str, elements: List[Any]):
+        self._pending.append(tail)
+        text = ''.join(self._pending).strip()
+        self._pending = []
+
+        if not text:
+            return
+
+        try:
+            elements.append(json.loads(text))
+            self.emitted += 1
+        except json.JSONDecodeError as e:
+            self.errors += 1
+            print(f"⚠️  Skipping malformed array element ({len(text)} chars): {e}")
+
+
+def parse_json_array_chunks(chunks: Iterable[str]) -> List[Any]:
+    """Parse a complete chunk sequence (handy for replaying a recorded stream)"""
+    parser = JSONArrayStreamParser()
+    elements = []
+    for chunk in chunks:
+        elements.extend(parser.feed(chunk))
+    elements.extend(parser.close())
+    return elements
+
+
+async def scripted_token_stream(chunks: Iterable[str], delay: float = 0.0) -> AsyncIterator[str]:
+    """Async token stream replaying fixed chunks, a stand-in for a live LLM stream"""
+    for chunk in chunks:
+        if delay:
+            await asyncio.sleep(delay)
+        yield chunk
@@ -0,0 +1,312 @@
+# video_llm_client.py
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from video_config import (
+    MODEL_PROVIDER,
+    MODEL_CONFIG,
+    LLM_API_BASE_URLS,
+    LLM_API_KEY_ENV,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+    LLM_REQUEST_TIMEOUT
+)
+from video_metrics import LatencyHistogram
+from video_tts_client import RETRYABLE_STATUS_CODES, _parse_retry_after
+
+
+ANTHROPIC_VERSION = "2023-06-01"
+
+
+class LLMError(Exception):
+    """LLM request failed for good (non-retryable status, stream error or retries exhausted)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def system_prompt(role: str, goal: str, backstory: str) -> str:
+    """The agent persona as one system message (what CrewAI wraps around every task)"""
+    return f"You are {role}.\n\nYour goal: {goal}\n\n{backstory}"
+
+
+class LLMClient:
+    """
+    Thin async client that sends system + task prompts straight to the provider.
+
+    Speaks the Anthropic Messages API ("anthropic") or the OpenAI-compatible chat
+    completions API (everything else, e.g. Groq), always streaming. Connections are
+    pooled per event loop like TTSClient; 429/5xx/connection errors are retried
+    with jittered backoff as long as no text has been handed to the caller yet.
+    Token usage reported by the provider is accumulated for stats().
+    """
+
+    def __init__(
+        self,
+        provider: str = MODEL_PROVIDER,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE,
+        backoff_max: float = LLM_BACKOFF_MAX,
+        timeout: float = LLM_REQUEST_TIMEOUT
+    ):
+        config = MODEL_CONFIG.get(provider, {})
+
+        self.provider = provider
+        self.api_key = api_key if api_key is not None else os.getenv(LLM_API_KEY_ENV.get(provider, ''), '')
+        self.base_url = (base_url or LLM_API_BASE_URLS[provider]).rstrip('/')
+        self.model = _provider_model_name(provider, model or config['model'])
+        self.temperature = temperature if temperature is not None else config.get('temperature', 0.7)
+        self.max_tokens = max_tokens or config.get('max_tokens', 8192)
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.latency = LatencyHistogram('llm latency', buckets=(1, 2, 5, 10, 20, 30, 45, 60, 90, 120))
+        self.first_token_latency = LatencyHistogram('llm first token', buckets=(0.25, 0.5, 1, 2, 3, 5, 8, 13, 20))
+        self.requests_sent = 0
+        self.retries = 0
+        self.throttled = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+
+    def _client(self) -> httpx.AsyncClient:
+        # httpx connections belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            for other in [l for l in self._clients if l.is_closed()]:
+                del self._clients[other]
+
+            client = self._clients.get(loop)
+            if client is None:
+                if self.provider == "anthropic":
+                    headers = {"x-api-key": self.api_key, "anthropic-version": ANTHROPIC_VERSION}
+                else:
+                    headers = {"Authorization": f"Bearer {self.api_key}"}
+
+                client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    headers=headers,
+                    timeout=httpx.Timeout(self.timeout, connect=10.0),
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                        keepalive_expiry=60.0
+                    )
+                )
+                self._clients[loop] = client
+
+        return client
+
+    async def complete(self, system: str, prompt: str, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Run one prompt to completion.
+
+        Returns:
+            {'text', 'input_tokens', 'output_tokens', 'seconds', 'first_token_seconds'}
+
+        Raises:
+            LLMError: on a non-retryable status, a stream error or once retries are exhausted
+        """
+        usage: Dict[str, Any] = {}
+        parts = []
+        async for text in self.stream(system, prompt, max_tokens=max_tokens, usage=usage):
+            parts.append(text)
+        return dict(usage, text=''.join(parts))
+
+    async def stream(
+        self,
+        system: str,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        usage: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield text deltas as the provider produces them.
+
+        `usage`, when given, is filled with input/output token counts and timings
+        once the stream ends.
+        """
+        path, payload = self._build_request(system, prompt, max_tokens or self.max_tokens)
+        usage = usage if usage is not None else {}
+        usage.update({'input_tokens': 0, 'output_tokens': 0, 'seconds': 0.0, 'first_token_seconds': None})
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            started_at = time.time()
+            yielded = False
+
+            try:
+                self.requests_sent += 1
+
+                async with self._client().stream('POST', path, json=payload) as response:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode('utf-8', 'replace')
+
+                        if response.status_code not in RETRYABLE_STATUS_CODES:
+                            raise LLMError(f"LLM API error: {response.status_code} {body[:200]}", response.status_code)
+
+                        if response.status_code == 429:
+                            self.throttled += 1
+                        retry_after = _parse_retry_after(response.headers.get('retry-after'))
+                        last_error = LLMError(f"LLM API error: {response.status_code}", response.status_code)
+                    else:
+                        async for event in _sse_events(response):
+                            text = self._consume_event(event, usage)
+                            if text:
+                                if not yielded:
+                                    usage['first_token_seconds'] = time.time() - started_at
+                                    self.first_token_latency.observe(usage['first_token_seconds'])
+                                    yielded = True
+                                yield text
+
+                        usage['seconds'] = time.time() - started_at
+                        self.latency.observe(usage['seconds'])
+                        self.input_tokens += usage['input_tokens']
+                        self.output_tokens += usage['output_tokens']
+                        return
+
+            except httpx.TransportError as e:
+                if yielded:
+                    raise LLMError(f"LLM stream interrupted: {e.__class__.__name__}: {e}")
+                last_error = LLMError(f"LLM transport error: {e.__class__.__name__}: {e}")
+
+            if attempt < self.max_retries:
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        raise last_error
+
+    def _build_request(self, system: str, prompt: str, max_tokens: int):
+        if self.provider == "anthropic":
+            return '/messages', {
+                'model': self.model,
+                'system': system,
+                'messages': [{'role': 'user', 'content': prompt}],
+                'max_tokens': max_tokens,
+                'temperature': self.temperature,
+                'stream': True
+            }
+
+        return '/chat/completions', {
+            'model': self.model,
+            'messages': [
+                {'role': 'system', 'content': system},
+                {'role': 'user', 'content': prompt}
+            ],
+            'max_tokens': max_tokens,
+            'temperature': self.temperature,
+            'stream': True,
+            'stream_options': {'include_usage': True}
+        }
+
+    def _consume_event(self, event: Dict[str, Any], usage: Dict[str, Any]) -> Optional[str]:
+        """Text carried by one stream event; usage counters are picked up on the way"""
+        if self.provider == "anthropic":
+            kind = event.get('type')
+            if kind == 'content_block_delta':
+                return event.get('delta', {}).get('text')
+            if kind == 'message_start':
+                message_usage = event.get('message', {}).get('usage', {})
+                usage['input_tokens'] = (
+                    message_usage.get('input_tokens', 0)
+                    + message_usage.get('cache_creation_input_tokens', 0)
+                    + message_usage.get('cache_read_input_tokens', 0)
+                )
+            elif kind == 'message_delta':
+                usage['output_tokens'] = event.get('usage', {}).get('output_tokens', usage['output_tokens'])
+            elif kind == 'error':
+                raise LLMError(f"LLM stream error: {event.get('error', {}).get('message', event)}")
+            return None
+
+        if 'error' in event:
+            raise LLMError(f"LLM stream error: {event['error']}")
+
+        chunk_usage = event.get('usage') or event.get('x_groq', {}).get('usage')
+        if chunk_usage:
+            usage['input_tokens'] = chunk_usage.get('prompt_tokens', 0)
+            usage['output_tokens'] = chunk_usage.get('completion_tokens', 0)
+
+        choices = event.get('choices') or []
+        if choices:
+            return (choices[0].get('delta') or {}).get('content')
+        return None
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max * 3))
+        return delay
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests_sent,
+            'retries': self.retries,
+            'throttled': self.throttled,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens
+        }
+
+    async def aclose(self):
+        """Close the connection pool of the current event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+
+async def _sse_events(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """JSON payloads of a server-sent event stream ('data: [DONE]' ends it)"""
+    async for line in response.aiter_lines():
+        if not line.startswith('data:'):
+            continue
+
+        data = line[5:].strip()
+        if data == '[DONE]':
+            return
+        if data:
+            yield json.loads(data)
+
+
+def _provider_model_name(provider: str, model: str) -> str:
+    """Strip the litellm routing prefix ('groq/openai/gpt-oss-120b' -> 'openai/gpt-oss-120b')"""
+    prefix = f"{provider}/"
+    return model[len(prefix):] if model.startswith(prefix) else model
+
+
+_shared_clients: Dict[str, LLMClient] = {}
+_shared_lock = threading.Lock()
+
+
+def get_llm_client(provider: str = MODEL_PROVIDER, base_url: Optional[str] = None) -> LLMClient:
+    """Process-wide LLMClient per (provider, base_url), shared by both agents and concurrent jobs"""
+    base_url = base_url or LLM_API_BASE_URLS[provider]
+
+    with _shared_lock:
+        key = f"{provider}|{base_url}"
+        if key not in _shared_clients:
+            _shared_clients[key] = LLMClient(provider=provider, base_url=base_url)
+        return _shared_clients[key]
@@ -0,0 +1,62 @@
+# video_metrics.py
+import bisect
+import math
+import threading
+from typing import Dict, List, Optional, Sequence
+
+
+class LatencyHistogram:
+    """
+    Bucketed latency histogram (seconds) that also keeps raw samples for exact
+    percentiles. Thread-safe so worker threads can record into a shared instance.
+    """
+
+    DEFAULT_BUCKETS = (1, 2, 5, 10, 20, 30, 45, 60, 90, 120, 180, 300)
+
+    def __init__(self, name: str, buckets: Optional[Sequence[float]] = None):
+        self.name = name
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.samples: List[float] = []
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+            self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile, p in [0, 100]; 0.0 when empty"""
+        with self._lock:
+            if not self.samples:
+                return 0.0
+            ordered = sorted(self.samples)
+        rank = max(1, math.ceil(p / 100.0 * len(ordered)))
+        return ordered[min(rank, len(ordered)) - 1]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'p50': round(self.percentile(50), 2),
+            'p90': round(self.percentile(90), 2),
+            'p99': round(self.percentile(99), 2),
+            'max': round(max(self.samples), 2) if self.samples else 0.0
+        }
+
+    def format(self) -> str:
+        s = self.summary()
+        bucket_parts = []
+        for i, count in enumerate(self.counts):
+            if not count:
+                continue
+            label = f"≤{self.buckets[i]:g}s" if i < len(self.buckets) else f">{self.buckets[-1]:g}s"
+            bucket_parts.append(f"{label}:{count}")
+
+        return (
+            f"{self.name}: n={s['count']} p50={s['p50']}s p90={s['p90']}s max={s['max']}s"
+            + (f" [{' '.join(bucket_parts)}]" if bucket_parts else "")
+        )
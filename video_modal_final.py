@@ -2,7 +2,6 @@
 import modal
 import os
 import time
-import base64
 
 app = modal.App("garliq-video-backend")
 
@@ -16,6 +15,7 @@ base_image = (
         "requests==2.31.0",
         "supabase==2.7.4",
         "httpx==0.27.0",
+        "numpy>=1.26",
         "pydantic>=2.6.1",
         "fastapi==0.104.1",
         "uvicorn==0.24.0"
@@ -29,11 +29,18 @@ render_image = (
     .pip_install("playwright==1.40.0")
     .apt_install("ffmpeg")
     .run_commands("playwright install chromium", "playwright install-deps")
+    # Vendored CDN assets (keep the path in sync with video_config.ASSET_BUNDLE_DIR)
+    .add_local_file("video_assets.py", "/opt/video_assets.py", copy=True)
+    .run_commands("python /opt/video_assets.py build /opt/garliq-assets")
     .add_local_dir(".", "/root")
 )
 
 secrets = modal.Secret.from_name("garliq-secrets")
 
+# Shared artifact volume (see video_config.ARTIFACT_VOLUME_NAME / ARTIFACT_VOLUME_MOUNT)
+artifact_volume = modal.Volume.from_name("garliq-video-artifacts", create_if_missing=True)
+artifact_volumes = {"/artifacts": artifact_volume}
+
 
 @app.function(
     image=render_image,
@@ -41,271 +48,260 @@ secrets = modal.Secret.from_name("garliq-secrets")
     cpu=2.0,
     memory=4096,
     secrets=[secrets],
+    volumes=artifact_volumes,
     retries=0
 )
-def render_segment_video(segment: dict, audio_base64: str, audio_duration: float, animation_html: str) -> str:
+def render_segment_video(segment: dict, audio_ref: str, audio_duration: float, animation_html: str, output_ref: str) -> str:
     """
     Render segment video using AI-generated HTML5 animation code
-    FIXED: Uses Playwright video recording to capture ENTIRE viewport (canvas + HTML)
+    Captured frames are piped straight into a single ffmpeg encode with the audio
     
     Args:
         segment: dict with index, text, visual_hint
-        audio_base64: base64-encoded audio WAV data
+        audio_ref: artifact ref of the segment's WAV audio
         audio_duration: duration of audio in seconds
         animation_html: AI-generated complete HTML animation code
+        output_ref: artifact ref to publish the MP4 under
         
     Returns:
-        Base64-encoded MP4 file data (5 Mbps bitrate, normalized for concatenation)
+        Artifact ref of the MP4 (5 Mbps bitrate, normalized for concatenation)
+    """
+    return _render_segment(segment, audio_ref, audio_duration, animation_html, output_ref)
+
+
+@app.function(
+    image=render_image,
+    timeout=1200,
+    cpu=2.0,
+    memory=4096,
+    secrets=[secrets],
+    volumes=artifact_volumes,
+    retries=0
+)
+def render_segment_batch(jobs: list):
     """
-    from playwright.sync_api import sync_playwright
-    import subprocess
-    import time
+    Render several segments in one container with one shared browser, yielding
+    each result as soon as that segment finishes.
     
-    # Import config
+    Args:
+        jobs: list of dicts with segment, audio_ref, audio_duration, animation_html, output_ref
+        
+    Yields:
+        {'index': int, 'video_ref': str, 'seconds': float} or
+        {'index': int, 'error': str, 'seconds': float}, where seconds is the
+        render time of that segment alone
+    """
     import sys
     sys.path.insert(0, '/root')
-    from video_config import FFMPEG_TIMEOUT_SECONDS
-    
-    segment_index = segment['index']
-    segment_text = segment['text']
-    
-    print(f"🎨 [{segment_index}] Starting: {segment_text[:40]}...")
-    print(f"    Audio duration: {audio_duration:.1f}s")
-    print(f"    Animation HTML: {len(animation_html)} chars")
-    
-    # STEP 1: Decode audio from base64
+    from video_assets import get_asset_bundle
+    from video_config import ASSET_BUNDLE_DIR, RENDER_CAPTURE_MODE
+    from video_renderer import BrowserPool
+    
+    browser_pool = BrowserPool(
+        size=1,
+        capture_mode=RENDER_CAPTURE_MODE,
+        asset_bundle=get_asset_bundle(ASSET_BUNDLE_DIR)
+    )
     try:
-        audio_bytes = base64.b64decode(audio_base64)
-        if len(audio_bytes) < 1000:
-            raise Exception(f"Audio too small: {len(audio_bytes)} bytes")
-    except Exception as e:
-        raise Exception(f"Audio decode failed: {e}")
-    
-    # Save audio to temp file
-    audio_path = f'/tmp/audio_{segment_index}.wav'
-    with open(audio_path, 'wb') as f:
-        f.write(audio_bytes)
-    
-    print(f"✓ [{segment_index}] Audio decoded: {len(audio_bytes)} bytes")
+        yield from _render_segment_batch(jobs, browser_pool)
+    finally:
+        print(f"🌐 Browser pool stats: {browser_pool.stats()}")
+        browser_pool.close()
+
+
+@app.cls(
+    image=render_image,
+    timeout=1200,
+    cpu=2.0,
+    memory=4096,
+    secrets=[secrets],
+    volumes=artifact_volumes,
+    retries=0,
+    scaledown_window=300
+)
+class SegmentRenderWorker:
+    """
+    Render worker mode: keeps a warm Chromium pool alive for the lifetime of the
+    container, so consecutive segments (from any video) skip the browser cold start.
+    """
     
-    # STEP 2: Calculate video duration (minimum 12 seconds)
-    video_duration_ms = max(int(audio_duration * 1000) + 1000, 12000)
-    video_duration_sec = video_duration_ms / 1000
+    @modal.enter()
+    def start_browser_pool(self):
+        import sys
+        sys.path.insert(0, '/root')
+        from video_assets import get_asset_bundle
+        from video_config import (
+            ASSET_BUNDLE_DIR,
+            RENDER_BROWSER_POOL_SIZE,
+            RENDER_BROWSER_MAX_PAGES,
+            RENDER_CAPTURE_MODE
+        )
+        from video_renderer import BrowserPool
+        
+        self.browser_pool = BrowserPool(
+            size=RENDER_BROWSER_POOL_SIZE,
+            max_pages=RENDER_BROWSER_MAX_PAGES,
+            capture_mode=RENDER_CAPTURE_MODE,
+            asset_bundle=get_asset_bundle(ASSET_BUNDLE_DIR)
+        )
+        self.browser_pool.start()
+    
+    @modal.exit()
+    def stop_browser_pool(self):
+        print(f"🌐 Browser pool stats: {self.browser_pool.stats()}")
+        self.browser_pool.close()
+    
+    @modal.method()
+    def render(self, segment: dict, audio_ref: str, audio_duration: float, animation_html: str, output_ref: str) -> str:
+        """Same contract as render_segment_video, rendered on the warm browser pool"""
+        return _render_segment(
+            segment, audio_ref, audio_duration, animation_html, output_ref,
+            browser_pool=self.browser_pool
+        )
     
-    # STEP 3: Save HTML to temp file
-    html_path = f'/tmp/segment_{segment_index}.html'
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(animation_html)
+    @modal.method()
+    def render_batch(self, jobs: list):
+        """Same contract as render_segment_batch, rendered on the warm browser pool"""
+        yield from _render_segment_batch(jobs, self.browser_pool)
+
+
+def _render_segment_batch(jobs: list, browser_pool):
+    for job in jobs:
+        segment_index = job['segment']['index']
+        start = time.time()
+        try:
+            video_ref = _render_segment(
+                job['segment'],
+                job['audio_ref'],
+                job['audio_duration'],
+                job['animation_html'],
+                job['output_ref'],
+                browser_pool=browser_pool
+            )
+            yield {'index': segment_index, 'video_ref': video_ref, 'seconds': time.time() - start}
+        except Exception as e:
+            yield {'index': segment_index, 'error': str(e), 'seconds': time.time() - start}
+
+
+def _render_segment(
+    segment: dict,
+    audio_ref: str,
+    audio_duration: float,
+    animation_html: str,
+    output_ref: str,
+    browser_pool=None
+) -> str:
+    """Shared render body for render_segment_video and SegmentRenderWorker"""
+    import math
     
-    print(f"✓ [{segment_index}] HTML saved")
+    # Import config
+    import sys
+    sys.path.insert(0, '/root')
+    from video_config import (
+        ASSET_BUNDLE_DIR,
+        FFMPEG_TIMEOUT_SECONDS,
+        RENDER_CAPTURE_MODE,
+        RENDER_FPS,
+        RENDER_FRAME_QUALITY,
+        RENDER_READY_TIMEOUT_MS,
+        RENDER_IDLE_TAIL,
+        RENDER_IDLE_CONFIRM_SECONDS,
+        RENDER_IDLE_STATIC_SECONDS
+    )
+    from video_artifact_store import get_artifact_store
+    from video_assets import get_asset_bundle
+    from video_design_system import is_scene_fragment, render_document
+    from video_renderer import render_segment_capture
+    from video_workspace import Workspace
     
-    # STEP 4: Render with Playwright - CAPTURE ENTIRE VIEWPORT
-    video_path = f'/tmp/segment_{segment_index}_recording.webm'
+    segment_index = segment['index']
+    segment_text = segment['text']
     
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-features=IsolateOrigins',
-                    '--disable-site-isolation-trials',
-                    '--allow-running-insecure-content',
-                    '--disable-blink-features=AutomationControlled'
-                ]
-            )
-            
-            # ================================================================
-            # KEY FIX: Enable video recording on the context
-            # This captures ENTIRE viewport (canvas + HTML overlays)
-            # ================================================================
-            context = browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                device_scale_factor=1,
-                bypass_csp=True,
-                ignore_https_errors=True,
-                record_video_dir='/tmp',  # Enable video recording
-                record_video_size={'width': 1920, 'height': 1080}  # Full HD
-            )
-            
-            page = context.new_page()
-            
-            # Console logging
-            def handle_console(msg):
-                text = msg.text
-                if 'chunk' not in text.lower():  # Don't log chunk messages
-                    print(f"  Browser [{msg.type}]: {text}")
-            
-            def handle_error(err):
-                error_msg = str(err)
-                print(f"  Browser Error: {error_msg}")
-            
-            page.on('console', handle_console)
-            page.on('pageerror', handle_error)
-            
-            # Navigate to HTML
-            print(f"  📄 Loading HTML file...")
-            page.goto(f'file://{html_path}', wait_until='networkidle', timeout=30000)
-            
-            # Wait for page to be ready
-            print(f"  ⏳ Waiting for page ready...")
-            page.wait_for_timeout(2000)
-            
-            # Check if GSAP loaded
-            gsap_loaded = page.evaluate("typeof gsap !== 'undefined'")
-            lucide_loaded = page.evaluate("typeof lucide !== 'undefined'")
-            
-            print(f"  📦 Library status:")
-            print(f"     GSAP: {'✅ Loaded' if gsap_loaded else '❌ NOT LOADED'}")
-            print(f"     Lucide: {'✅ Loaded' if lucide_loaded else '❌ NOT LOADED'}")
-            
-            # CRITICAL: If GSAP didn't load, FAIL
-            if not gsap_loaded:
-                context.close()
-                browser.close()
-                raise Exception(f"GSAP library failed to load")
-            
-            # Initialize Lucide icons
-            try:
-                page.evaluate("if (typeof lucide !== 'undefined') lucide.createIcons();")
-            except:
-                pass
-            
-            # Wait for animations to initialize
-            print(f"  ⏳ Waiting for animations to initialize...")
-            page.wait_for_timeout(1000)
-            
-            print(f"  ✓ Animation ready")
-            
-            # ================================================================
-            # RECORDING: Playwright records entire viewport automatically
-            # ================================================================
-            print(f"  📹 Recording viewport for {video_duration_sec:.1f}s...")
-            
-            # Just wait for the duration - Playwright is recording
-            start_time = time.time()
-            page.wait_for_timeout(int(video_duration_ms))
-            actual_duration = time.time() - start_time
-            
-            print(f"  ✓ Recording complete ({actual_duration:.1f}s)")
-            
-            # Close page to finalize video
-            page.close()
-            context.close()
-            browser.close()
-        
-        # ================================================================
-        # Get the recorded video file
-        # Playwright saves it with a random name in /tmp
-        # ================================================================
-        import glob
-        import shutil
+    print(f"🎨 [{segment_index}] Starting: {segment_text[:40]}...")
+    print(f"    Audio duration: {audio_duration:.2f}s")
+    if segment.get('audio'):
+        audio_info = segment['audio']
+        print(f"    Audio: {audio_info['sample_rate']}Hz x{audio_info['channels']}, "
+              f"silence {audio_info['leading_silence']:.2f}s/{audio_info['trailing_silence']:.2f}s, "
+              f"{audio_info['rms_dbfs']:.1f} dBFS")
+    if is_scene_fragment(animation_html):
+        print(f"    Animation HTML: {len(animation_html)} chars (fragment, design system {segment.get('design_system')})")
+    else:
+        print(f"    Animation HTML: {len(animation_html)} chars")
+    
+    # STEP 1: Resolve audio artifact (read in place from the shared store)
+    artifact_store = get_artifact_store()
+    artifact_store.reload()
+    
+    audio_size = artifact_store.size(audio_ref)
+    if audio_size < 1000:
+        raise Exception(f"Audio artifact missing or too small: {audio_ref} ({audio_size} bytes)")
+    
+    audio_path = artifact_store.path(audio_ref)
+    
+    print(f"✓ [{segment_index}] Audio resolved: {audio_size} bytes")
+    
+    # STEP 2: Calculate video duration. audio_duration is exact (parsed from the WAV)
+    # and the encode stops at the end of the audio (-shortest), so capture only
+    # needs frames up to it
+    video_duration_sec = math.ceil(audio_duration * RENDER_FPS) / RENDER_FPS
+    
+    # STEP 3: Save HTML in this render's own workspace (concurrent renders in one
+    # container never share paths; removed however the render ends)
+    with Workspace.create(f'render-{segment_index}') as workspace:
+        html_path = workspace.path('segment.html')
+        with open(html_path, 'w', encoding='utf-8') as f:
+            # Fragments get their design system prelude here, served from memory by the browser pool
+            f.write(render_document(animation_html, segment.get('design_system')))
         
-        # Find the most recently created .webm file
-        webm_files = glob.glob('/tmp/*.webm')
-        if not webm_files:
-            raise Exception("No video file created by Playwright")
+        print(f"✓ [{segment_index}] HTML saved")
         
-        # Get the newest file
-        latest_webm = max(webm_files, key=os.path.getctime)
+        mp4_path = workspace.path('segment_final.mp4')
         
-        # Move to our expected path
-        shutil.move(latest_webm, video_path)
+        # STEP 4: Capture frames (virtual-time steps or realtime screencast) piped
+        # straight into ffmpeg; frames + audio are encoded once at the final settings
+        try:
+            capture = render_segment_capture(
+                html_path=html_path,
+                audio_path=audio_path,
+                output_path=mp4_path,
+                duration_sec=video_duration_sec,
+                segment_index=segment_index,
+                fps=RENDER_FPS,
+                quality=RENDER_FRAME_QUALITY,
+                ffmpeg_timeout=FFMPEG_TIMEOUT_SECONDS,
+                capture_mode=RENDER_CAPTURE_MODE,
+                browser_pool=browser_pool,
+                ready_timeout_ms=RENDER_READY_TIMEOUT_MS,
+                asset_bundle=None if browser_pool else get_asset_bundle(ASSET_BUNDLE_DIR),
+                idle_tail=RENDER_IDLE_TAIL,
+                idle_confirm_sec=RENDER_IDLE_CONFIRM_SECONDS,
+                idle_static_sec=RENDER_IDLE_STATIC_SECONDS
+            )
+        except Exception as e:
+            print(f"❌ [{segment_index}] Rendering FAILED: {e}")
+            raise Exception(f"Segment {segment_index} rendering failed: {e}")
         
-        webm_size = os.path.getsize(video_path)
-        print(f"✓ [{segment_index}] Video captured: {webm_size} bytes")
+        # STEP 5: Verify MP4
+        if not os.path.exists(mp4_path) or os.path.getsize(mp4_path) < 10000:
+            raise Exception(f"MP4 invalid")
         
-        if webm_size < 10000:
-            raise Exception(f"Video file too small: {webm_size} bytes")
+        # STEP 6: Publish MP4 to the artifact store (moved, not copied into memory)
+        mp4_size = os.path.getsize(mp4_path)
+        artifact_store.put_file(output_ref, mp4_path, move=True)
+        artifact_store.commit()
         
-    except Exception as e:
-        print(f"❌ [{segment_index}] Rendering FAILED: {e}")
-        raise Exception(f"Segment {segment_index} rendering failed: {e}")
-    
-    # STEP 5: Verify video file
-    if not os.path.exists(video_path) or os.path.getsize(video_path) < 10000:
-        raise Exception(f"Video file invalid: {video_path}")
-    
-    # STEP 6: Merge with audio using FFmpeg
-    mp4_path = f'/tmp/segment_{segment_index}_final.mp4'
-    
-    try:
-        result = subprocess.run([
-            'ffmpeg', '-y',
-            '-i', video_path,
-            '-i', audio_path,
-            
-            # ✅ VIDEO ENCODING - NORMALIZED FOR CONCATENATION
-            '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-profile:v', 'high',
-            '-level', '4.0',
-            '-pix_fmt', 'yuv420p',
-            
-            # ✅ FRAME RATE & TIMING
-            '-r', '30',
-            '-video_track_timescale', '30000',
-            '-vsync', 'cfr',
-            
-            # ✅ GOP & KEYFRAMES
-            '-g', '30',
-            '-keyint_min', '30',
-            '-sc_threshold', '0',
-            
-            # ✅ BITRATE CONTROL
-            '-b:v', '5000k',
-            '-maxrate', '5500k',
-            '-bufsize', '10000k',
-            
-            # ✅ STREAMING OPTIMIZATION
-            '-movflags', '+faststart',
-            
-            # ✅ AUDIO ENCODING - NORMALIZED
-            '-c:a', 'aac',
-            '-b:a', '128k',
-            '-ar', '48000',
-            '-ac', '2',
-            
-            '-shortest',
-            mp4_path
-        ], capture_output=True, text=True, timeout=FFMPEG_TIMEOUT_SECONDS)
-        
-        if result.returncode != 0:
-            raise Exception(f"FFmpeg failed: {result.stderr[:200]}")
+        print(f"✅ [{segment_index}] Complete: {mp4_size} bytes (5 Mbps, concat-ready), "
+              f"ready in {capture['time_to_ready']:.2f}s ({capture['ready_reason']}), "
+              f"captured {capture['captured_frames']}/{capture['frames']} frames")
         
-    except subprocess.TimeoutExpired:
-        raise Exception(f"FFmpeg timeout after {FFMPEG_TIMEOUT_SECONDS}s")
-    except Exception as e:
-        raise Exception(f"FFmpeg error: {e}")
-    
-    # STEP 7: Verify MP4
-    if not os.path.exists(mp4_path) or os.path.getsize(mp4_path) < 10000:
-        raise Exception(f"MP4 invalid")
-    
-    # STEP 8: Read MP4 and encode as base64
-    with open(mp4_path, 'rb') as f:
-        mp4_bytes = f.read()
-    
-    mp4_base64 = base64.b64encode(mp4_bytes).decode('utf-8')
-    
-    print(f"✅ [{segment_index}] Complete: {len(mp4_bytes)} bytes (5 Mbps, concat-ready)")
-    
-    # Cleanup
-    try:
-        os.remove(html_path)
-        os.remove(video_path)
-        os.remove(audio_path)
-        os.remove(mp4_path)
-    except:
-        pass
-    
-    return mp4_base64
+    return output_ref
 
 
 @app.function(
     image=base_image,
     secrets=[secrets],
+    volumes=artifact_volumes,
     timeout=3600,
     cpu=2.0,
     memory=4096,
@@ -324,16 +320,38 @@ async def process_video_generation(request_dict: dict):
     video_id = request_dict["video_id"]
     user_id = request_dict["user_id"]
     topic_category = request_dict.get("topic_category", "general")
+    resume = request_dict.get("resume", False)
     
     try:
-        orchestrator = VideoOrchestrator(supabase=supabase, render_fn=render_segment_video)
+        from video_config import RENDER_WORKER_MODE
         
-        result = await orchestrator.generate_video(
-            video_id=video_id,
-            user_id=user_id,
-            topic_category=topic_category
+        if RENDER_WORKER_MODE == "pool":
+            render_worker = SegmentRenderWorker()
+            render_fn = render_worker.render
+            render_batch_fn = render_worker.render_batch
+        else:
+            render_fn = render_segment_video
+            render_batch_fn = render_segment_batch
+        
+        orchestrator = VideoOrchestrator(
+            supabase=supabase,
+            render_fn=render_fn,
+            render_batch_fn=render_batch_fn
         )
         
+        if resume:
+            result = await orchestrator.resume_video(
+                video_id=video_id,
+                user_id=user_id,
+                topic_category=topic_category
+            )
+        else:
+            result = await orchestrator.generate_video(
+                video_id=video_id,
+                user_id=user_id,
+                topic_category=topic_category
+            )
+        
         return result
         
     except Exception as e:
@@ -457,4 +475,21 @@ def fastapi_app():
             "concat_optimization": "Normalized encoding for <10s stream-copy"
         })
     
+    @web_app.post("/resume-video")
+    async def resume_video_endpoint(request: GenerateVideoRequest):
+        request_dict = {
+            "video_id": request.video_id,
+            "user_id": request.user_id,
+            "topic_category": request.topic_category,
+            "resume": True
+        }
+        
+        process_video_generation.spawn(request_dict)
+        
+        return JSONResponse({
+            "success": True,
+            "message": "Video generation resumed from its last checkpoint",
+            "video_id": request.video_id
+        })
+    
     return web_app
\ No newline at end of file
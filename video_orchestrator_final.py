@@ -1,12 +1,12 @@
 import os
+import re
+import hashlib
 import asyncio
 import subprocess
-import requests
 import time
-import base64
 import random
-from typing import List, Dict, Any, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import math
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
 
 from video_config import (
     TOTAL_SEGMENTS,
@@ -14,32 +14,122 @@ from video_config import (
     FFMPEG_TIMEOUT_SECONDS,
     MAX_RETRY_ATTEMPTS,
     AUDIO_GENERATION_WORKERS,
-    AUDIO_API_TIMEOUT,
+    AUDIO_SILENCE_THRESHOLD_DB,
+    AUDIO_MIN_RMS_DBFS,
+    AUDIO_MIN_DURATION,
+    TTS_VOICE,
+    TTS_MODEL,
+    TTS_RESPONSE_FORMAT,
     VIDEO_RENDER_WORKERS,
+    RENDER_SEGMENTS_PER_CALL,
+    RENDER_STREAM_BATCHING,
+    RENDER_STREAM_BATCH_MAX_WAIT,
+    RENDER_BATCH_TIMEOUT,
+    RENDER_SEGMENT_TIMEOUT,
+    RENDER_RETRY_BUDGET,
+    RENDER_MAX_ATTEMPTS_PER_SEGMENT,
+    SPECULATIVE_RENDER_PERCENTILE,
+    SPECULATIVE_RENDER_FACTOR,
+    SPECULATIVE_RENDER_MIN_SAMPLES,
+    SPECULATIVE_RENDER_MIN_SECONDS,
+    SPECULATIVE_RENDER_MAX,
+    PIPELINE_MODE,
+    PIPELINE_TTS_CONCURRENCY,
+    PIPELINE_ANIMATION_CONCURRENCY,
+    PIPELINE_RENDER_CONCURRENCY,
+    PIPELINE_REPORT_INTERVAL,
+    SCRIPT_STREAMING,
     USE_AI_ANIMATIONS,
     ANIMATION_GENERATION_TIMEOUT,
+    ANIMATION_GENERATION_CONCURRENCY,
+    ANIMATION_BATCH_ENABLED,
+    ANIMATION_BATCH_MAX_WAIT,
+    ANIMATION_BATCH_SECONDS_PER_SCENE,
+    DESIGN_SYSTEM_ENABLED,
+    CATEGORY_DESIGN_SYSTEMS,
     BACKGROUND_MUSIC_FILES,
     BGM_VOLUME,
     TRANSITION_DURATION,
-    TRANSITION_TYPES
+    TRANSITION_TYPES,
+    CONCAT_ENGINE,
+    CONCAT_WORKERS,
+    CONCAT_FAN_IN
 )
 from video_animation_agent import VideoAnimationAgent
+from video_design_system import DEFAULT_DESIGN_SYSTEM, render_document
 from video_metadata_generator import VideoMetadataGenerator
+from video_pipeline import MicroBatcher, SegmentPipeline, PipelineStage
+from video_artifact_store import ArtifactStore, get_artifact_store
+from video_audio_analysis import analyze_wav
+from video_metrics import LatencyHistogram
+from video_render_scheduler import RenderScheduler
+from video_tts_client import TTSError, get_tts_client
+from video_cache import RenderCache, get_audio_cache, get_render_cache
+from video_checkpoint import JobCheckpoint
+from video_concat import ConcatError, SmartConcatEngine
+from video_workspace import Workspace
 
 
 class VideoOrchestrator:
-    def __init__(self, supabase, render_fn):
+    def __init__(self, supabase, render_fn, render_batch_fn=None, artifact_store: Optional[ArtifactStore] = None):
         self.supabase = supabase
         self.render_fn = render_fn
+        self.render_batch_fn = render_batch_fn
+        self.artifact_store = artifact_store or get_artifact_store()
+        self.job_id = None
+        self.design_system: Optional[str] = None
+        self.checkpoint: Optional[JobCheckpoint] = None
+        self.workspace: Optional[Workspace] = None
+        self.render_latency = LatencyHistogram('render latency')
+        self.render_scheduler = self._create_render_scheduler()
         self.groq_api_key = os.getenv('GROQ_API_KEY')
+        self.tts_client = get_tts_client(self.groq_api_key)
+        self.audio_cache = get_audio_cache(self.artifact_store)
+        self.render_cache = get_render_cache(self.artifact_store)
+        self._render_cache_keys: Dict[int, str] = {}
         self.total_segments = TOTAL_SEGMENTS
         self.animation_agent = VideoAnimationAgent()
         self.metadata_generator = VideoMetadataGenerator()
+        self.animation_semaphore = asyncio.Semaphore(ANIMATION_GENERATION_CONCURRENCY)
+        self.animation_batcher = None
+        if ANIMATION_BATCH_ENABLED and USE_AI_ANIMATIONS:
+            self.animation_batcher = MicroBatcher(
+                'animation',
+                self._generate_animation_batch,
+                self.animation_agent.batch_size,
+                ANIMATION_BATCH_MAX_WAIT
+            )
+        self.render_batcher = None
+        if RENDER_STREAM_BATCHING and render_batch_fn is not None:
+            self.render_batcher = MicroBatcher(
+                'render',
+                self._render_stream_batch,
+                lambda: self._choose_render_call_size(self.total_segments),
+                RENDER_STREAM_BATCH_MAX_WAIT
+            )
+        
+    async def resume_video(self, video_id: str, user_id: str, topic_category: str):
+        """Re-run a failed job, skipping every phase and segment its checkpoint recorded"""
+        return await self.generate_video(video_id, user_id, topic_category, resume=True)
+    
+    async def generate_video(self, video_id: str, user_id: str, topic_category: str, resume: bool = False):
+        self.job_id = video_id
+        # Deterministic per category, so a resumed job renders its checkpointed fragments the same way
+        self.design_system = None
+        if DESIGN_SYSTEM_ENABLED:
+            self.design_system = CATEGORY_DESIGN_SYSTEMS.get((topic_category or '').lower(), DEFAULT_DESIGN_SYSTEM)
+        self.render_latency = LatencyHistogram('render latency')
+        self.render_scheduler = self._create_render_scheduler()
+        self._render_cache_keys = {}
+        self.workspace = Workspace.create(f'job-{video_id}')
         
-    async def generate_video(self, video_id: str, user_id: str, topic_category: str):
         try:
             self._update_status(video_id, 'generating')
             
+            self.checkpoint = await asyncio.to_thread(JobCheckpoint.start, self.artifact_store, video_id, resume)
+            if resume:
+                print(f"♻️  Resuming from checkpoint: {self.checkpoint.summary()}")
+            
             video_data = self.supabase.table('video_generations').select('*').eq('id', video_id).single().execute()
             video = video_data.data
             prompt = video['prompt']
@@ -51,7 +141,9 @@ class VideoOrchestrator:
             print(f"Topic: {prompt}")
             print(f"Segments: {self.total_segments}")
             print(f"Batch Size: {RENDER_BATCH_SIZE}")
+            print(f"Pipeline: {PIPELINE_MODE}")
             print(f"AI Animations: {'Enabled' if USE_AI_ANIMATIONS else 'Disabled'}")
+            print(f"Design System: {self.design_system or 'off'}")
             print(f"Background Music: {len(BACKGROUND_MUSIC_FILES)} tracks @ {BGM_VOLUME}% volume")
             print(f"Transitions: {len(TRANSITION_TYPES)} types @ {TRANSITION_DURATION}s duration")
             print(f"Streaming: Cloudflare Stream with Adaptive HLS")
@@ -60,92 +152,130 @@ class VideoOrchestrator:
             
             print("📝 PHASE 0: Generating metadata...")
             metadata_start = time.time()
+            metadata = self.checkpoint.phase('metadata')
             
-            if not video.get('title') or video.get('title') == 'Educational Video':
-                print("  🏷️  Generating title...")
-                title = self.metadata_generator.generate_title(prompt)
-                print(f"  ✓ Title: {title}")
+            if metadata:
+                title = metadata['title']
+                description = metadata['description']
+                print(f"  ♻️  Metadata from checkpoint: {title}")
             else:
-                title = video['title']
-                print(f"  ✓ Using existing title: {title}")
-            
-            print("  📄 Generating description...")
-            description = self.metadata_generator.generate_description(prompt, title)
-            print(f"  ✓ Description: {len(description)} characters")
-            
-            self.supabase.table('video_generations').update({
-                'title': title,
-                'description': description
-            }).eq('id', video_id).execute()
+                if not video.get('title') or video.get('title') == 'Educational Video':
+                    print("  🏷️  Generating title...")
+                    title = self.metadata_generator.generate_title(prompt)
+                    print(f"  ✓ Title: {title}")
+                else:
+                    title = video['title']
+                    print(f"  ✓ Using existing title: {title}")
+                
+                print("  📄 Generating description...")
+                description = self.metadata_generator.generate_description(prompt, title)
+                print(f"  ✓ Description: {len(description)} characters")
+                
+                self.supabase.table('video_generations').update({
+                    'title': title,
+                    'description': description
+                }).eq('id', video_id).execute()
+                
+                await asyncio.to_thread(self.checkpoint.complete_phase, 'metadata', {'title': title, 'description': description})
             
             print(f"✅ Metadata complete ({time.time() - metadata_start:.1f}s)\n")
             
-            print("📝 PHASE 1: Generating script with CrewAI...")
+            print("📝 PHASE 1: Generating script...")
             start_time = time.time()
-            
-            segments = await self._generate_script_segments(prompt, topic_category)
-            
-            for i, seg in enumerate(segments):
-                seg['index'] = i
-            
-            print(f"✅ Script complete: {len(segments)} segments ({time.time() - start_time:.1f}s)\n")
-            
-            print(f"🔊 PHASE 2: Generating audio ({AUDIO_GENERATION_WORKERS} workers)...")
-            audio_start = time.time()
-            
-            audio_results = await self._generate_audio_parallel_with_retries(segments)
-            
-            successful_audio = sum(1 for r in audio_results if r[0] is not None)
-            print(f"✅ Audio complete: {successful_audio}/{len(segments)} successful ({time.time() - audio_start:.1f}s)\n")
-            
-            print("🎬 PHASE 3: Preparing video rendering...")
-            
-            valid_pairs = []
-            for segment, (audio_b64, duration) in zip(segments, audio_results):
-                if audio_b64:
-                    valid_pairs.append((segment, audio_b64, duration))
+            segments = self.checkpoint.script_segments()
+            script_stream = None
+            
+            if segments:
+                print(f"  ♻️  Script from checkpoint")
+                print(f"✅ Script complete: {len(segments)} segments ({time.time() - start_time:.1f}s)\n")
+            elif PIPELINE_MODE == "streamed" and SCRIPT_STREAMING:
+                # Filled in place as segments stream into the pipeline
+                segments = []
+                written = self.checkpoint.streamed_script_segments()
+                if written:
+                    print(f"  ♻️  {len(written)} streamed segments from checkpoint, continuing the script")
+                script_stream = self._stream_script_segments(prompt, topic_category, segments, written)
+                print(f"  🌊 Script streams straight into the segment pipeline\n")
+            else:
+                segments = await self._generate_script_segments(prompt, topic_category)
+                
+                for i, seg in enumerate(segments):
+                    seg['index'] = i
+                
+                # Artifacts checkpointed for an earlier, unfinished script belong to other text
+                await asyncio.to_thread(self.checkpoint.bind_script_segments, segments)
+                await asyncio.to_thread(self.checkpoint.complete_phase, 'script', {'segments': segments})
+                print(f"✅ Script complete: {len(segments)} segments ({time.time() - start_time:.1f}s)\n")
+            
+            concat = self.checkpoint.phase('concat')
+            upload = self.checkpoint.phase('upload')
+            
+            # Once uploaded, the final cut (and everything before it) is no longer needed
+            if concat and (upload or self.artifact_store.size(concat['final_ref']) > 100000):
+                print(f"♻️  PHASES 2-5: Final video from checkpoint\n")
+                final_video_path = self.artifact_store.path(concat['final_ref'])
+                successful_videos = concat['segments_rendered']
+                total_duration = concat['duration']
+                concat_time = concat['concat_time']
+            else:
+                if PIPELINE_MODE == "streamed":
+                    video_files, segment_durations = await self._produce_videos_streamed(segments, script_stream)
                 else:
-                    print(f"⚠️  Skipping segment {segment['index']}: No valid audio")
-            
-            if len(valid_pairs) == 0:
-                raise Exception("No segments with valid audio")
-            
-            print(f"✓ Ready to render: {len(valid_pairs)} segments\n")
-            
-            print(f"🎥 PHASE 4: Rendering videos with AI animations (5 Mbps, normalized)...")
-            video_start = time.time()
-            
-            video_files = await self._render_videos_in_batches(valid_pairs)
-            
-            successful_videos = len(video_files)
-            print(f"✅ Videos complete: {successful_videos}/{len(valid_pairs)} successful ({time.time() - video_start:.1f}s)\n")
-            
-            if len(video_files) == 0:
-                raise Exception("No videos were successfully rendered")
-            
-            print("🎞️  PHASE 5: Concatenating with transitions + background music...")
-            concat_start = time.time()
-            
-            final_video_path = await self._concatenate_videos_with_transitions(video_files)
-            
-            concat_time = time.time() - concat_start
-            print(f"✅ Concatenation complete ({concat_time:.1f}s)\n")
+                    video_files, segment_durations = await self._produce_videos_phased(segments)
+                
+                # Segment updates are debounced; persist the tail of the stage
+                await asyncio.to_thread(self.checkpoint.flush)
+                
+                successful_videos = len(video_files)
+                
+                if len(video_files) == 0:
+                    raise Exception("No videos were successfully rendered")
+                
+                total_duration = sum(
+                    segment_durations.get(self._segment_index_from_path(path), 0.0) for path in video_files
+                )
+                if total_duration == 0:
+                    total_duration = len(video_files) * 12
+                
+                print("🎞️  PHASE 5: Concatenating with transitions + background music...")
+                concat_start = time.time()
+                
+                final_video_path = await self._concatenate_videos_with_transitions(video_files, segment_durations)
+                
+                concat_time = time.time() - concat_start
+                print(f"✅ Concatenation complete ({concat_time:.1f}s)\n")
+                
+                # Keep the final cut on the artifact store so a failed upload can resume from it
+                final_ref = self._job_artifact_ref('final', 'final_video.mp4')
+                await asyncio.to_thread(self.artifact_store.put_file, final_ref, final_video_path, True)
+                final_video_path = self.artifact_store.path(final_ref)
+                await asyncio.to_thread(self.checkpoint.complete_phase, 'concat', {
+                    'final_ref': final_ref,
+                    'duration': total_duration,
+                    'segments_rendered': successful_videos,
+                    'concat_time': concat_time
+                })
             
             print("☁️  PHASE 6: Uploading to Cloudflare Stream...")
             upload_start = time.time()
             
-            cloudflare_uid, hls_url, mp4_url = await self._upload_to_cloudflare_stream(
-                final_video_path, 
-                video_id, 
-                title
-            )
+            if upload:
+                cloudflare_uid, hls_url, mp4_url = upload['cloudflare_uid'], upload['hls_url'], upload['mp4_url']
+                print(f"  ♻️  Upload from checkpoint: {cloudflare_uid}")
+            else:
+                cloudflare_uid, hls_url, mp4_url = await self._upload_to_cloudflare_stream(
+                    final_video_path, 
+                    video_id, 
+                    title
+                )
+                await asyncio.to_thread(self.checkpoint.complete_phase, 'upload', {
+                    'cloudflare_uid': cloudflare_uid,
+                    'hls_url': hls_url,
+                    'mp4_url': mp4_url
+                })
             
             print(f"✅ Upload complete ({time.time() - upload_start:.1f}s)\n")
             
-            total_duration = sum(duration for _, _, duration in valid_pairs if duration > 0)
-            if total_duration == 0:
-                total_duration = len(video_files) * 12
-            
             self.supabase.table('video_generations').update({
                 'cloudflare_video_uid': cloudflare_uid,
                 'video_url': hls_url,
@@ -155,7 +285,11 @@ class VideoOrchestrator:
                 'generation_error': None
             }).eq('id', video_id).execute()
             
-            await self._deduct_tokens(user_id, video_id, len(segments))
+            if not self.checkpoint.phase('tokens'):
+                await self._deduct_tokens(user_id, video_id, len(segments))
+                await asyncio.to_thread(self.checkpoint.complete_phase, 'tokens')
+            
+            await asyncio.to_thread(self._cleanup_job_artifacts)
             
             print(f"{'='*70}")
             print(f"✨ COMPLETE - CLOUDFLARE STREAM READY")
@@ -193,7 +327,151 @@ class VideoOrchestrator:
             import traceback
             traceback.print_exc()
             self._update_status(video_id, 'failed', str(e))
+            # Artifacts and the checkpoint stay on the store for resume_video
+            if self.checkpoint is not None:
+                try:
+                    await asyncio.to_thread(self.checkpoint.flush)
+                except Exception as flush_error:
+                    print(f"⚠️  Checkpoint flush failed: {flush_error}")
+                print(f"💾 Checkpoint kept for resume: {self.checkpoint.summary()}")
             raise
+        finally:
+            # Scratch only; anything worth keeping is on the artifact store by now
+            self.workspace.cleanup()
+    
+    async def _produce_videos_phased(self, segments: List[Dict]) -> Tuple[List[str], Dict[int, float]]:
+        print(f"🔊 PHASE 2: Generating audio ({AUDIO_GENERATION_WORKERS} workers)...")
+        audio_start = time.time()
+        
+        audio_results = await self._generate_audio_parallel_with_retries(segments)
+        
+        successful_audio = sum(1 for r in audio_results if r[0] is not None)
+        print(f"✅ Audio complete: {successful_audio}/{len(segments)} successful ({time.time() - audio_start:.1f}s)\n")
+        
+        print("🎬 PHASE 3: Preparing video rendering...")
+        
+        valid_pairs = []
+        for segment, (audio_ref, duration) in zip(segments, audio_results):
+            if audio_ref:
+                valid_pairs.append((segment, audio_ref, duration))
+            else:
+                print(f"⚠️  Skipping segment {segment['index']}: No valid audio")
+        
+        if len(valid_pairs) == 0:
+            raise Exception("No segments with valid audio")
+        
+        print(f"✓ Ready to render: {len(valid_pairs)} segments\n")
+        
+        print(f"🎥 PHASE 4: Rendering videos with AI animations (5 Mbps, normalized)...")
+        video_start = time.time()
+        
+        video_files = await self._render_videos_in_batches(valid_pairs)
+        
+        successful_videos = len(video_files)
+        print(f"✅ Videos complete: {successful_videos}/{len(valid_pairs)} successful ({time.time() - video_start:.1f}s)\n")
+        
+        if len(video_files) == 0:
+            raise Exception("No videos were successfully rendered")
+        
+        return video_files, {segment['index']: duration for segment, _, duration in valid_pairs}
+    
+    async def _produce_videos_streamed(
+        self,
+        segments: List[Dict],
+        script_stream: Optional[AsyncIterator[Dict[str, Any]]] = None
+    ) -> Tuple[List[str], Dict[int, float]]:
+        print(f"🚀 PHASES 2-4: Streaming segments through TTS → animation → render")
+        print(f"   Concurrency: tts={PIPELINE_TTS_CONCURRENCY} animation={PIPELINE_ANIMATION_CONCURRENCY} render={PIPELINE_RENDER_CONCURRENCY}")
+        pipeline_start = time.time()
+        
+        pipeline = SegmentPipeline(
+            stages=[
+                PipelineStage('tts', self._pipeline_tts_stage, PIPELINE_TTS_CONCURRENCY),
+                PipelineStage('animation', self._pipeline_animation_stage, PIPELINE_ANIMATION_CONCURRENCY),
+                PipelineStage('render', self._pipeline_render_stage, PIPELINE_RENDER_CONCURRENCY)
+            ],
+            report_interval=PIPELINE_REPORT_INTERVAL
+        )
+        
+        if script_stream is None:
+            results = await pipeline.run([{'segment': seg} for seg in segments])
+        else:
+            pipeline.start()
+            async for segment in script_stream:
+                await pipeline.submit({'segment': segment})
+            results = await pipeline.join()
+        
+        video_files = [item['video_path'] for item in results]
+        durations = {item['segment']['index']: item['duration'] for item in results}
+        
+        print(f"  ⏱️  {self.tts_client.latency.format()}")
+        print(f"  🔊 TTS client: {self.tts_client.stats()}")
+        if self.animation_agent.llm_client is not None:
+            print(f"  🧠 LLM client: {self.animation_agent.llm_client.stats()}")
+        if self.animation_batcher is not None:
+            print(f"  📦 Animation batches: {self.animation_batcher.stats()}")
+        if self.audio_cache is not None:
+            print(f"  🗃️  Audio cache: {self.audio_cache.stats()}")
+        if self.render_batcher is not None:
+            print(f"  📦 Render batches: {self.render_batcher.stats()}")
+        print(f"  ⏱️  {self.render_latency.format()}")
+        print(f"  🐢 Scheduler: {self.render_scheduler.stats()}")
+        if self.render_cache is not None:
+            print(f"  🗃️  Render cache: {self.render_cache.stats()}")
+        print(f"✅ Pipeline complete: {len(video_files)}/{len(segments)} segments rendered ({time.time() - pipeline_start:.1f}s)\n")
+        
+        return video_files, durations
+    
+    async def _pipeline_tts_stage(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        segment = item['segment']
+        audio_ref, duration = await self._generate_single_audio_with_retry(segment)
+        
+        if not audio_ref:
+            print(f"  ⚠️  Skipping segment {segment['index']}: No valid audio")
+            return None
+        
+        print(f"  🔊 Audio {segment['index']}: ✓ ({duration:.1f}s)")
+        item['audio_ref'] = audio_ref
+        item['duration'] = duration
+        return item
+    
+    async def _pipeline_animation_stage(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        item['animation_html'] = await self._generate_segment_animation(item['segment'])
+        return item
+    
+    async def _pipeline_render_stage(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        segment = item['segment']
+        video_path = await self._lookup_cached_render(segment, item['duration'], item['animation_html'])
+        
+        if video_path:
+            print(f"    Video {segment['index']}: ♻️  cached render ({os.path.getsize(video_path)//1024} KB)")
+        else:
+            make_args = self._render_args_factory(segment, item['audio_ref'], item['duration'], item['animation_html'])
+            
+            if self.render_batcher is not None:
+                video_ref = await self.render_batcher.submit(item)
+                if not video_ref:
+                    print(f"    🔁 Segment {segment['index']}: batched render failed, retrying individually")
+                    video_ref = await self.render_scheduler.render(
+                        segment['index'], make_args, time.time() + RENDER_SEGMENT_TIMEOUT, retry=True
+                    )
+            else:
+                video_ref = await self.render_scheduler.render(
+                    segment['index'], make_args, time.time() + RENDER_SEGMENT_TIMEOUT
+                )
+            
+            video_path = await self._resolve_rendered_video(segment['index'], video_ref)
+            
+            if not video_path:
+                print(f"    Video {segment['index']}: ✗ Invalid render output")
+                return None
+            
+            print(f"    Video {segment['index']}: ✓ ({os.path.getsize(video_path)//1024} KB)")
+        
+        # Audio is no longer needed once the segment is rendered
+        self.artifact_store.delete(item.pop('audio_ref'))
+        item['video_path'] = video_path
+        return item
     
     async def _generate_script_segments(self, prompt: str, category: str) -> List[Dict[str, Any]]:
         from video_script_agent import VideoScriptAgent
@@ -203,82 +481,152 @@ class VideoOrchestrator:
         
         return segments
     
+    async def _stream_script_segments(
+        self,
+        prompt: str,
+        category: str,
+        collected: List[Dict[str, Any]],
+        written: Optional[List[Dict[str, Any]]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield script segments as the model writes them.
+
+        Each segment is checkpointed before it is yielded, so a resumed job first
+        replays the `written` segments of its interrupted stream and then asks the
+        model to continue after them. The script phase completes once the stream ends.
+        """
+        from video_script_agent import VideoScriptAgent
+        
+        start_time = time.time()
+        agent = VideoScriptAgent()
+        
+        for segment in written or []:
+            collected.append(segment)
+            yield segment
+        
+        async for segment in agent.stream_script_segments(prompt, category, self.total_segments, written=written):
+            segment['index'] = len(collected)
+            collected.append(segment)
+            await asyncio.to_thread(self.checkpoint.add_script_segment, segment)
+            print(f"  📝 Script segment {segment['index']} ready ({time.time() - start_time:.1f}s)")
+            yield segment
+        
+        await asyncio.to_thread(self.checkpoint.complete_phase, 'script', {'segments': collected})
+        print(f"✅ Script complete: {len(collected)} segments ({time.time() - start_time:.1f}s)")
+    
     async def _generate_audio_parallel_with_retries(
         self,
         segments: List[Dict]
     ) -> List[Tuple[Optional[str], float]]:
-        audio_results = [(None, 0.0)] * len(segments)
+        semaphore = asyncio.Semaphore(AUDIO_GENERATION_WORKERS)
+        progress = {'completed': 0, 'total': len(segments)}
         
-        with ThreadPoolExecutor(max_workers=AUDIO_GENERATION_WORKERS) as executor:
-            future_to_index = {
-                executor.submit(self._generate_single_audio_with_retry, seg): seg['index']
-                for seg in segments
-            }
-            
-            completed = 0
-            total = len(segments)
-            
-            for future in as_completed(future_to_index):
-                index = future_to_index[future]
-                completed += 1
-                
-                try:
-                    audio_b64, duration = future.result()
-                    audio_results[index] = (audio_b64, duration)
-                    status = "✓" if audio_b64 else "✗"
-                    print(f"  [{completed}/{total}] Audio {index}: {status} ({duration:.1f}s)")
-                except Exception as e:
-                    print(f"  [{completed}/{total}] Audio {index}: ✗ {e}")
-                    audio_results[index] = (None, 0.0)
+        async def generate(segment: Dict) -> Tuple[Optional[str], float]:
+            async with semaphore:
+                audio_ref, duration = await self._generate_single_audio_with_retry(segment)
+            
+            progress['completed'] += 1
+            status = "✓" if audio_ref else "✗"
+            print(f"  [{progress['completed']}/{progress['total']}] Audio {segment['index']}: {status} ({duration:.1f}s)")
+            return audio_ref, duration
+        
+        audio_results = await asyncio.gather(*(generate(seg) for seg in segments))
+        print(f"  ⏱️  {self.tts_client.latency.format()}")
+        print(f"  🔊 TTS client: {self.tts_client.stats()}")
+        if self.animation_agent.llm_client is not None:
+            print(f"  🧠 LLM client: {self.animation_agent.llm_client.stats()}")
+        if self.animation_batcher is not None:
+            print(f"  📦 Animation batches: {self.animation_batcher.stats()}")
+        if self.audio_cache is not None:
+            print(f"  🗃️  Audio cache: {self.audio_cache.stats()}")
         
-        return audio_results
+        return list(audio_results)
     
-    def _generate_single_audio_with_retry(
+    async def _generate_single_audio_with_retry(
         self,
         segment: Dict,
         max_retries: int = MAX_RETRY_ATTEMPTS
     ) -> Tuple[Optional[str], float]:
+        """
+        Synthesize, validate and store one segment's narration.
+        HTTP-level retries (429/5xx) and rate limiting live in the TTS client; this
+        loop only re-requests audio that came back unusable.
+        """
         segment_index = segment['index']
-        segment_text = segment['text']
+        tts_params = (segment['text'], TTS_VOICE, TTS_MODEL, TTS_RESPONSE_FORMAT)
+        
+        checkpointed = self.checkpoint.segment(segment_index) if self.checkpoint else {}
+        if checkpointed.get('audio') and (
+            self.checkpoint.segment_artifact(segment_index, 'audio_ref', 1000)
+            or self._checkpointed_video_ref(segment_index)
+        ):
+            segment['audio'] = checkpointed['audio']
+            return (checkpointed['audio_ref'], checkpointed['duration'])
+        
+        if self.audio_cache is not None:
+            cached = await asyncio.to_thread(self.audio_cache.get, *tts_params)
+            if cached is not None:
+                audio_ref, audio_info = await asyncio.to_thread(self._store_audio, segment_index, cached[0], cached[1])
+                segment['audio'] = audio_info
+                return (audio_ref, audio_info['duration'])
         
         for attempt in range(max_retries):
             try:
-                response = requests.post(
-                    "https://api.groq.com/openai/v1/audio/speech",
-                    headers={
-                        "Authorization": f"Bearer {self.groq_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "playai-tts",
-                        "input": segment_text,
-                        "voice": "Cheyenne-PlayAI",
-                        "response_format": "wav"
-                    },
-                    timeout=AUDIO_API_TIMEOUT
-                )
+                audio_bytes = await self.tts_client.synthesize(*tts_params)
+                audio_ref, audio_info = await asyncio.to_thread(self._store_audio, segment_index, audio_bytes)
+                
+                if self.audio_cache is not None:
+                    await asyncio.to_thread(self.audio_cache.put, *tts_params, audio_bytes, audio_info)
+                
+                # Exact duration/loudness travel with the segment to the renderer and concat
+                segment['audio'] = audio_info
+                return (audio_ref, audio_info['duration'])
                 
-                if response.status_code == 200:
-                    audio_bytes = response.content
-                    
-                    if len(audio_bytes) > 1000:
-                        audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
-                        estimated_duration = len(audio_bytes) / 172000
-                        
-                        return (audio_b64, max(estimated_duration, 8.0))
-                    else:
-                        raise Exception(f"Audio too small: {len(audio_bytes)} bytes")
-                else:
-                    raise Exception(f"TTS API error: {response.status_code}")
-                    
             except Exception as e:
-                if attempt < max_retries - 1:
-                    time.sleep((attempt + 1) * 2)
-                else:
-                    return (None, 0.0)
+                print(f"  ⚠️  Audio {segment_index} attempt {attempt + 1} failed: {e}")
+                if isinstance(e, TTSError) and e.status_code is not None:
+                    # Non-retryable status or retries already exhausted inside the client
+                    break
         
         return (None, 0.0)
     
+    def _store_audio(
+        self,
+        segment_index: int,
+        audio_bytes: bytes,
+        audio_info: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Publish segment audio to the artifact store (validating it unless info is already known)"""
+        if audio_info is None:
+            audio_info = self._validate_audio(audio_bytes)
+        audio_info = dict(audio_info, sha256=hashlib.sha256(audio_bytes).hexdigest())
+        
+        audio_ref = self._job_artifact_ref('audio', f'segment_{segment_index}.wav')
+        self.artifact_store.put_bytes(audio_ref, audio_bytes)
+        self.artifact_store.commit()
+        
+        if self.checkpoint is not None:
+            self.checkpoint.update_segment(
+                segment_index,
+                audio_ref=audio_ref,
+                duration=audio_info['duration'],
+                audio=audio_info
+            )
+        
+        return audio_ref, audio_info
+    
+    def _validate_audio(self, audio_bytes: bytes) -> Dict[str, Any]:
+        """Parse TTS output and reject audio that is unusable (returns analyze_wav info)"""
+        audio_info = analyze_wav(audio_bytes, silence_threshold_db=AUDIO_SILENCE_THRESHOLD_DB)
+        
+        if audio_info['duration'] < AUDIO_MIN_DURATION:
+            raise Exception(f"Audio too short: {audio_info['duration']:.2f}s")
+        
+        if audio_info['rms_dbfs'] < AUDIO_MIN_RMS_DBFS:
+            raise Exception(f"Audio near-silent: {audio_info['rms_dbfs']:.1f} dBFS")
+        
+        return audio_info
+    
     async def _render_videos_in_batches(
         self,
         valid_pairs: List[Tuple[Dict, str, float]]
@@ -309,28 +657,82 @@ class VideoOrchestrator:
         self,
         batch: List[Tuple[Dict, str, float]]
     ) -> List[Tuple[Dict, str, float, str]]:
-        batch_with_animations = []
+        animations = await asyncio.gather(
+            *(self._generate_segment_animation(segment) for segment, _, _ in batch)
+        )
         
-        for segment, audio_b64, duration in batch:
-            if USE_AI_ANIMATIONS:
-                try:
-                    animation_js = await asyncio.wait_for(
-                        self.animation_agent.generate_animation_code(
+        return [
+            (segment, audio_ref, duration, animation_js)
+            for (segment, audio_ref, duration), animation_js in zip(batch, animations)
+        ]
+    
+    async def _generate_segment_animation(self, segment: Dict) -> str:
+        if not USE_AI_ANIMATIONS:
+            return self._create_fallback_animation(segment, segment['index'])
+        
+        # Travels with the segment to the render worker, which wraps fragments in its prelude
+        if self.design_system is not None:
+            segment['design_system'] = self.design_system
+        
+        html_ref = self.checkpoint.segment_artifact(segment['index'], 'html_ref') if self.checkpoint else None
+        if html_ref:
+            with open(self.artifact_store.path(html_ref), 'r', encoding='utf-8') as f:
+                return f.read()
+        
+        if self._checkpointed_video_ref(segment['index']):
+            # Already rendered (from a fallback scene); the HTML will not be used again
+            return self._create_fallback_animation(segment, segment['index'])
+        
+        try:
+            batched = {}
+            if self.animation_batcher is not None:
+                batched = await self.animation_batcher.submit(segment) or {}
+                if not batched:
+                    print(f"  🔁 Segment {segment['index']}: not produced by its batch, generating individually")
+            
+            animation_html = batched.get('html')
+            if animation_html is None:
+                async with self.animation_semaphore:
+                    animation_html = await asyncio.wait_for(
+                        self.animation_agent.generate_scene(
                             segment_text=segment['text'],
                             visual_hint=segment.get('visual_hint', ''),
-                            segment_index=segment['index']
+                            segment_index=segment['index'],
+                            freeform=batched.get('freeform', False),
+                            design_system=self.design_system
                         ),
                         timeout=ANIMATION_GENERATION_TIMEOUT
                     )
-                except Exception as e:
-                    print(f"  ⚠️  Animation generation failed for segment {segment['index']}: {e}")
-                    animation_js = self._create_fallback_animation(segment, segment['index'])
-            else:
-                animation_js = self._create_fallback_animation(segment, segment['index'])
             
-            batch_with_animations.append((segment, audio_b64, duration, animation_js))
+            # Only LLM output is checkpointed; a resumed job retries fallback segments
+            if self.checkpoint is not None:
+                await asyncio.to_thread(self._checkpoint_animation, segment['index'], animation_html)
+            
+            return animation_html
+        except asyncio.TimeoutError:
+            print(f"  ⚠️  Animation generation timed out for segment {segment['index']} after {ANIMATION_GENERATION_TIMEOUT}s")
+            return self._create_fallback_animation(segment, segment['index'])
+        except Exception as e:
+            print(f"  ⚠️  Animation generation failed for segment {segment['index']}: {e}")
+            return self._create_fallback_animation(segment, segment['index'])
+    
+    async def _generate_animation_batch(self, segments: List[Dict], resolve):
+        """MicroBatcher handler: one LLM request for the batch, each scene handed back as its block arrives"""
+        positions = {segment['index']: position for position, segment in enumerate(segments)}
+        
+        def on_scene(index: int, animation_html: Optional[str]):
+            resolve(positions[index], {'html': animation_html} if animation_html is not None else {'freeform': True})
         
-        return batch_with_animations
+        async with self.animation_semaphore:
+            await asyncio.wait_for(
+                self.animation_agent.generate_scenes_batch(segments, on_scene, self.design_system),
+                timeout=ANIMATION_GENERATION_TIMEOUT + ANIMATION_BATCH_SECONDS_PER_SCENE * (len(segments) - 1)
+            )
+    
+    def _checkpoint_animation(self, segment_index: int, animation_html: str):
+        html_ref = self._job_artifact_ref('html', f'segment_{segment_index}.html')
+        self.artifact_store.put_bytes(html_ref, animation_html.encode('utf-8'))
+        self.checkpoint.update_segment(segment_index, html_ref=html_ref)
     
     def _create_fallback_animation(self, segment: Dict, index: int) -> str:
         text = segment.get('text', 'Educational Content')
@@ -391,51 +793,446 @@ window.startRecording = function() {{
         self,
         batch: List[Tuple[Dict, str, float, str]]
     ) -> List[str]:
-        video_files = []
-        tasks = []
+        video_files, batch = await self._take_cached_renders(batch)
+        if not batch:
+            return video_files
+        
+        if self.render_batch_fn is not None:
+            return video_files + await self._render_video_batch_multi(batch)
         
-        for segment, audio_b64, duration, animation_js in batch:
-            task = self.render_fn.spawn(segment, audio_b64, duration, animation_js)
-            tasks.append((segment['index'], task))
+        deadline = time.time() + RENDER_BATCH_TIMEOUT
+        pending = {}
+        
+        for segment, audio_ref, duration, animation_js in batch:
+            waiter = asyncio.create_task(self.render_scheduler.render(
+                segment['index'],
+                self._render_args_factory(segment, audio_ref, duration, animation_js),
+                deadline
+            ))
+            pending[waiter] = segment['index']
         
         completed = 0
-        total = len(tasks)
+        total = len(pending)
         
-        for segment_index, task in tasks:
-            completed += 1
+        # Consume results in completion order under one batch-level deadline, so a
+        # slow segment never holds back segments that already finished behind it
+        while pending:
+            done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
             
-            try:
-                video_base64 = task.get(timeout=300)
+            for waiter in done:
+                segment_index = pending.pop(waiter)
+                completed += 1
                 
-                if video_base64 and len(video_base64) > 1000:
-                    video_bytes = base64.b64decode(video_base64)
-                    video_path = f'/tmp/segment_{segment_index}_final.mp4'
-                    
-                    with open(video_path, 'wb') as f:
-                        f.write(video_bytes)
+                try:
+                    video_path = await self._resolve_rendered_video(segment_index, waiter.result())
                     
-                    if os.path.exists(video_path) and os.path.getsize(video_path) > 10000:
+                    if video_path:
                         video_files.append(video_path)
-                        print(f"    [{completed}/{total}] Video {segment_index}: ✓ ({len(video_bytes)//1024} KB)")
+                        print(f"    [{completed}/{total}] Video {segment_index}: ✓ ({os.path.getsize(video_path)//1024} KB)")
                     else:
-                        print(f"    [{completed}/{total}] Video {segment_index}: ✗ File write failed")
+                        print(f"    [{completed}/{total}] Video {segment_index}: ✗ Invalid render output")
+                except Exception as e:
+                    print(f"    [{completed}/{total}] Video {segment_index}: ✗ {e}")
+        
+        print(f"    ⏱️  {self.render_latency.format()}")
+        print(f"    🐢 Scheduler: {self.render_scheduler.stats()}")
+        if self.render_cache is not None:
+            print(f"    🗃️  Render cache: {self.render_cache.stats()}")
+        
+        return video_files
+    
+    async def _take_cached_renders(
+        self,
+        batch: List[Tuple[Dict, str, float, str]]
+    ) -> Tuple[List[str], List[Tuple[Dict, str, float, str]]]:
+        """Split a batch into job-local copies of cached renders and entries that still need rendering"""
+        cached_files = []
+        remaining = []
+        
+        for entry in batch:
+            segment, _, duration, animation_js = entry
+            video_path = await self._lookup_cached_render(segment, duration, animation_js)
+            
+            if video_path:
+                cached_files.append(video_path)
+                print(f"    Video {segment['index']}: ♻️  cached render ({os.path.getsize(video_path)//1024} KB)")
+            else:
+                remaining.append(entry)
+        
+        return cached_files, remaining
+    
+    async def _lookup_cached_render(self, segment: Dict, duration: float, animation_html: str) -> Optional[str]:
+        """
+        Job-local copy of a render with identical inputs, or None. On a miss the key is
+        remembered so _resolve_rendered_video can cache the fresh render.
+        """
+        video_ref = self._checkpointed_video_ref(segment['index'])
+        if video_ref:
+            return self.artifact_store.path(video_ref)
+        
+        audio_sha256 = segment.get('audio', {}).get('sha256')
+        if self.render_cache is None or not audio_sha256:
+            return None
+        
+        # Keyed on the document actually rendered, so the prelude version is part of it
+        key = RenderCache.make_key(render_document(animation_html, segment.get('design_system')), audio_sha256, duration)
+        cached_path = await asyncio.to_thread(self.render_cache.get, key)
+        
+        if cached_path is None:
+            self._render_cache_keys[segment['index']] = key
+            return None
+        
+        # The job's own copy: checkpointed like a fresh render and safe from cache eviction
+        video_ref = self._render_output_ref(segment['index'])
+        await asyncio.to_thread(self.artifact_store.put_file, video_ref, cached_path)
+        if self.checkpoint is not None:
+            await asyncio.to_thread(self.checkpoint.update_segment, segment['index'], video_ref=video_ref)
+        return self.artifact_store.path(video_ref)
+    
+    def _checkpointed_video_ref(self, segment_index: int) -> Optional[str]:
+        if self.checkpoint is None:
+            return None
+        return self.checkpoint.segment_artifact(segment_index, 'video_ref', 10000)
+    
+    def _render_args_factory(self, segment: Dict, audio_ref: str, duration: float, animation_html: str):
+        """Spawn args per attempt; every attempt publishes to its own output ref"""
+        def make_args(attempt: int) -> Tuple:
+            return (segment, audio_ref, duration, animation_html, self._render_output_ref(segment['index'], attempt))
+        
+        return make_args
+    
+    def _create_render_scheduler(self) -> RenderScheduler:
+        return RenderScheduler(
+            spawn_fn=self.render_fn.spawn,
+            latency=self.render_latency,
+            percentile=SPECULATIVE_RENDER_PERCENTILE,
+            factor=SPECULATIVE_RENDER_FACTOR,
+            min_samples=SPECULATIVE_RENDER_MIN_SAMPLES,
+            min_threshold=SPECULATIVE_RENDER_MIN_SECONDS,
+            max_speculative=SPECULATIVE_RENDER_MAX,
+            retry_budget=RENDER_RETRY_BUDGET,
+            max_attempts_per_segment=RENDER_MAX_ATTEMPTS_PER_SEGMENT
+        )
+    
+    async def _render_stream_batch(self, items: List[Dict[str, Any]], resolve: Callable[[int, Any], None]):
+        """MicroBatcher handler: one batched render call, each segment's video ref handed back as it finishes"""
+        call = [
+            (item['segment'], item['audio_ref'], item['duration'], item['animation_html'])
+            for item in items
+        ]
+        print(f"    🧩 Render call: segments {[segment['index'] for segment, _, _, _ in call]}")
+        await self._run_render_call(call, resolve)
+    
+    def _choose_render_call_size(self, segment_count: int) -> int:
+        """Segments per render call: spread the batch over the worker budget, capped per container"""
+        per_worker = math.ceil(segment_count / max(1, VIDEO_RENDER_WORKERS))
+        return max(1, min(per_worker, RENDER_SEGMENTS_PER_CALL))
+    
+    async def _render_video_batch_multi(
+        self,
+        batch: List[Tuple[Dict, str, float, str]]
+    ) -> List[str]:
+        call_size = self._choose_render_call_size(len(batch))
+        calls = [batch[i:i + call_size] for i in range(0, len(batch), call_size)]
+        
+        print(f"    🧩 {len(batch)} segments → {len(calls)} render call(s) of up to {call_size}")
+        
+        video_files = []
+        failed = []
+        progress = {'completed': 0, 'total': len(batch)}
+        
+        await asyncio.gather(*(
+            self._consume_render_call(call, video_files, failed, progress) for call in calls
+        ))
+        
+        if failed:
+            video_files.extend(await self._retry_failed_renders(failed))
+        
+        print(f"    ⏱️  {self.render_latency.format()}")
+        
+        return video_files
+    
+    async def _retry_failed_renders(self, failed: List[Tuple[Dict, str, float, str]]) -> List[str]:
+        """Re-render failed segments individually under the job's retry budget"""
+        print(f"    🔁 Retrying {len(failed)} failed segment(s) individually...")
+        deadline = time.time() + RENDER_SEGMENT_TIMEOUT
+        
+        async def retry(segment, audio_ref, duration, animation_js) -> Optional[str]:
+            try:
+                video_ref = await self.render_scheduler.render(
+                    segment['index'],
+                    self._render_args_factory(segment, audio_ref, duration, animation_js),
+                    deadline,
+                    retry=True
+                )
+                video_path = await self._resolve_rendered_video(segment['index'], video_ref)
+                status = f"✓ ({os.path.getsize(video_path)//1024} KB)" if video_path else "✗ Invalid render output"
+                print(f"    Video {segment['index']} (retry): {status}")
+                return video_path
+            except Exception as e:
+                print(f"    Video {segment['index']} (retry): ✗ {e}")
+                return None
+        
+        results = await asyncio.gather(*(retry(*entry) for entry in failed))
+        return [path for path in results if path]
+    
+    async def _consume_render_call(
+        self,
+        call: List[Tuple[Dict, str, float, str]],
+        video_files: List[str],
+        failed: List[Tuple[Dict, str, float, str]],
+        progress: Dict[str, int]
+    ):
+        results = asyncio.Queue()
+        runner = asyncio.create_task(
+            self._run_render_call(call, lambda position, video_ref: results.put_nowait((position, video_ref)))
+        )
+        
+        for _ in range(len(call)):
+            position, video_ref = await results.get()
+            segment_index = call[position][0]['index']
+            progress['completed'] += 1
+            prefix = f"    [{progress['completed']}/{progress['total']}] Video {segment_index}:"
+            
+            video_path = await self._resolve_rendered_video(segment_index, video_ref)
+            
+            if video_path:
+                video_files.append(video_path)
+                print(f"{prefix} ✓ ({os.path.getsize(video_path)//1024} KB)")
+            else:
+                print(f"{prefix} ✗ {'Invalid render output' if video_ref else 'Render failed'}")
+                failed.append(call[position])
+        
+        await runner
+    
+    async def _run_render_call(
+        self,
+        call: List[Tuple[Dict, str, float, str]],
+        on_result: Callable[[int, Optional[str]], None]
+    ):
+        """
+        Render `call` in one batched render call, handing each segment's video ref
+        (None when it failed) to on_result(position, video_ref) as soon as it is
+        known. Every position gets exactly one result; this never raises.
+        
+        The worker renders its segments in order, so the one it is on has been
+        running since the previous result arrived. Once that exceeds the
+        scheduler's straggler threshold, a speculative single-segment copy is
+        launched and whichever copy finishes first wins, as in RenderScheduler.render.
+        """
+        jobs = [
+            {
+                'segment': segment,
+                'audio_ref': audio_ref,
+                'audio_duration': duration,
+                'animation_html': animation_js,
+                'output_ref': self._render_output_ref(segment['index'])
+            }
+            for segment, audio_ref, duration, animation_js in call
+        ]
+        position_of = {segment['index']: position for position, (segment, _, _, _) in enumerate(call)}
+        reported = set()
+        finished = set()
+        speculative: Dict[int, asyncio.Task] = {}
+        deadline = time.time() + RENDER_BATCH_TIMEOUT
+        last_result_at = time.time()
+        
+        def finish(position: int, video_ref: Optional[str]):
+            if position in finished:
+                return
+            finished.add(position)
+            on_result(position, video_ref)
+            task = speculative.get(position)
+            if task is not None and not task.done():
+                task.cancel()
+        
+        def on_speculative_done(position: int, task: asyncio.Task):
+            video_ref = None
+            if not task.cancelled():
+                if task.exception() is None:
+                    video_ref = task.result()
                 else:
-                    print(f"    [{completed}/{total}] Video {segment_index}: ✗ Invalid base64 data")
+                    print(f"    ⚠️  Segment {call[position][0]['index']}: speculative copy failed: {task.exception()}")
+            # A failed copy only decides the segment once the batched call has failed it too
+            if video_ref or position in reported:
+                finish(position, video_ref)
+        
+        async def consume():
+            nonlocal last_result_at
+            async for result in self.render_batch_fn.remote_gen.aio(jobs):
+                position = position_of[result['index']]
+                reported.add(position)
+                last_result_at = time.time()
+                
+                if result.get('error') or not result.get('video_ref'):
+                    print(f"    ⚠️  Segment {result['index']}: batched render failed: {result.get('error') or 'empty result'}")
+                    if position not in speculative or speculative[position].done():
+                        finish(position, None)
+                    continue
+                
+                # The worker's own per-segment time; gaps between results also hold queueing and cold starts
+                if result.get('seconds') is not None:
+                    self.render_latency.observe(result['seconds'])
+                finish(position, result['video_ref'])
+        
+        consumer = asyncio.create_task(consume())
+        try:
+            while not consumer.done():
+                await asyncio.wait([consumer], timeout=self.render_scheduler.poll_interval)
+                
+                current = next((position for position in range(len(call)) if position not in reported), None)
+                if current is None or current in finished or current in speculative:
+                    continue
+                
+                threshold = self.render_scheduler.straggler_threshold()
+                running = time.time() - last_result_at
+                if threshold is None or running <= threshold or not self.render_scheduler.speculation_available():
+                    continue
+                
+                segment, audio_ref, duration, animation_js = call[current]
+                print(f"    🐢 Segment {segment['index']}: running {running:.0f}s in its render call (> {threshold:.0f}s), launching speculative copy")
+                make_args = self._render_args_factory(segment, audio_ref, duration, animation_js)
+                # Attempt 0's output ref belongs to the batched call
+                task = asyncio.create_task(self.render_scheduler.render(
+                    segment['index'],
+                    lambda attempt, make_args=make_args: make_args(attempt + 1),
+                    deadline,
+                    speculative=True
+                ))
+                speculative[current] = task
+                task.add_done_callback(lambda done, position=current: on_speculative_done(position, done))
+            
+            try:
+                consumer.result()
             except Exception as e:
-                print(f"    [{completed}/{total}] Video {segment_index}: ✗ {e}")
+                print(f"    ⚠️  Render call failed: {e}")
+            
+            # Whatever the call did not deliver can still be won by its speculative copy
+            reported.update(range(len(call)))
+            waiting = [task for position, task in speculative.items() if position not in finished]
+            if waiting:
+                await asyncio.wait(waiting)
+            for position, task in speculative.items():
+                if not task.cancelled() and task.exception() is None:
+                    finish(position, task.result())
+        finally:
+            if not consumer.done():
+                consumer.cancel()
+            for task in speculative.values():
+                if not task.done():
+                    task.cancel()
+            for position in range(len(call)):
+                finish(position, None)
+    
+    def _job_artifact_ref(self, kind: str, name: str) -> str:
+        return f'jobs/{self.job_id}/{kind}/{name}'
+    
+    def _render_output_ref(self, segment_index: int, attempt: int = 0) -> str:
+        suffix = f'_a{attempt}' if attempt else ''
+        return self._job_artifact_ref('renders', f'segment_{segment_index}_final{suffix}.mp4')
+    
+    async def _resolve_rendered_video(self, segment_index: int, video_ref: Optional[str]) -> Optional[str]:
+        """
+        Map a worker's MP4 artifact ref to a local path; returns None if the output is invalid.
         
-        return video_files
+        Volume reload, checkpoint commit and cache copy all block, so they run off
+        the event loop instead of stalling the other pipeline stages.
+        """
+        if not video_ref:
+            return None
+        
+        if await asyncio.to_thread(self._rendered_size, video_ref) <= 10000:
+            return None
+        
+        video_path = self.artifact_store.path(video_ref)
+        cache_key = self._render_cache_keys.pop(segment_index, None)
+        
+        if self.checkpoint is not None:
+            await asyncio.to_thread(self.checkpoint.update_segment, segment_index, video_ref=video_ref)
+        
+        if cache_key and self.render_cache is not None:
+            try:
+                await asyncio.to_thread(self.render_cache.put, cache_key, video_path, segment_index)
+            except Exception as e:
+                print(f"    ⚠️  Render cache write failed for segment {segment_index}: {e}")
+        
+        return video_path
+    
+    def _rendered_size(self, video_ref: str) -> int:
+        # Workers commit from other containers; reload to see their output
+        self.artifact_store.reload()
+        return self.artifact_store.size(video_ref)
+    
+    def _cleanup_job_artifacts(self):
+        """Drop a finished job's artifacts; its checkpoint stays so a repeated resume is a no-op"""
+        if self.job_id:
+            for kind in ('audio', 'html', 'renders', 'final'):
+                self.artifact_store.delete_prefix(f'jobs/{self.job_id}/{kind}')
+            self.artifact_store.commit()
+    
+    def _segment_index_from_path(self, path: str) -> int:
+        match = re.search(r'segment_(\d+)_final', path)
+        return int(match.group(1)) if match else 0
+    
+    async def _concatenate_smart(
+        self,
+        sorted_videos: List[str],
+        video_durations: List[float],
+        transitions: List[str],
+        bgm_path: Optional[str],
+        output_path: str
+    ) -> Optional[str]:
+        """Stream-copy concat with re-encoded transition windows; None means use the legacy path"""
+        engine = SmartConcatEngine(
+            FFMPEG_TIMEOUT_SECONDS,
+            workers=CONCAT_WORKERS,
+            fan_in=CONCAT_FAN_IN,
+            workdir_root=self.workspace.root
+        )
+        
+        try:
+            stats = await asyncio.to_thread(
+                engine.concatenate,
+                sorted_videos,
+                video_durations,
+                transitions,
+                TRANSITION_DURATION,
+                output_path,
+                bgm_path,
+                BGM_VOLUME / 100.0
+            )
+        except ConcatError as e:
+            print(f"  ⚠️  Smart concat unavailable ({e}), re-encoding full timeline")
+            return None
+        
+        if not os.path.exists(output_path) or os.path.getsize(output_path) < 100000:
+            print(f"  ⚠️  Smart concat output invalid, re-encoding full timeline")
+            return None
+        
+        file_size_mb = os.path.getsize(output_path) / 1024 / 1024
+        print(f"  ✅ Smart concat complete: {file_size_mb:.1f} MB "
+              f"({stats['encoded_seconds']}s encoded, {stats['copied_seconds']}s copied, "
+              f"{stats['nodes']} nodes in {stats['levels']} levels, {stats['seconds']}s)")
+        
+        return output_path
     
-    async def _concatenate_videos_with_transitions(self, video_files: List[str]) -> str:
+    async def _concatenate_videos_with_transitions(
+        self,
+        video_files: List[str],
+        segment_durations: Optional[Dict[int, float]] = None
+    ) -> str:
+        """
+        Concatenate the segment clips into the final video in the job workspace.
+        
+        The clips are the job's checkpointed renders, so they are left in place:
+        _cleanup_job_artifacts removes them once the final video is uploaded, and
+        a job that fails after concat resumes without re-rendering.
+        """
         if not video_files:
             raise Exception("No video files to concatenate")
         
-        def get_index(path: str) -> int:
-            import re
-            match = re.search(r'segment_(\d+)_final', path)
-            return int(match.group(1)) if match else 0
-        
-        sorted_videos = sorted(video_files, key=get_index)
+        segment_durations = segment_durations or {}
+        sorted_videos = sorted(video_files, key=self._segment_index_from_path)
         
         for video_path in sorted_videos:
             if not os.path.exists(video_path):
@@ -454,7 +1251,7 @@ window.startRecording = function() {{
         else:
             print(f"  🎵 Selected background music: {selected_bgm}")
         
-        output_path = '/tmp/final_video.mp4'
+        output_path = self.workspace.path('final_video.mp4')
         
         if len(sorted_videos) == 1:
             print("  ℹ️  Single video, adding background music only...")
@@ -482,14 +1279,12 @@ window.startRecording = function() {{
                     
                     if result.returncode == 0 and os.path.exists(output_path):
                         print(f"  ✅ Single video with BGM complete")
-                        os.remove(sorted_videos[0])
                         return output_path
                 except Exception as e:
                     print(f"  ⚠️  BGM mixing failed: {e}, using original video")
             
             import shutil
             shutil.copy(sorted_videos[0], output_path)
-            os.remove(sorted_videos[0])
             return output_path
         
         print(f"  🎬 Building transition filter chain...")
@@ -500,8 +1295,15 @@ window.startRecording = function() {{
             transitions.append(transition_type)
             print(f"     Transition {i}: {transition_type}")
         
+        # Clip lengths come from the parsed TTS audio (segments are cut to it with
+        # -shortest); ffprobe only for clips whose duration was not carried through
         video_durations = []
         for vp in sorted_videos:
+            known_duration = segment_durations.get(self._segment_index_from_path(vp))
+            if known_duration:
+                video_durations.append(known_duration)
+                continue
+            
             result = subprocess.run([
                 'ffprobe', '-v', 'error',
                 '-show_entries', 'format=duration',
@@ -515,6 +1317,13 @@ window.startRecording = function() {{
             except:
                 video_durations.append(12.0)
         
+        if CONCAT_ENGINE == "smart":
+            smart_path = await self._concatenate_smart(
+                sorted_videos, video_durations, transitions, bgm_path, output_path
+            )
+            if smart_path:
+                return smart_path
+        
         filter_parts = []
         for i in range(len(sorted_videos)):
             filter_parts.append(f'[{i}:v]')
@@ -613,12 +1422,6 @@ window.startRecording = function() {{
         except Exception as e:
             raise Exception(f"Concatenation error: {e}")
         
-        for vp in sorted_videos:
-            try:
-                os.remove(vp)
-            except:
-                pass
-        
         return output_path
     
     async def _upload_to_cloudflare_stream(
@@ -0,0 +1,248 @@
+# video_pipeline.py
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class PipelineStage:
+    """
+    One step of the segment pipeline (e.g. TTS, animation, render).
+
+    The handler receives a pipeline item dict and returns the (possibly updated)
+    item to pass downstream, or None to drop the segment.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]],
+        concurrency: int
+    ):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, int(concurrency))
+        self.queue: asyncio.Queue = None
+        self.running = 0
+        self.completed = 0
+        self.dropped = 0
+        self.max_queue_depth = 0
+        self.busy_seconds = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queued': self.queue.qsize() if self.queue else 0,
+            'running': self.running,
+            'completed': self.completed,
+            'dropped': self.dropped,
+            'max_queue_depth': self.max_queue_depth,
+            'busy_seconds': round(self.busy_seconds, 1)
+        }
+
+
+class SegmentPipeline:
+    """
+    Streams segments through a chain of stages instead of running each phase
+    as a barrier over all segments.
+
+    Every stage has its own queue and a fixed number of workers, so segment 0 can
+    be rendering while segment 11 is still in TTS. End-to-end latency approaches
+    the slowest single segment path instead of the sum of per-phase maxima.
+    """
+
+    def __init__(self, stages: List[PipelineStage], report_interval: float = 10.0):
+        if not stages:
+            raise ValueError("SegmentPipeline needs at least one stage")
+
+        self.stages = stages
+        self.report_interval = report_interval
+        self.results: List[Dict[str, Any]] = []
+        self._workers: List[asyncio.Task] = []
+        self._reporter: Optional[asyncio.Task] = None
+        self._started_at = 0.0
+
+    def start(self):
+        """Create stage queues and spawn the workers (must be called inside the event loop)"""
+        self._started_at = time.time()
+
+        for stage in self.stages:
+            stage.queue = asyncio.Queue()
+
+        for position, stage in enumerate(self.stages):
+            for _ in range(stage.concurrency):
+                self._workers.append(asyncio.create_task(self._stage_worker(position)))
+
+        if self.report_interval and self.report_interval > 0:
+            self._reporter = asyncio.create_task(self._report_loop())
+
+    async def submit(self, item: Dict[str, Any]):
+        """Feed a new segment item into the first stage"""
+        await self._enqueue(0, item)
+
+    async def join(self) -> List[Dict[str, Any]]:
+        """Wait until every submitted item has left the pipeline, then stop the workers"""
+        for stage in self.stages:
+            await stage.queue.join()
+
+        for worker in self._workers:
+            worker.cancel()
+        if self._reporter:
+            self._reporter.cancel()
+
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self._reporter:
+            await asyncio.gather(self._reporter, return_exceptions=True)
+
+        self._workers = []
+        self._reporter = None
+
+        self.print_queue_depths(final=True)
+
+        return sorted(self.results, key=lambda item: item['segment']['index'])
+
+    async def run(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convenience wrapper: start, submit all items, wait for completion"""
+        self.start()
+        for item in items:
+            await self.submit(item)
+        return await self.join()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def print_queue_depths(self, final: bool = False):
+        elapsed = time.time() - self._started_at
+        label = "final" if final else f"{elapsed:.0f}s"
+        parts = []
+        for stage in self.stages:
+            s = stage.stats()
+            parts.append(f"{stage.name}: q={s['queued']} run={s['running']} done={s['completed']}")
+        print(f"  📊 Pipeline [{label}] " + " | ".join(parts))
+
+    async def _enqueue(self, position: int, item: Dict[str, Any]):
+        stage = self.stages[position]
+        await stage.queue.put(item)
+        stage.max_queue_depth = max(stage.max_queue_depth, stage.queue.qsize())
+
+    async def _stage_worker(self, position: int):
+        stage = self.stages[position]
+        is_last = position == len(self.stages) - 1
+
+        while True:
+            item = await stage.queue.get()
+            stage.running += 1
+            start = time.time()
+
+            try:
+                result = await stage.handler(item)
+            except Exception as e:
+                print(f"  ⚠️  Pipeline stage '{stage.name}' failed for segment {item['segment']['index']}: {e}")
+                result = None
+            finally:
+                stage.running -= 1
+                stage.busy_seconds += time.time() - start
+
+            try:
+                if result is None:
+                    stage.dropped += 1
+                else:
+                    stage.completed += 1
+                    if is_last:
+                        self.results.append(result)
+                    else:
+                        await self._enqueue(position + 1, result)
+            finally:
+                stage.queue.task_done()
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(self.report_interval)
+            self.print_queue_depths()
+
+
+class MicroBatcher:
+    """
+    Collects items submitted one at a time (e.g. by pipeline stage workers) into
+    batches for a handler that processes several items per call.
+
+    A batch is dispatched as soon as `max_batch()` items are waiting, or
+    `max_wait` seconds after the first item of a partial batch arrived. The
+    handler receives the items and a resolve(position, result) callback, so
+    results can be handed back as they become available instead of when the
+    whole batch is done; items it never resolves get None. If the handler
+    raises, every unresolved item gets None as well.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[List[Any], Callable[[int, Any], None]], Awaitable[None]],
+        max_batch: Callable[[], int],
+        max_wait: float
+    ):
+        self.name = name
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result (None when the batch did not produce one)"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= max(1, self.max_batch()):
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_wait())
+
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': round(self.items / self.batches, 1) if self.batches else 0.0,
+            'failed_batches': self.failed_batches
+        }
+
+    async def _flush_after_wait(self):
+        await asyncio.sleep(self.max_wait)
+        self._timer = None
+        while self._pending:
+            self._dispatch()
+
+    def _dispatch(self):
+        size = max(1, self.max_batch())
+        batch, self._pending = self._pending[:size], self._pending[size:]
+
+        if not self._pending and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        self.batches += 1
+        self.items += len(batch)
+
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        def resolve(position: int, result: Any):
+            future = batch[position][1]
+            if not future.done():
+                future.set_result(result)
+
+        try:
+            await self.handler([item for item, _ in batch], resolve)
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"  ⚠️  {self.name} batch of {len(batch)} failed: {e}")
+        finally:
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
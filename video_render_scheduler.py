@@ -0,0 +1,192 @@
+# video_render_scheduler.py
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+from video_metrics import LatencyHistogram
+
+
+class RenderScheduler:
+    """
+    Per-job render scheduler with straggler mitigation.
+
+    Every segment render is tracked while it runs. Once enough renders have
+    finished to know the latency distribution, a segment running longer than
+    `factor` x the `percentile` latency gets a speculative duplicate; whichever
+    copy finishes first wins and the other is cancelled. Failed renders are
+    retried under a per-job budget instead of dropping the segment.
+    """
+
+    def __init__(
+        self,
+        spawn_fn: Callable[..., Any],
+        latency: Optional[LatencyHistogram] = None,
+        percentile: float = 75,
+        factor: float = 1.5,
+        min_samples: int = 3,
+        min_threshold: float = 0.0,
+        max_speculative: int = 4,
+        retry_budget: int = 4,
+        max_attempts_per_segment: int = 3,
+        poll_interval: float = 1.0
+    ):
+        self.spawn_fn = spawn_fn
+        self.latency = latency or LatencyHistogram('render latency')
+        self.percentile = percentile
+        self.factor = factor
+        self.min_samples = min_samples
+        self.min_threshold = min_threshold
+        self.poll_interval = poll_interval
+        self.max_attempts_per_segment = max_attempts_per_segment
+
+        self.speculative_remaining = max_speculative
+        self.retries_remaining = retry_budget
+        self.speculative_launched = 0
+        self.speculative_wins = 0
+        self.retries_launched = 0
+        self._budget_lock = threading.Lock()
+
+    def straggler_threshold(self) -> Optional[float]:
+        """Seconds after which a running render counts as a straggler (None until enough samples)"""
+        if self.latency.count < self.min_samples:
+            return None
+        return max(self.min_threshold, self.latency.percentile(self.percentile) * self.factor)
+
+    def speculation_available(self) -> bool:
+        return self.speculative_remaining > 0
+
+    async def render(
+        self,
+        segment_index: int,
+        make_args: Callable[[int], Tuple],
+        deadline: float,
+        retry: bool = False,
+        speculative: bool = False
+    ) -> str:
+        """
+        Render one segment, speculating and retrying as needed.
+
+        Args:
+            segment_index: segment being rendered (for logging)
+            make_args: attempt number -> positional args for spawn_fn, so each
+                attempt can publish to its own output ref
+            deadline: absolute time.time() after which all attempts are cancelled
+            retry: this call re-renders a segment that already failed elsewhere
+                and must draw from the job's retry budget
+            speculative: this call is itself a speculative copy of a render
+                running elsewhere (e.g. inside a batched render call); it draws
+                from the speculation budget and is neither retried nor speculated
+
+        Returns:
+            Result of the first successful attempt
+
+        Raises:
+            Exception: when every attempt failed and the retry budget is spent,
+                or the deadline passed
+        """
+        attempts = {}
+        attempt_number = 0
+        speculated = False
+        last_error = None
+
+        def launch(speculative: bool):
+            nonlocal attempt_number
+            call = self.spawn_fn(*make_args(attempt_number))
+            # Awaited on the loop rather than in a worker thread: stragglers and
+            # speculative copies must not pin default-executor threads, and
+            # cancelling the waiter has to actually stop the wait
+            waiter = asyncio.create_task(
+                call.get.aio(timeout=max(1.0, deadline - time.time()))
+            )
+            attempts[waiter] = {
+                'call': call,
+                'started_at': time.time(),
+                'attempt': attempt_number,
+                'speculative': speculative
+            }
+            attempt_number += 1
+
+        if speculative and not self._take_speculative():
+            raise Exception("Render speculation budget exhausted")
+        if retry and not self._take_retry():
+            raise Exception("Render retry budget exhausted")
+
+        launch(speculative=speculative)
+        speculated = speculative
+
+        try:
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise Exception(f"Render deadline exceeded after {attempt_number} attempt(s)")
+
+                done, _ = await asyncio.wait(
+                    attempts.keys(),
+                    timeout=min(self.poll_interval, remaining),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for waiter in done:
+                    info = attempts.pop(waiter)
+                    try:
+                        result = waiter.result()
+                    except Exception as e:
+                        result = None
+                        last_error = e
+
+                    if result:
+                        self.latency.observe(time.time() - info['started_at'])
+                        if info['speculative']:
+                            self.speculative_wins += 1
+                            print(f"    ⚡ Segment {segment_index}: speculative copy won")
+                        return result
+
+                    print(f"    ⚠️  Segment {segment_index} attempt {info['attempt']} failed: {last_error or 'empty result'}")
+
+                if not attempts:
+                    if not speculative and attempt_number < self.max_attempts_per_segment and self._take_retry():
+                        print(f"    🔁 Segment {segment_index}: retrying ({self.retries_remaining} retries left in job)")
+                        launch(speculative=False)
+                        continue
+                    raise Exception(f"Render failed after {attempt_number} attempt(s): {last_error or 'empty result'}")
+
+                if not speculated and attempt_number < self.max_attempts_per_segment:
+                    threshold = self.straggler_threshold()
+                    oldest = min(info['started_at'] for info in attempts.values())
+                    if threshold is not None and time.time() - oldest > threshold and self._take_speculative():
+                        print(f"    🐢 Segment {segment_index}: running {time.time() - oldest:.0f}s (> {threshold:.0f}s), launching speculative copy")
+                        launch(speculative=True)
+                        speculated = True
+        finally:
+            for waiter in attempts:
+                waiter.cancel()
+            for info in attempts.values():
+                try:
+                    await info['call'].cancel.aio()
+                except Exception:
+                    pass
+
+    def stats(self) -> dict:
+        return {
+            'speculative_launched': self.speculative_launched,
+            'speculative_wins': self.speculative_wins,
+            'retries_launched': self.retries_launched,
+            'retries_remaining': self.retries_remaining
+        }
+
+    def _take_retry(self) -> bool:
+        with self._budget_lock:
+            if self.retries_remaining <= 0:
+                return False
+            self.retries_remaining -= 1
+            self.retries_launched += 1
+            return True
+
+    def _take_speculative(self) -> bool:
+        with self._budget_lock:
+            if self.speculative_remaining <= 0:
+                return False
+            self.speculative_remaining -= 1
+            self.speculative_launched += 1
+            return True
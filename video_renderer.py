@@ -0,0 +1,795 @@
+# video_renderer.py
+"""
+Browser capture + encoding helpers for the segment render workers.
+
+Imported inside the Modal render container (playwright + ffmpeg image), so this
+module must only depend on the standard library at import time.
+"""
+import base64
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+from video_design_system import get_prelude_routes
+from video_metrics import LatencyHistogram
+
+
+# Bump whenever capture or encoding output changes for the same inputs (shim,
+# frame timing, encode args); it is part of the render cache key.
+# 3: readiness shim, idle-tail trim/pad, resampled realtime screencast capture
+RENDERER_VERSION = "virtual-time-3"
+
+CHROMIUM_LAUNCH_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-features=IsolateOrigins',
+    '--disable-site-isolation-trials',
+    '--allow-running-insecure-content',
+    '--disable-blink-features=AutomationControlled'
+]
+
+# Segment encoding is normalized so the orchestrator can concatenate clips
+# without surprises: CFR 30, fixed timescale, 1s closed GOPs, 5 Mbps. The smart
+# concat engine relies on keyframes sitting exactly every SEGMENT_GOP_FRAMES.
+SEGMENT_FPS = 30
+SEGMENT_GOP_FRAMES = 30
+
+SEGMENT_VIDEO_ENCODE_ARGS = [
+    # ✅ VIDEO ENCODING - NORMALIZED FOR CONCATENATION
+    '-c:v', 'libx264',
+    '-preset', 'medium',
+    '-profile:v', 'high',
+    '-level', '4.0',
+    '-pix_fmt', 'yuv420p',
+
+    # ✅ FRAME RATE & TIMING
+    '-r', str(SEGMENT_FPS),
+    '-video_track_timescale', str(SEGMENT_FPS * 1000),
+    '-vsync', 'cfr',
+
+    # ✅ GOP & KEYFRAMES
+    '-g', str(SEGMENT_GOP_FRAMES),
+    '-keyint_min', str(SEGMENT_GOP_FRAMES),
+    '-sc_threshold', '0',
+
+    # ✅ BITRATE CONTROL
+    '-b:v', '5000k',
+    '-maxrate', '5500k',
+    '-bufsize', '10000k',
+
+    # ✅ STREAMING OPTIMIZATION
+    '-movflags', '+faststart',
+]
+
+SEGMENT_AUDIO_ENCODE_ARGS = [
+    # ✅ AUDIO ENCODING - NORMALIZED
+    '-c:a', 'aac',
+    '-b:a', '128k',
+    '-ar', '48000',
+    '-ac', '2',
+]
+
+# Injected before any page script runs. Freezes the page clock so that time only
+# moves when the renderer calls window.__virtualTime.advance(ms): performance.now,
+# Date.now, requestAnimationFrame and timers all follow the virtual clock, and
+# CSS/Web Animations are paused and seeked to it. GSAP's ticker is driven by rAF
+# and Date.now, so its global timeline steps exactly one frame per advance.
+VIRTUAL_TIME_SHIM = """
+(() => {
+  if (window.__virtualTime) return;
+
+  let now = 0;
+  const wallClockOrigin = Date.now();
+  let rafQueue = [];
+  let rafId = 0;
+  const timers = new Map();
+  let timerId = 0;
+  const cssStart = new WeakMap();
+
+  performance.now = () => now;
+  Date.now = () => wallClockOrigin + now;
+
+  window.requestAnimationFrame = (cb) => { rafQueue.push([++rafId, cb]); return rafId; };
+  window.cancelAnimationFrame = (id) => { rafQueue = rafQueue.filter((entry) => entry[0] !== id); };
+
+  window.setTimeout = (cb, ms, ...args) => {
+    const id = ++timerId;
+    timers.set(id, { at: now + Math.max(0, ms || 0), cb, args, interval: 0 });
+    return id;
+  };
+  window.setInterval = (cb, ms, ...args) => {
+    const id = ++timerId;
+    const interval = Math.max(1, ms || 0);
+    timers.set(id, { at: now + interval, cb, args, interval });
+    return id;
+  };
+  window.clearTimeout = window.clearInterval = (id) => { timers.delete(id); };
+
+  function runTimers(until) {
+    for (;;) {
+      let nextId = null;
+      let next = null;
+      for (const [id, timer] of timers) {
+        if (timer.at <= until && (next === null || timer.at < next.at)) { nextId = id; next = timer; }
+      }
+      if (next === null) return;
+      now = Math.max(now, next.at);
+      if (next.interval) next.at += next.interval; else timers.delete(nextId);
+      try {
+        if (typeof next.cb === 'function') next.cb(...next.args); else (0, eval)(String(next.cb));
+      } catch (e) { console.error(e); }
+    }
+  }
+
+  function syncAnimations() {
+    for (const anim of document.getAnimations()) {
+      if (!cssStart.has(anim)) { cssStart.set(anim, now); anim.pause(); }
+      anim.currentTime = now - cssStart.get(anim);
+    }
+  }
+
+  window.__virtualTime = {
+    now: () => now,
+    pendingTimers: () => timers.size,
+    start() {
+      if (typeof gsap !== 'undefined') gsap.ticker.lagSmoothing(0);
+      syncAnimations();
+    },
+    advance(ms) {
+      const target = now + ms;
+      runTimers(target);
+      now = target;
+      const callbacks = rafQueue;
+      rafQueue = [];
+      for (const [, cb] of callbacks) {
+        try { cb(now); } catch (e) { console.error(e); }
+      }
+      syncAnimations();
+      return now;
+    }
+  };
+})();
+"""
+
+# Injected into every capture page. window.__sceneReady flips to true once the
+# document and every blocking script/stylesheet have loaded (GSAP, Lucide),
+# web fonts are ready and the page's own load handlers (which build the GSAP
+# timeline) have run. Scenes that build their timeline later can call
+# window.__markSceneReady() themselves. The deferral uses a MessageChannel task
+# because timers and rAF are frozen under the virtual clock shim.
+READINESS_SHIM = """
+(() => {
+  if (window.__markSceneReady) return;
+
+  window.__sceneReady = false;
+  window.__markSceneReady = (reason) => {
+    if (window.__sceneReady === true) return;
+    window.__sceneReadyReason = reason || 'page';
+    window.__sceneReady = true;
+  };
+
+  const nextTask = (fn) => {
+    const channel = new MessageChannel();
+    channel.port1.onmessage = fn;
+    channel.port2.postMessage(0);
+  };
+
+  window.addEventListener('load', () => {
+    const fonts = document.fonts ? document.fonts.ready : Promise.resolve();
+    fonts.then(() => nextTask(() => window.__markSceneReady('load')));
+  });
+
+  // True once nothing can change the picture any more: no GSAP tween/timeline
+  // still running or scheduled (repeat: -1 ends at Infinity), no unfinished CSS
+  // animation and, under the virtual clock, no pending timer.
+  window.__sceneIdle = () => {
+    if (typeof gsap !== 'undefined') {
+      const global = gsap.globalTimeline;
+      const time = global.time();
+      const busy = global.getChildren(false, true, true).some(
+        (child) => !child.paused() && child.endTime() > time + 0.001
+      );
+      if (busy) return false;
+    }
+    for (const anim of document.getAnimations()) {
+      if (anim.playState === 'finished' || !anim.effect) continue;
+      const end = anim.effect.getComputedTiming().endTime;
+      if (end === Infinity || (anim.currentTime || 0) < end) return false;
+    }
+    if (window.__virtualTime && window.__virtualTime.pendingTimers() > 0) return false;
+    return true;
+  };
+})();
+"""
+
+READY_POLL_MS = 20
+
+
+def _log_browser_console(msg):
+    text = msg.text
+    if 'chunk' not in text.lower():  # Don't log chunk messages
+        print(f"  Browser [{msg.type}]: {text}")
+
+
+def _log_browser_error(err):
+    print(f"  Browser Error: {err}")
+
+
+def start_segment_encoder(input_args: list, audio_path: str, output_path: str, pad_to: float = None):
+    """
+    Start an ffmpeg process that encodes the piped video input together with the
+    segment audio, using the normalized segment settings.
+
+    With `pad_to` (seconds) the video is extended to that length by cloning its
+    last frame (tpad), so capture can stop early once the scene is static.
+
+    Returns:
+        (process, stderr_file) - caller writes frames to process.stdin
+    """
+    stderr_file = tempfile.TemporaryFile()
+
+    cmd = [
+        'ffmpeg', '-y',
+        '-loglevel', 'error',
+        '-nostats'
+    ] + input_args + [
+        '-i', audio_path
+    ]
+
+    if pad_to:
+        cmd += ['-vf', f'tpad=stop_mode=clone:stop_duration={pad_to:.3f}', '-t', f'{pad_to:.3f}']
+
+    cmd += SEGMENT_VIDEO_ENCODE_ARGS + SEGMENT_AUDIO_ENCODE_ARGS + [
+        '-shortest',
+        output_path
+    ]
+
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=stderr_file
+    )
+
+    return process, stderr_file
+
+
+def finish_segment_encoder(process, stderr_file, timeout: int):
+    """Close the frame pipe and wait for ffmpeg to finish writing the MP4"""
+    try:
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            raise Exception(f"FFmpeg timeout after {timeout}s")
+
+        if process.returncode != 0:
+            raise Exception(f"FFmpeg failed: {_read_encoder_stderr(stderr_file)[:200]}")
+    finally:
+        stderr_file.close()
+
+
+def encoder_pipe_error(process, stderr_file) -> Exception:
+    """
+    Error for an encoder that stopped reading its frame pipe (BrokenPipeError on
+    write): waits for ffmpeg to exit and reports its exit code and stderr.
+    """
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+    try:
+        error = _read_encoder_stderr(stderr_file)
+    finally:
+        stderr_file.close()
+
+    return Exception(f"FFmpeg exited with code {process.returncode} during capture: {error[:200]}")
+
+
+def _read_encoder_stderr(stderr_file) -> str:
+    stderr_file.seek(0)
+    return stderr_file.read().decode('utf-8', errors='replace').strip()
+
+
+def wait_for_scene_ready(page, timeout_ms: int) -> dict:
+    """
+    Poll window.__sceneReady from Python (page-side polling would use the rAF
+    and timers the virtual clock shim freezes) until it is set or `timeout_ms`
+    passes. A timeout is not an error: capture starts anyway and the library
+    checks decide whether the scene is usable.
+
+    Returns:
+        dict with ready (bool), reason ('load', 'page' or 'timeout') and seconds
+    """
+    start = time.time()
+    deadline = start + timeout_ms / 1000.0
+
+    while True:
+        reason = page.evaluate("window.__sceneReady === true && (window.__sceneReadyReason || 'page')")
+        if reason:
+            return {'ready': True, 'reason': reason, 'seconds': time.time() - start}
+        if time.time() >= deadline:
+            return {'ready': False, 'reason': 'timeout', 'seconds': time.time() - start}
+        page.wait_for_timeout(READY_POLL_MS)
+
+
+class IdleTailDetector:
+    """
+    Decides when a captured scene has gone static for good, so capture can stop
+    and the encoder pads the rest with the last frame.
+
+    The picture must have been unchanged for `confirm_sec` and the page must
+    report itself idle (window.__sceneIdle: timelines, CSS animations, timers),
+    or it must have been unchanged for `static_sec` regardless.
+    """
+
+    CHECK_INTERVAL = 0.25  # seconds of static picture between page idle probes
+
+    def __init__(self, page, confirm_sec: float = 0.5, static_sec: float = 4.0):
+        self.page = page
+        self.confirm_sec = confirm_sec
+        self.static_sec = static_sec
+        self.reason = None
+        self._next_probe = confirm_sec
+
+    def check(self, static_seconds: float) -> bool:
+        if static_seconds < self.confirm_sec:
+            self._next_probe = self.confirm_sec
+            return False
+
+        if static_seconds >= self.static_sec:
+            self.reason = 'static'
+            return True
+
+        if static_seconds >= self._next_probe:
+            self._next_probe = static_seconds + self.CHECK_INTERVAL
+            if self.page.evaluate("typeof window.__sceneIdle === 'function' && window.__sceneIdle()"):
+                self.reason = 'idle'
+                return True
+
+        return False
+
+
+def capture_virtual_time(page, cdp, encoder, duration_sec: float, fps: int, quality: int, idle: IdleTailDetector = None) -> int:
+    """
+    Step the page's virtual clock one frame at a time and pipe a JPEG of every
+    frame into the encoder. Output is frame-accurate and independent of how long
+    each screenshot takes. With an idle detector, stops at the first frame after
+    which the scene can no longer change (identical JPEGs = identical frames).
+
+    Returns:
+        Number of frames written
+    """
+    frame_ms = 1000.0 / fps
+    total_frames = int(round(duration_sec * fps))
+    previous = None
+    unchanged = 0
+
+    page.evaluate("window.__virtualTime.start()")
+
+    for frame in range(total_frames):
+        if frame > 0:
+            page.evaluate(f"window.__virtualTime.advance({frame_ms})")
+
+        shot = cdp.send('Page.captureScreenshot', {
+            'format': 'jpeg',
+            'quality': quality,
+            'optimizeForSpeed': True
+        })
+        data = base64.b64decode(shot['data'])
+        encoder.stdin.write(data)
+
+        if idle is not None:
+            unchanged = unchanged + 1 if data == previous else 0
+            previous = data
+            if idle.check(unchanged / fps):
+                return frame + 1
+
+    return total_frames
+
+
+class ScreencastResampler:
+    """
+    Turns the variable-rate CDP screencast stream (a frame only when the page
+    repaints) into a constant-rate image2pipe stream: every frame is held until
+    the next one arrives, by screencast timestamp, and the last one is repeated
+    to the end of the segment.
+    """
+
+    def __init__(self, encoder, fps: int, total_frames: int):
+        self.encoder = encoder
+        self.fps = fps
+        self.total_frames = total_frames
+        self.origin = None
+        self.last = None
+        self.last_timestamp = None
+        self.received = 0
+        self.written = 0
+
+    def push(self, frame: bytes, timestamp: float):
+        if self.origin is None:
+            self.origin = timestamp
+
+        self.received += 1
+        self._fill(min(int((timestamp - self.origin) * self.fps), self.total_frames))
+        self.last = frame
+        self.last_timestamp = timestamp
+
+    def finish(self, until: int = None) -> int:
+        """Write the held frame up to frame `until` (default: the end of the segment)"""
+        if self.last is None:
+            raise Exception("Screencast produced no frames")
+        self._fill(self.total_frames if until is None else min(until, self.total_frames))
+        return self.written
+
+    def _fill(self, until: int):
+        while self.last is not None and self.written < until:
+            self.encoder.stdin.write(self.last)
+            self.written += 1
+
+
+def capture_screencast(page, cdp, encoder, duration_sec: float, fps: int, quality: int, idle: IdleTailDetector = None) -> int:
+    """
+    Record the page in wall-clock time through the CDP screencast and pipe the
+    frames, resampled to `fps`, into the encoder. The screencast only sends a
+    frame when the page repaints, so with an idle detector the time since the
+    last frame is how long the picture has been static.
+
+    Frame positions are on the screencast's own clock (frame metadata
+    timestamps); the static time is measured locally and only ever added to a
+    screencast position as a duration, never compared against its timestamps.
+
+    Returns:
+        Number of frames written
+
+    Raises:
+        BrokenPipeError: the encoder stopped reading frames (see encoder_pipe_error)
+    """
+    resampler = ScreencastResampler(encoder, fps, int(round(duration_sec * fps)))
+    last_frame_at = [time.time()]
+    pipe_errors = []
+
+    def on_frame(params):
+        if pipe_errors:
+            return
+        last_frame_at[0] = time.time()
+        try:
+            resampler.push(base64.b64decode(params['data']), params['metadata']['timestamp'])
+        except BrokenPipeError as e:
+            # Raising inside the event handler would not reach the capture loop
+            pipe_errors.append(e)
+            return
+        try:
+            cdp.send('Page.screencastFrameAck', {'sessionId': params['sessionId']})
+        except Exception:
+            pass
+
+    cdp.on('Page.screencastFrame', on_frame)
+    cdp.send('Page.startScreencast', {
+        'format': 'jpeg',
+        'quality': quality,
+        'maxWidth': CAPTURE_CONTEXT_OPTIONS['viewport']['width'],
+        'maxHeight': CAPTURE_CONTEXT_OPTIONS['viewport']['height'],
+        'everyNthFrame': 1
+    })
+
+    # Screencast events are dispatched while Playwright waits
+    deadline = time.time() + duration_sec
+    stop_at = None
+    while time.time() < deadline and not pipe_errors:
+        page.wait_for_timeout(min(100, max(1, int((deadline - time.time()) * 1000))))
+        if idle is not None and resampler.origin is not None and idle.check(time.time() - last_frame_at[0]):
+            # The last frame's screencast position, held for as long as it has been static
+            static_seconds = time.time() - last_frame_at[0]
+            stop_at = int((resampler.last_timestamp - resampler.origin + static_seconds) * fps)
+            break
+    cdp.send('Page.stopScreencast')
+
+    if pipe_errors:
+        raise pipe_errors[0]
+
+    frames = resampler.finish(stop_at)
+    print(f"  🎞️  Screencast: {resampler.received} frames received, resampled to {frames} @ {fps}fps")
+    return frames
+
+
+CAPTURE_CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'device_scale_factor': 1,
+    'bypass_csp': True,
+    'ignore_https_errors': True
+}
+
+
+class BrowserPool:
+    """
+    Keeps warm Chromium browsers (each with one reusable capture context) alive
+    across many segment renders, so only the first segment in a container pays
+    the Playwright + browser cold start.
+
+    A browser is recycled after `max_pages` pages or as soon as it disconnects
+    (crash). The sync Playwright API is single-threaded: use one pool per thread.
+    Contexts are set up for one capture mode ("virtual" or "realtime") and, with
+    an asset_bundle, serve vendored CDN assets from memory; design system
+    preludes are always served from memory.
+    """
+
+    def __init__(self, size: int = 1, max_pages: int = 50, capture_mode: str = "virtual", asset_bundle=None):
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.capture_mode = capture_mode
+        self.asset_bundle = asset_bundle
+        self._playwright = None
+        self._slots = []
+        self._next_slot = 0
+        self.launches = 0
+        self.recycles = 0
+        self.pages_served = 0
+        self.ready_latency = LatencyHistogram('time to ready', buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10))
+
+    def start(self):
+        from playwright.sync_api import sync_playwright
+
+        if self._playwright is not None:
+            return
+
+        start_time = time.time()
+        self._playwright = sync_playwright().start()
+        self._slots = [self._launch_slot() for _ in range(self.size)]
+        print(f"🌐 Browser pool ready: {self.size} browser(s) ({time.time() - start_time:.1f}s)")
+
+    def close(self):
+        for slot in self._slots:
+            self._close_slot(slot)
+        self._slots = []
+
+        if self._playwright is not None:
+            self._playwright.stop()
+            self._playwright = None
+
+    @contextmanager
+    def page(self):
+        """Lease a fresh page from a warm browser context"""
+        if self._playwright is None:
+            self.start()
+
+        slot = self._acquire_slot()
+        page = slot['context'].new_page()
+
+        try:
+            yield page
+        finally:
+            try:
+                page.close()
+            except Exception:
+                pass
+
+            slot['pages'] += 1
+            self.pages_served += 1
+
+            if not slot['browser'].is_connected():
+                print(f"  ♻️  Browser crashed, relaunching")
+                self._replace_slot(slot)
+            elif slot['pages'] >= self.max_pages:
+                print(f"  ♻️  Browser served {slot['pages']} pages, recycling")
+                self._replace_slot(slot)
+
+    def stats(self) -> dict:
+        return {
+            'size': self.size,
+            'launches': self.launches,
+            'recycles': self.recycles,
+            'pages_served': self.pages_served,
+            'time_to_ready': self.ready_latency.summary(),
+            'assets': self.asset_bundle.stats() if self.asset_bundle else None,
+            'design_system': get_prelude_routes().stats()
+        }
+
+    def _acquire_slot(self) -> dict:
+        slot = self._slots[self._next_slot % len(self._slots)]
+        self._next_slot += 1
+
+        if not slot['browser'].is_connected():
+            print(f"  ♻️  Browser disconnected, relaunching")
+            slot = self._replace_slot(slot)
+
+        return slot
+
+    def _launch_slot(self) -> dict:
+        browser = self._playwright.chromium.launch(headless=True, args=CHROMIUM_LAUNCH_ARGS)
+        context = new_capture_context(browser, self.capture_mode, self.asset_bundle)
+        self.launches += 1
+        return {'browser': browser, 'context': context, 'pages': 0}
+
+    def _replace_slot(self, slot: dict) -> dict:
+        self._close_slot(slot)
+        fresh = self._launch_slot()
+        self._slots[self._slots.index(slot)] = fresh
+        self.recycles += 1
+        return fresh
+
+    def _close_slot(self, slot: dict):
+        try:
+            slot['context'].close()
+        except Exception:
+            pass
+        try:
+            slot['browser'].close()
+        except Exception:
+            pass
+
+
+def new_capture_context(browser, capture_mode: str = "virtual", asset_bundle=None):
+    """
+    Browser context for segment capture: readiness shim, the virtual clock shim
+    in virtual mode, design system preludes, and CDN requests served from the
+    asset bundle when given.
+    """
+    context = browser.new_context(**CAPTURE_CONTEXT_OPTIONS)
+    get_prelude_routes().install(context)
+    if asset_bundle is not None:
+        asset_bundle.install(context)
+    context.add_init_script(READINESS_SHIM)
+    if capture_mode == "virtual":
+        context.add_init_script(VIRTUAL_TIME_SHIM)
+    return context
+
+
+def render_segment_capture(
+    html_path: str,
+    audio_path: str,
+    output_path: str,
+    duration_sec: float,
+    segment_index: int,
+    fps: int,
+    quality: int,
+    ffmpeg_timeout: int,
+    capture_mode: str = "virtual",
+    browser_pool: BrowserPool = None,
+    ready_timeout_ms: int = 10000,
+    asset_bundle=None,
+    idle_tail: bool = False,
+    idle_confirm_sec: float = 0.5,
+    idle_static_sec: float = 4.0
+) -> dict:
+    """
+    Render one segment in a single encode: captured frames are piped straight
+    into ffmpeg and muxed with the narration, so each segment is encoded exactly
+    once at its final settings.
+
+    capture_mode "virtual" freezes the page clock and steps it at exactly `fps`
+    (frame-accurate, faster than realtime); "realtime" records the live page
+    through the CDP screencast and resamples it to `fps`.
+
+    Capture starts as soon as the page signals readiness (see READINESS_SHIM),
+    or after `ready_timeout_ms` at the latest. With `idle_tail`, capture stops
+    once the scene is static (IdleTailDetector) and ffmpeg pads the clip to
+    `duration_sec` with the last frame.
+
+    With a browser_pool the page comes from a warm browser (its capture mode and
+    asset bundle apply); without one a browser is launched and torn down for this
+    segment only, using `asset_bundle` if given.
+
+    Returns:
+        dict with frames, captured_frames, idle_reason, capture_seconds,
+        time_to_ready, ready_reason
+    """
+    capture = capture_virtual_time if capture_mode == "virtual" else capture_screencast
+    idle_settings = (idle_confirm_sec, idle_static_sec) if idle_tail else None
+
+    if browser_pool is not None:
+        with browser_pool.page() as page:
+            result = _capture_page(
+                page, capture, html_path, audio_path, output_path, duration_sec, fps, quality,
+                ready_timeout_ms, idle_settings
+            )
+        browser_pool.ready_latency.observe(result['time_to_ready'])
+    else:
+        from playwright.sync_api import sync_playwright
+
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True, args=CHROMIUM_LAUNCH_ARGS)
+
+            try:
+                context = new_capture_context(browser, capture_mode, asset_bundle)
+                page = context.new_page()
+                result = _capture_page(
+                    page, capture, html_path, audio_path, output_path, duration_sec, fps, quality,
+                    ready_timeout_ms, idle_settings
+                )
+                context.close()
+            finally:
+                browser.close()
+
+    encoder, stderr_file = result.pop('encoder')
+    finish_segment_encoder(encoder, stderr_file, ffmpeg_timeout)
+
+    return result
+
+
+def _capture_page(page, capture, html_path, audio_path, output_path, duration_sec, fps, quality, ready_timeout_ms, idle_settings) -> dict:
+    page.on('console', _log_browser_console)
+    page.on('pageerror', _log_browser_error)
+
+    print(f"  📄 Loading HTML file...")
+    load_start = time.time()
+    page.goto(f'file://{html_path}', wait_until='domcontentloaded', timeout=30000)
+
+    readiness = wait_for_scene_ready(page, ready_timeout_ms)
+    time_to_ready = time.time() - load_start
+
+    if readiness['ready']:
+        print(f"  ⚡ Scene ready in {time_to_ready:.2f}s ({readiness['reason']})")
+    else:
+        print(f"  ⚠️  Scene not ready after {time_to_ready:.2f}s, capturing anyway")
+
+    gsap_loaded = page.evaluate("typeof gsap !== 'undefined'")
+    lucide_loaded = page.evaluate("typeof lucide !== 'undefined'")
+
+    print(f"  📦 Library status:")
+    print(f"     GSAP: {'✅ Loaded' if gsap_loaded else '❌ NOT LOADED'}")
+    print(f"     Lucide: {'✅ Loaded' if lucide_loaded else '❌ NOT LOADED'}")
+
+    if not gsap_loaded:
+        raise Exception(f"GSAP library failed to load")
+
+    try:
+        page.evaluate("if (typeof lucide !== 'undefined') lucide.createIcons();")
+    except:
+        pass
+
+    cdp = page.context.new_cdp_session(page)
+
+    idle = IdleTailDetector(page, *idle_settings) if idle_settings else None
+
+    encoder, stderr_file = start_segment_encoder(
+        ['-f', 'image2pipe', '-framerate', str(fps), '-c:v', 'mjpeg', '-i', '-'],
+        audio_path,
+        output_path,
+        pad_to=duration_sec if idle else None
+    )
+
+    print(f"  📹 Capturing {duration_sec:.1f}s @ {fps}fps ({capture.__name__})...")
+    start_time = time.time()
+
+    try:
+        frames = capture(page, cdp, encoder, duration_sec, fps, quality, idle)
+    except BrokenPipeError:
+        raise encoder_pipe_error(encoder, stderr_file) from None
+    except Exception:
+        encoder.kill()
+        stderr_file.close()
+        raise
+    finally:
+        try:
+            cdp.detach()
+        except Exception:
+            pass
+
+    capture_seconds = time.time() - start_time
+    total_frames = int(round(duration_sec * fps))
+    idle_reason = idle.reason if idle else None
+
+    if frames < total_frames:
+        print(f"  ✓ Captured {frames} frames, scene {idle_reason} → padding {total_frames - frames} "
+              f"frames ({capture_seconds:.1f}s wall time)")
+    else:
+        print(f"  ✓ Captured {frames} frames ({capture_seconds:.1f}s wall time)")
+
+    return {
+        'frames': total_frames,
+        'captured_frames': frames,
+        'idle_reason': idle_reason,
+        'capture_seconds': capture_seconds,
+        'time_to_ready': time_to_ready,
+        'ready_reason': readiness['reason'],
+        'encoder': (encoder, stderr_file)
+    }
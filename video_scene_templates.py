@@ -0,0 +1,529 @@
+# video_scene_templates.py
+"""
+Parametric scenes: the model writes a compact JSON scene spec and the HTML is
+rendered locally from one template per scene type.
+
+The five scene types are the ones the script and animation prompts already use
+(title, diagram, process-flow, comparison, stats). A spec is a few hundred
+tokens where a free-form document is several thousand, and the rendered HTML
+is deterministic for a given spec, so identical scenes hit the render cache.
+A spec with scene_type "freeform" (or one that fails validation) sends the
+segment down the free-form HTML path instead.
+
+Colors a spec leaves out come from the video's design system
+(video_design_system), whose prelude also carries the page styles; with a
+design system the result is a body fragment, otherwise a standalone document.
+
+Standard library only.
+"""
+import html
+import json
+import math
+import re
+from typing import Any, Dict, List, Optional
+
+from video_design_system import DesignSystem, get_design_system, scene_document
+
+
+SCENE_TYPES = ('title', 'diagram', 'process-flow', 'comparison', 'stats')
+FREEFORM_SCENE_TYPE = 'freeform'
+
+# Verified Lucide icons (same list as ANIMATION_GENERATION_TASK_TEMPLATE)
+SAFE_ICONS = (
+    'check-circle', 'x-circle', 'alert-circle', 'info', 'zap', 'star', 'heart',
+    'trending-up', 'trending-down', 'cpu', 'database', 'server', 'wifi',
+    'arrow-right', 'arrow-left', 'arrow-up', 'arrow-down', 'chevron-right',
+    'play-circle', 'pause-circle', 'circle', 'square', 'triangle',
+    'users', 'user', 'mail', 'phone', 'calendar', 'clock',
+    'settings', 'tool', 'wrench', 'package', 'folder', 'file',
+    'lightbulb', 'flame', 'droplet', 'wind', 'cloud', 'sun', 'moon',
+    'car', 'plane', 'ship', 'git-branch', 'rotate-cw', 'repeat'
+)
+
+# Diagram coordinates are in this SVG viewBox, drawn centred on the 1920x1080 page
+DIAGRAM_WIDTH = 1200
+DIAGRAM_HEIGHT = 700
+
+
+_COLOR = {'type': 'string', 'pattern': r'^#[0-9a-fA-F]{6}$'}
+_ICON = {'type': 'string', 'enum': list(SAFE_ICONS)}
+_TEXT = {'type': 'string', 'minLength': 1, 'maxLength': 80}
+_LONG_TEXT = {'type': 'string', 'minLength': 1, 'maxLength': 200}
+
+_COMMON = {
+    'background': {'type': 'array', 'items': _COLOR, 'minItems': 2, 'maxItems': 2},
+    'accent': _COLOR
+}
+
+_SIDE = {
+    'type': 'object',
+    'required': ['title', 'points'],
+    'properties': {
+        'title': _TEXT,
+        'icon': _ICON,
+        'color': _COLOR,
+        'points': {'type': 'array', 'items': _TEXT, 'minItems': 1, 'maxItems': 5}
+    }
+}
+
+# JSON Schema (draft-07 subset) per scene type
+SCENE_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    'title': {
+        'type': 'object',
+        'required': ['scene_type', 'title'],
+        'properties': dict(_COMMON, **{
+            'scene_type': {'const': 'title'},
+            'title': _TEXT,
+            'subtitle': _LONG_TEXT,
+            'icon': _ICON
+        })
+    },
+    'diagram': {
+        'type': 'object',
+        'required': ['scene_type', 'title', 'elements'],
+        'properties': dict(_COMMON, **{
+            'scene_type': {'const': 'diagram'},
+            'title': _TEXT,
+            'description': _LONG_TEXT,
+            'elements': {
+                'type': 'array',
+                'minItems': 1,
+                'maxItems': 12,
+                'items': {
+                    'type': 'object',
+                    'required': ['shape', 'x', 'y'],
+                    'properties': {
+                        'shape': {'type': 'string', 'enum': ['rect', 'circle', 'ellipse']},
+                        'x': {'type': 'number', 'minimum': 0, 'maximum': DIAGRAM_WIDTH},
+                        'y': {'type': 'number', 'minimum': 0, 'maximum': DIAGRAM_HEIGHT},
+                        'w': {'type': 'number', 'minimum': 10, 'maximum': DIAGRAM_WIDTH},
+                        'h': {'type': 'number', 'minimum': 10, 'maximum': DIAGRAM_HEIGHT},
+                        'color': _COLOR,
+                        'label': {'type': 'string', 'maxLength': 40}
+                    }
+                }
+            },
+            'connections': {
+                'type': 'array',
+                'maxItems': 16,
+                'items': {
+                    'type': 'object',
+                    'required': ['from', 'to'],
+                    'properties': {
+                        'from': {'type': 'integer', 'minimum': 0},
+                        'to': {'type': 'integer', 'minimum': 0},
+                        'label': {'type': 'string', 'maxLength': 30}
+                    }
+                }
+            }
+        })
+    },
+    'process-flow': {
+        'type': 'object',
+        'required': ['scene_type', 'title', 'steps'],
+        'properties': dict(_COMMON, **{
+            'scene_type': {'const': 'process-flow'},
+            'title': _TEXT,
+            'color': _COLOR,
+            'steps': {
+                'type': 'array',
+                'minItems': 2,
+                'maxItems': 5,
+                'items': {
+                    'type': 'object',
+                    'required': ['title'],
+                    'properties': {
+                        'title': {'type': 'string', 'minLength': 1, 'maxLength': 30},
+                        'description': {'type': 'string', 'maxLength': 60},
+                        'icon': _ICON
+                    }
+                }
+            }
+        })
+    },
+    'comparison': {
+        'type': 'object',
+        'required': ['scene_type', 'title', 'left', 'right'],
+        'properties': dict(_COMMON, **{
+            'scene_type': {'const': 'comparison'},
+            'title': _TEXT,
+            'left': _SIDE,
+            'right': _SIDE
+        })
+    },
+    'stats': {
+        'type': 'object',
+        'required': ['scene_type', 'title', 'cards'],
+        'properties': dict(_COMMON, **{
+            'scene_type': {'const': 'stats'},
+            'title': _TEXT,
+            'cards': {
+                'type': 'array',
+                'minItems': 1,
+                'maxItems': 6,
+                'items': {
+                    'type': 'object',
+                    'required': ['value', 'label'],
+                    'properties': {
+                        'value': {'type': 'string', 'minLength': 1, 'maxLength': 12},
+                        'label': {'type': 'string', 'minLength': 1, 'maxLength': 40},
+                        'color': _COLOR
+                    }
+                }
+            }
+        })
+    }
+}
+
+
+class SceneSpecError(ValueError):
+    """Scene spec is not valid JSON or does not match its scene type's schema"""
+
+    def __init__(self, message: str, errors: Optional[List[str]] = None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+def parse_scene_spec(text: str) -> Dict[str, Any]:
+    """
+    Parse and validate a model response holding one scene spec object.
+
+    Markdown fences and text around the outermost {...} are ignored.
+
+    Raises:
+        SceneSpecError: on invalid JSON or schema violations
+    """
+    start = text.find('{')
+    end = text.rfind('}') + 1
+    if start == -1 or end == 0:
+        raise SceneSpecError("No JSON object found in response")
+
+    try:
+        spec = json.loads(text[start:end])
+    except json.JSONDecodeError as e:
+        raise SceneSpecError(f"Invalid scene spec JSON: {e}")
+
+    errors = validate_scene_spec(spec)
+    if errors:
+        raise SceneSpecError(f"Scene spec failed validation: {'; '.join(errors[:5])}", errors)
+    return spec
+
+
+def validate_scene_spec(spec: Any) -> List[str]:
+    """Schema violations of a spec (empty list when valid); freeform specs are valid"""
+    if not isinstance(spec, dict):
+        return ["spec is not an object"]
+
+    scene_type = spec.get('scene_type')
+    if scene_type == FREEFORM_SCENE_TYPE:
+        return []
+    if scene_type not in SCENE_SCHEMAS:
+        return [f"unknown scene_type {scene_type!r}"]
+
+    errors: List[str] = []
+    _check(spec, SCENE_SCHEMAS[scene_type], 'spec', errors)
+
+    if scene_type == 'diagram' and not errors:
+        count = len(spec['elements'])
+        for i, connection in enumerate(spec.get('connections', [])):
+            if connection['from'] >= count or connection['to'] >= count:
+                errors.append(f"spec.connections[{i}] refers to a missing element")
+
+    return errors
+
+
+def is_freeform(spec: Dict[str, Any]) -> bool:
+    return spec.get('scene_type') == FREEFORM_SCENE_TYPE
+
+
+def render_scene(spec: Dict[str, Any], design_system: Optional[str] = None) -> str:
+    """
+    Expand a validated spec into an auto-playing 1920x1080 scene.
+
+    Returns the body fragment for `design_system` when one is given, otherwise a
+    standalone document carrying the default design system inline.
+    """
+    design = get_design_system(design_system)
+    renderer = _RENDERERS[spec['scene_type']]
+    body, timeline = renderer(spec, design)
+
+    overrides = []
+    if spec.get('background'):
+        overrides.append(f"--bg-start: {spec['background'][0]}; --bg-end: {spec['background'][1]};")
+    if spec.get('accent'):
+        overrides.append(f"--accent: {spec['accent']};")
+
+    fragment = _FRAGMENT.format(
+        overrides=f"  <style>:root {{ {' '.join(overrides)} }}</style>\n" if overrides else '',
+        body=body,
+        timeline=timeline
+    )
+
+    if design_system is not None:
+        return fragment
+    return scene_document(fragment, design.name, inline=True, title=str(spec.get('title', 'Scene')))
+
+
+def _check(value: Any, schema: Dict[str, Any], path: str, errors: List[str]):
+    if 'const' in schema:
+        if value != schema['const']:
+            errors.append(f"{path} must be {schema['const']!r}")
+        return
+
+    expected = schema.get('type')
+    if expected == 'object':
+        if not isinstance(value, dict):
+            errors.append(f"{path} must be an object")
+            return
+        for key in schema.get('required', []):
+            if key not in value:
+                errors.append(f"{path}.{key} is required")
+        for key, sub_schema in schema.get('properties', {}).items():
+            if key in value:
+                _check(value[key], sub_schema, f"{path}.{key}", errors)
+
+    elif expected == 'array':
+        if not isinstance(value, list):
+            errors.append(f"{path} must be an array")
+            return
+        if len(value) < schema.get('minItems', 0):
+            errors.append(f"{path} needs at least {schema['minItems']} items")
+        if 'maxItems' in schema and len(value) > schema['maxItems']:
+            errors.append(f"{path} allows at most {schema['maxItems']} items")
+        for i, item in enumerate(value):
+            _check(item, schema.get('items', {}), f"{path}[{i}]", errors)
+
+    elif expected == 'string':
+        if not isinstance(value, str):
+            errors.append(f"{path} must be a string")
+            return
+        if len(value) < schema.get('minLength', 0):
+            errors.append(f"{path} must not be empty")
+        if 'maxLength' in schema and len(value) > schema['maxLength']:
+            errors.append(f"{path} is longer than {schema['maxLength']} characters")
+        if 'enum' in schema and value not in schema['enum']:
+            errors.append(f"{path} {value!r} is not allowed")
+        if 'pattern' in schema and not re.match(schema['pattern'], value):
+            errors.append(f"{path} {value!r} does not match {schema['pattern']}")
+
+    elif expected in ('number', 'integer'):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or (expected == 'integer' and not isinstance(value, int)):
+            errors.append(f"{path} must be {'an integer' if expected == 'integer' else 'a number'}")
+            return
+        if 'minimum' in schema and value < schema['minimum']:
+            errors.append(f"{path} must be >= {schema['minimum']}")
+        if 'maximum' in schema and value > schema['maximum']:
+            errors.append(f"{path} must be <= {schema['maximum']}")
+
+
+def _text(value: Any) -> str:
+    return html.escape(str(value), quote=True)
+
+
+def _tint(color: str, alpha: float = 0.2) -> str:
+    r, g, b = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return f"rgba({r},{g},{b},{alpha})"
+
+
+def _icon(name: Optional[str], size: int, color: str) -> str:
+    if not name:
+        return ''
+    return f'<i data-lucide="{name}" style="width: {size}px; height: {size}px; color: {color};"></i>'
+
+
+def _scene_title(spec: Dict[str, Any]) -> str:
+    return f'<h1 class="scene-title">{_text(spec["title"])}</h1>'
+
+
+def _render_title(spec: Dict[str, Any], design: DesignSystem):
+    subtitle = f'<p class="subtitle">{_text(spec["subtitle"])}</p>' if spec.get('subtitle') else ''
+    icon = f'<div class="icon-container">{_icon(spec["icon"], 80, "var(--accent)")}</div>' if spec.get('icon') else ''
+
+    body = f'''<div class="centered">
+    <h1 class="main-title gradient-text">{_text(spec["title"])}</h1>
+    {subtitle}
+    {icon}
+  </div>'''
+
+    timeline = """.from('.main-title', {scale: 0.5, opacity: 0, duration: 1.2, ease: 'elastic.out(1, 0.6)'})
+      .from('.subtitle', {y: 50, opacity: 0, duration: 0.8}, '-=0.6')
+      .from('.icon-container', {scale: 0, opacity: 0, duration: 0.6, ease: 'back.out(1.7)'}, '-=0.3')"""
+    return body, timeline
+
+
+def _element_center(element: Dict[str, Any]):
+    if element['shape'] == 'rect':
+        return element['x'] + element.get('w', 200) / 2, element['y'] + element.get('h', 120) / 2
+    return element['x'], element['y']
+
+
+def _edge_point(element: Dict[str, Any], toward_x: float, toward_y: float, gap: float = 10.0):
+    """Where a line from the element's centre towards (toward_x, toward_y) leaves its outline"""
+    cx, cy = _element_center(element)
+    dx, dy = toward_x - cx, toward_y - cy
+    length = math.hypot(dx, dy)
+    if length == 0:
+        return cx, cy
+
+    if element['shape'] == 'rect':
+        half_w, half_h = element.get('w', 200) / 2, element.get('h', 120) / 2
+        t = min(half_w / abs(dx) if dx else math.inf, half_h / abs(dy) if dy else math.inf)
+    elif element['shape'] == 'circle':
+        t = element.get('w', 120) / 2 / length
+    else:
+        rx, ry = element.get('w', 200) / 2, element.get('h', 120) / 2
+        t = 1 / math.hypot(dx / rx, dy / ry)
+
+    t += gap / length
+    return cx + dx * t, cy + dy * t
+
+
+def _num(value: float) -> str:
+    return f"{value:.1f}".rstrip('0').rstrip('.')
+
+
+def _render_diagram(spec: Dict[str, Any], design: DesignSystem):
+    accent = spec.get('accent', design.accent)
+    elements = spec['elements']
+    shapes, labels, lines = [], [], []
+
+    for i, element in enumerate(elements):
+        color = element.get('color', design.palette[i % len(design.palette)])
+        x, y = element['x'], element['y']
+        w, h = element.get('w', 200), element.get('h', 120)
+
+        if element['shape'] == 'rect':
+            shapes.append(f'<rect class="part" x="{x}" y="{y}" width="{w}" height="{h}" rx="14" fill="{color}"/>')
+            label_y = y - 18
+        elif element['shape'] == 'circle':
+            r = element.get('w', 120) / 2
+            shapes.append(f'<circle class="part" cx="{x}" cy="{y}" r="{_num(r)}" fill="{color}"/>')
+            label_y = y - r - 18
+        else:
+            shapes.append(f'<ellipse class="part" cx="{x}" cy="{y}" rx="{_num(w / 2)}" ry="{_num(h / 2)}" fill="{color}"/>')
+            label_y = y - h / 2 - 18
+
+        if element.get('label'):
+            label_x = _element_center(element)[0]
+            labels.append(f'<text class="label" x="{_num(label_x)}" y="{_num(label_y)}" fill="white" font-size="32" text-anchor="middle">{_text(element["label"])}</text>')
+
+    for connection in spec.get('connections', []):
+        source, target = elements[connection['from']], elements[connection['to']]
+        x1, y1 = _edge_point(source, *_element_center(target))
+        x2, y2 = _edge_point(target, *_element_center(source))
+        lines.append(f'<line class="link" x1="{_num(x1)}" y1="{_num(y1)}" x2="{_num(x2)}" y2="{_num(y2)}" stroke="{accent}" stroke-width="6" marker-end="url(#arrow)"/>')
+        if connection.get('label'):
+            lines.append(f'<text class="label" x="{_num((x1 + x2) / 2)}" y="{_num((y1 + y2) / 2 - 14)}" fill="{accent}" font-size="26" text-anchor="middle">{_text(connection["label"])}</text>')
+
+    description = f'<p class="description">{_text(spec["description"])}</p>' if spec.get('description') else ''
+    separator = '\n    '
+
+    body = f'''{_scene_title(spec)}
+  <svg class="diagram" viewBox="0 0 {DIAGRAM_WIDTH} {DIAGRAM_HEIGHT}" width="{DIAGRAM_WIDTH}" height="{DIAGRAM_HEIGHT}">
+    <defs><marker id="arrow" viewBox="0 0 10 10" refX="9" refY="5" markerWidth="5" markerHeight="5" orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="{accent}"/></marker></defs>
+    {separator.join(lines)}
+    {separator.join(shapes)}
+    {separator.join(labels)}
+  </svg>
+  {description}'''
+
+    # Shapes share one stagger so the entrance stays ~5s however many elements there are
+    stagger = round(min(0.3, 2.4 / len(elements)), 2)
+    timeline = f""".from('.scene-title', {{y: -50, opacity: 0, duration: 0.8}})
+      .from('.part', {{scale: 0, opacity: 0, transformOrigin: '50% 50%', duration: 0.6, stagger: {stagger}, ease: 'back.out(1.4)'}}, '-=0.3')
+      .from('.link', {{opacity: 0, duration: 0.5, stagger: 0.1}})
+      .from('.label', {{opacity: 0, duration: 0.4, stagger: 0.08}}, '-=0.3')
+      .from('.description', {{y: 30, opacity: 0, duration: 0.6}})"""
+    return body, timeline
+
+
+def _render_process_flow(spec: Dict[str, Any], design: DesignSystem):
+    color = spec.get('color', spec.get('accent', design.tokens['positive']))
+    parts = []
+
+    for i, step in enumerate(spec['steps']):
+        if i:
+            parts.append(f'<div class="flow-arrow" style="color: {color};">→</div>')
+        description = f'<p class="step-description">{_text(step["description"])}</p>' if step.get('description') else ''
+        parts.append(f'''<div class="step">
+      <div class="step-box" style="background: {_tint(color)}; border: 4px solid {color};">{_icon(step.get('icon') or 'circle', 60, color)}</div>
+      <h3 class="step-title">{_text(step["title"])}</h3>
+      {description}
+    </div>''')
+
+    separator = '\n    '
+    body = f'''{_scene_title(spec)}
+  <div class="flow">
+    {separator.join(parts)}
+  </div>'''
+
+    timeline = """.from('.scene-title', {y: -50, opacity: 0, duration: 0.8})
+      .from('.step, .flow-arrow', {x: -100, opacity: 0, duration: 0.6, stagger: 0.35})"""
+    return body, timeline
+
+
+def _render_side(side: Dict[str, Any], css_class: str, color: str, bullet: str) -> str:
+    color = side.get('color', color)
+    points = ''.join(f'<li>{bullet} {_text(point)}</li>' for point in side['points'])
+    icon = f'<div class="side-icon">{_icon(side["icon"], 100, color)}</div>' if side.get('icon') else ''
+    return f'''<div class="side {css_class}" style="background: {_tint(color)}; border: 4px solid {color};">
+      <h2 style="color: {color};">{_text(side["title"])}</h2>
+      {icon}
+      <ul>{points}</ul>
+    </div>'''
+
+
+def _render_comparison(spec: Dict[str, Any], design: DesignSystem):
+    body = f'''{_scene_title(spec)}
+  <div class="comparison">
+    {_render_side(spec['left'], 'left-side', design.tokens['negative'], '•')}
+    <div class="vs">VS</div>
+    {_render_side(spec['right'], 'right-side', design.tokens['positive'], '✓')}
+  </div>'''
+
+    timeline = """.from('.scene-title', {y: -50, opacity: 0, duration: 0.8})
+      .from('.left-side', {x: -200, opacity: 0, duration: 0.8})
+      .from('.vs', {scale: 0, rotation: 360, duration: 0.6}, '-=0.4')
+      .from('.right-side', {x: 200, opacity: 0, duration: 0.8}, '-=0.3')
+      .from('li', {opacity: 0, x: -20, duration: 0.4, stagger: 0.12})"""
+    return body, timeline
+
+
+def _render_stats(spec: Dict[str, Any], design: DesignSystem):
+    cards = []
+    for i, card in enumerate(spec['cards']):
+        color = card.get('color', design.palette[i % len(design.palette)])
+        cards.append(f'''<div class="stat-card" style="background: {_tint(color)}; border: 3px solid {color};">
+      <div class="stat-number" style="color: {color};">{_text(card["value"])}</div>
+      <div class="stat-label">{_text(card["label"])}</div>
+    </div>''')
+
+    columns = min(3, len(cards))
+    separator = '\n    '
+    body = f'''{_scene_title(spec)}
+  <div class="stats-grid" style="grid-template-columns: repeat({columns}, 1fr);">
+    {separator.join(cards)}
+  </div>'''
+
+    timeline = """.from('.scene-title', {y: -50, opacity: 0, duration: 0.8})
+      .from('.stat-card', {scale: 0, opacity: 0, duration: 0.6, stagger: 0.4, ease: 'back.out(1.7)'})"""
+    return body, timeline
+
+
+_RENDERERS = {
+    'title': _render_title,
+    'diagram': _render_diagram,
+    'process-flow': _render_process_flow,
+    'comparison': _render_comparison,
+    'stats': _render_stats
+}
+
+
+_FRAGMENT = """{overrides}  {body}
+  <script>
+    if (typeof lucide !== 'undefined') lucide.createIcons();
+
+    gsap.timeline()
+      {timeline};
+  </script>
+"""
@@ -1,27 +1,43 @@
 import os
 import json
-from typing import List, Dict, Any
-from crewai import Agent, Crew, Task, LLM
-from video_config import MODEL_PROVIDER, MODEL_CONFIG, TOTAL_SEGMENTS
+import time
+from typing import List, Dict, Any, AsyncIterator, Optional
+from video_config import MODEL_PROVIDER, MODEL_CONFIG, LLM_BACKEND, TOTAL_SEGMENTS
+from video_json_stream import JSONArrayStreamParser
+from video_llm_client import get_llm_client, system_prompt
 from video_script_prompts import (
     SCRIPT_WRITER_ROLE,
     SCRIPT_WRITER_GOAL,
     SCRIPT_WRITER_BACKSTORY,
     SCRIPT_GENERATION_TASK_TEMPLATE,
-    SCRIPT_REGENERATION_TASK_TEMPLATE
+    SCRIPT_REGENERATION_TASK_TEMPLATE,
+    SCRIPT_CONTINUATION_TASK_TEMPLATE
 )
 
 
 class VideoScriptAgent:
-    def __init__(self, model_provider: str = MODEL_PROVIDER):
+    def __init__(self, model_provider: str = MODEL_PROVIDER, llm_backend: str = LLM_BACKEND):
         self.model_provider = model_provider
         self.model_config = MODEL_CONFIG[model_provider]
+        self.llm_backend = llm_backend
         
         print(f"🤖 Initializing VideoScriptAgent")
         print(f"📊 Provider: {model_provider}")
         print(f"📊 Model: {self.model_config['model']}")
+        print(f"📊 Backend: {llm_backend}")
         
-        if model_provider == "anthropic":
+        # The direct client also serves the streaming mode under the crewai backend
+        self.llm_client = get_llm_client(model_provider)
+        self.system_prompt = system_prompt(SCRIPT_WRITER_ROLE, SCRIPT_WRITER_GOAL, SCRIPT_WRITER_BACKSTORY)
+        
+        if llm_backend == "crewai":
+            self._init_crewai()
+    
+    def _init_crewai(self):
+        """CrewAI is optional; only imported when the crewai backend is selected"""
+        from crewai import Agent, LLM
+        
+        if self.model_provider == "anthropic":
             self.llm = LLM(
                 model=self.model_config['model'],
                 api_key=os.getenv("ANTHROPIC_API_KEY"),
@@ -59,49 +75,14 @@ class VideoScriptAgent:
         print(f"📊 Segments: {num_segments} | Category: {category}")
         
         try:
-            middle_start = max(3, num_segments // 4)
-            middle_end = num_segments - max(3, num_segments // 5)
-            conclusion_start = num_segments - max(2, num_segments // 10)
+            task_description = self._build_task_description(prompt, category, num_segments, retry_count)
             
-            if retry_count > 0:
-                task_description = SCRIPT_REGENERATION_TASK_TEMPLATE.format(
-                    original_topic=prompt,
-                    category=category,
-                    num_segments=num_segments,
-                    error_message="Previous generation failed validation",
-                    retry_count=retry_count,
-                    critical_fixes="""
-- Ensure each segment is exactly 30-40 words
-- Return ONLY JSON array (no markdown, no extra text)
-- Each object must have: index (int), text (string), visual_hint (string)
-- Array must start with [ and end with ]
-- Last 2-3 segments MUST contain specific summary with concrete takeaways
-                    """
-                )
+            if self.llm_backend == "crewai":
+                raw_output = await self._run_crew(task_description, num_segments)
             else:
-                task_description = SCRIPT_GENERATION_TASK_TEMPLATE.format(
-                    topic=prompt,
-                    category=category,
-                    num_segments=num_segments,
-                    middle_start=middle_start,
-                    middle_end=middle_end,
-                    conclusion_start=conclusion_start
-                )
-            
-            task = Task(
-                description=task_description,
-                expected_output=f"Valid JSON array with {num_segments} segment objects including comprehensive conclusion",
-                agent=self.script_agent
-            )
-            
-            crew = Crew(
-                agents=[self.script_agent],
-                tasks=[task],
-                verbose=False
-            )
-            
-            result = await crew.kickoff_async()
-            raw_output = result.raw
+                response = await self.llm_client.complete(self.system_prompt, task_description)
+                raw_output = response['text']
+                print(f"  🧠 {response['input_tokens']} in / {response['output_tokens']} out tokens ({response['seconds']:.1f}s)")
             
             print("📦 Parsing script response...")
             
@@ -129,6 +110,210 @@ class VideoScriptAgent:
             print(f"❌ Script generation error: {e}")
             return self._create_fallback_segments(prompt, num_segments)
     
+    async def _run_crew(self, task_description: str, num_segments: int) -> str:
+        from crewai import Crew, Task
+        
+        task = Task(
+            description=task_description,
+            expected_output=f"Valid JSON array with {num_segments} segment objects including comprehensive conclusion",
+            agent=self.script_agent
+        )
+        
+        crew = Crew(
+            agents=[self.script_agent],
+            tasks=[task],
+            verbose=False
+        )
+        
+        result = await crew.kickoff_async()
+        return result.raw
+    
+    async def stream_script_segments(
+        self,
+        prompt: str,
+        category: str,
+        num_segments: int = None,
+        token_stream: Optional[AsyncIterator[str]] = None,
+        written: Optional[List[Dict[str, Any]]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield validated segments while the model is still writing the script.
+
+        The response is parsed incrementally, so each segment object is handed on
+        as soon as its closing brace arrives. `token_stream` replaces the live
+        provider stream (e.g. video_json_stream.scripted_token_stream).
+
+        `written` holds segments that already exist (e.g. streamed before a job
+        was interrupted); the model is then asked to continue the script after
+        them, and only the new segments are yielded.
+
+        If the stream fails before producing any segment of a new script, the
+        non-streaming generate_script_segments() result is yielded instead. If it
+        ends with fewer than 80% of `num_segments` (the bar
+        generate_script_segments() applies), the missing segments are topped up
+        with a continuation request, or padded from the fallback script when
+        that fails too.
+        """
+        if num_segments is None:
+            num_segments = TOTAL_SEGMENTS
+        written = list(written or [])
+        
+        print(f"📝 Streaming script for: {prompt[:60]}...")
+        print(f"📊 Segments: {num_segments} | Category: {category}")
+        
+        if len(written) >= num_segments:
+            print(f"✅ Script already complete: {len(written)} segments")
+            return
+        
+        if token_stream is None:
+            if written:
+                print(f"  ↪️  Continuing after {len(written)} existing segments")
+                task_description = self._build_continuation_description(prompt, category, num_segments, written)
+            else:
+                task_description = self._build_task_description(prompt, category, num_segments)
+            token_stream = self.llm_client.stream(self.system_prompt, task_description)
+        
+        parser = JSONArrayStreamParser()
+        segments = []
+        start = time.time()
+        
+        try:
+            async for chunk in token_stream:
+                for element in parser.feed(chunk):
+                    segment = self._normalize_segment(element, len(written) + len(segments))
+                    if segment is None:
+                        continue
+                    
+                    if not segments:
+                        print(f"  ⏱️  First segment after {time.time() - start:.1f}s")
+                    segments.append(segment)
+                    yield segment
+                
+                if parser.finished:
+                    break
+        except Exception as e:
+            print(f"❌ Script stream error after {len(segments)} segments: {e}")
+        
+        if not segments and not written:
+            print("⚠️  Streaming produced no segments, falling back to full generation")
+            for segment in await self.generate_script_segments(prompt, category, num_segments):
+                yield segment
+            return
+        
+        if not parser.finished:
+            print("⚠️  Script stream ended before the closing ]")
+        
+        script = written + segments
+        if len(script) < num_segments * 0.8:
+            async for segment in self._top_up_segments(prompt, category, num_segments, script):
+                segments.append(segment)
+                yield segment
+            script = written + segments
+        
+        if not self._validate_conclusion(script, num_segments):
+            print("⚠️  Conclusion validation failed, but proceeding...")
+        
+        print(f"✅ Script streamed: {len(segments)} segments, {parser.errors} malformed ({time.time() - start:.1f}s)")
+    
+    async def _top_up_segments(
+        self,
+        prompt: str,
+        category: str,
+        num_segments: int,
+        script: List[Dict[str, Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Segments completing a short streamed script: a continuation request, else the fallback script's tail"""
+        missing = num_segments - len(script)
+        print(f"⚠️  Too few segments streamed: {len(script)}/{num_segments}, topping up {missing}")
+        
+        extra = []
+        try:
+            task_description = self._build_continuation_description(prompt, category, num_segments, script)
+            response = await self.llm_client.complete(self.system_prompt, task_description)
+            elements = json.loads(self._extract_json(response['text']))
+            
+            for element in elements if isinstance(elements, list) else []:
+                segment = self._normalize_segment(element, len(script) + len(extra))
+                if segment is not None and len(extra) < missing:
+                    extra.append(segment)
+        except Exception as e:
+            print(f"❌ Script top-up failed: {e}")
+        
+        if len(script) + len(extra) >= num_segments * 0.8:
+            print(f"✅ Script topped up with {len(extra)} generated segments")
+        else:
+            padding = self._create_fallback_segments(prompt, num_segments)[len(script) + len(extra):]
+            print(f"⚠️  Script top-up produced {len(extra)} segments, padding with {len(padding)} fallback segments")
+            extra += padding
+        
+        for i, segment in enumerate(extra):
+            segment['index'] = len(script) + i
+            yield segment
+    
+    def _normalize_segment(self, element: Any, index: int) -> Optional[Dict[str, Any]]:
+        """Per-segment form of _validate_segments for streamed output; None drops the element"""
+        if not isinstance(element, dict) or not isinstance(element.get('text'), str) or not element['text'].strip():
+            print(f"⚠️  Skipping streamed segment {index}: missing text")
+            return None
+        
+        if not element.get('visual_hint'):
+            element['visual_hint'] = "Abstract geometric animation"
+        
+        word_count = len(element['text'].split())
+        if word_count < 20 or word_count > 60:
+            print(f"⚠️  Segment {index} word count: {word_count} (expected 30-40)")
+        
+        element['index'] = index
+        return element
+    
+    def _build_task_description(self, prompt: str, category: str, num_segments: int, retry_count: int = 0) -> str:
+        middle_start = max(3, num_segments // 4)
+        middle_end = num_segments - max(3, num_segments // 5)
+        conclusion_start = num_segments - max(2, num_segments // 10)
+        
+        if retry_count > 0:
+            task_description = SCRIPT_REGENERATION_TASK_TEMPLATE.format(
+                original_topic=prompt,
+                category=category,
+                num_segments=num_segments,
+                error_message="Previous generation failed validation",
+                retry_count=retry_count,
+                critical_fixes="""
+- Ensure each segment is exactly 30-40 words
+- Return ONLY JSON array (no markdown, no extra text)
+- Each object must have: index (int), text (string), visual_hint (string)
+- Array must start with [ and end with ]
+- Last 2-3 segments MUST contain specific summary with concrete takeaways
+                """
+            )
+        else:
+            task_description = SCRIPT_GENERATION_TASK_TEMPLATE.format(
+                topic=prompt,
+                category=category,
+                num_segments=num_segments,
+                middle_start=middle_start,
+                middle_end=middle_end,
+                conclusion_start=conclusion_start
+            )
+        
+        return task_description
+    
+    def _build_continuation_description(
+        self,
+        prompt: str,
+        category: str,
+        num_segments: int,
+        written: List[Dict[str, Any]]
+    ) -> str:
+        return SCRIPT_CONTINUATION_TASK_TEMPLATE.format(
+            task_description=self._build_task_description(prompt, category, num_segments),
+            written_count=len(written),
+            written_segments='\n'.join(f"{i}. {segment['text']}" for i, segment in enumerate(written)),
+            remaining_count=num_segments - len(written),
+            first_index=len(written),
+            last_index=num_segments - 1
+        )
+    
     def _extract_json(self, text: str) -> str:
         text = text.strip()
         
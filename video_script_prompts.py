@@ -202,4 +202,16 @@ Return valid JSON array:
 - Each visual_hint: 100-200 word detailed blueprint
 - NO markdown, NO extra text
 - Start with [, end with ]
-"""
\ No newline at end of file
+"""
+
+# Appended to the generation task when part of the script already exists
+SCRIPT_CONTINUATION_TASK_TEMPLATE = """{task_description}
+
+CONTINUATION REQUEST:
+The first {written_count} segments of this script already exist and must NOT be repeated or rewritten:
+{written_segments}
+
+Write ONLY the remaining {remaining_count} segments (index {first_index} to {last_index}), continuing naturally from the last existing segment. Every rule above still applies, including the specific conclusion in the final segments.
+
+Return a JSON array of exactly {remaining_count} segment objects (no markdown, no extra text).
+"""
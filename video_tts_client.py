@@ -0,0 +1,244 @@
+# video_tts_client.py
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+from video_config import (
+    AUDIO_API_TIMEOUT,
+    TTS_API_BASE_URL,
+    TTS_MODEL,
+    TTS_VOICE,
+    TTS_RESPONSE_FORMAT,
+    TTS_MAX_CONNECTIONS,
+    TTS_RATE_LIMIT_PER_SECOND,
+    TTS_RATE_LIMIT_BURST,
+    TTS_MAX_RETRIES,
+    TTS_BACKOFF_BASE,
+    TTS_BACKOFF_MAX
+)
+from video_metrics import LatencyHistogram
+
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class TTSError(Exception):
+    """TTS request failed for good (non-retryable status or retries exhausted)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter usable from any thread or event loop.
+
+    Tokens are reserved under a thread lock and the caller sleeps outside it, so
+    concurrent jobs in one process (each possibly on its own loop) share a single
+    request budget without serialising on the lock.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def _reserve(self) -> float:
+        """Take one token; returns how long the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+
+            if self._tokens >= 0:
+                return 0.0
+
+            wait = -self._tokens / self.rate
+            self.waited_seconds += wait
+            return wait
+
+    async def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class TTSClient:
+    """
+    Async client for an OpenAI-compatible /audio/speech endpoint (Groq PlayAI).
+
+    Keeps keep-alive connections pooled per event loop, draws every request from a
+    shared TokenBucket, and retries 429/5xx/connection errors with jittered
+    exponential backoff that never undercuts the server's Retry-After.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str = TTS_API_BASE_URL,
+        rate_limiter: Optional[TokenBucket] = None,
+        latency: Optional[LatencyHistogram] = None,
+        max_connections: int = TTS_MAX_CONNECTIONS,
+        max_retries: int = TTS_MAX_RETRIES,
+        backoff_base: float = TTS_BACKOFF_BASE,
+        backoff_max: float = TTS_BACKOFF_MAX,
+        timeout: float = AUDIO_API_TIMEOUT
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.rate_limiter = rate_limiter or TokenBucket(TTS_RATE_LIMIT_PER_SECOND, TTS_RATE_LIMIT_BURST)
+        self.latency = latency or LatencyHistogram('tts latency', buckets=(0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30))
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+        self.requests_sent = 0
+        self.retries = 0
+        self.throttled = 0
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._lock = threading.Lock()
+
+    def _client(self) -> httpx.AsyncClient:
+        # httpx connections belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            for other in [l for l in self._clients if l.is_closed()]:
+                del self._clients[other]
+
+            client = self._clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    timeout=httpx.Timeout(self.timeout, connect=10.0),
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                        keepalive_expiry=60.0
+                    )
+                )
+                self._clients[loop] = client
+
+        return client
+
+    async def synthesize(
+        self,
+        text: str,
+        voice: str = TTS_VOICE,
+        model: str = TTS_MODEL,
+        response_format: str = TTS_RESPONSE_FORMAT
+    ) -> bytes:
+        """
+        Synthesize speech for one piece of text.
+
+        Returns:
+            Raw audio bytes in response_format
+
+        Raises:
+            TTSError: on a non-retryable status or once retries are exhausted
+        """
+        payload = {
+            "model": model,
+            "input": text,
+            "voice": voice,
+            "response_format": response_format
+        }
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            retry_after = None
+            started_at = time.time()
+
+            try:
+                self.requests_sent += 1
+                response = await self._client().post("/audio/speech", json=payload)
+                self.latency.observe(time.time() - started_at)
+
+                if response.status_code == 200:
+                    return response.content
+
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    raise TTSError(f"TTS API error: {response.status_code} {response.text[:200]}", response.status_code)
+
+                if response.status_code == 429:
+                    self.throttled += 1
+                retry_after = _parse_retry_after(response.headers.get('retry-after'))
+                last_error = TTSError(f"TTS API error: {response.status_code}", response.status_code)
+
+            except httpx.TransportError as e:
+                self.latency.observe(time.time() - started_at)
+                last_error = TTSError(f"TTS transport error: {e.__class__.__name__}: {e}")
+
+            if attempt < self.max_retries:
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        raise last_error
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max * 3))
+        return delay
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests_sent,
+            'retries': self.retries,
+            'throttled': self.throttled,
+            'rate_limit_wait_seconds': round(self.rate_limiter.waited_seconds, 1)
+        }
+
+    async def aclose(self):
+        """Close the connection pool of the current event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date form)"""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_shared_clients: Dict[str, TTSClient] = {}
+_shared_lock = threading.Lock()
+
+
+def get_tts_client(api_key: Optional[str], base_url: Optional[str] = None) -> TTSClient:
+    """Process-wide TTSClient per (base_url, api_key), shared by concurrent jobs"""
+    base_url = base_url or TTS_API_BASE_URL
+
+    with _shared_lock:
+        key = f"{base_url}|{api_key}"
+        if key not in _shared_clients:
+            _shared_clients[key] = TTSClient(api_key=api_key, base_url=base_url)
+        return _shared_clients[key]
@@ -0,0 +1,71 @@
+# video_workspace.py
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+from video_config import (
+    WORKSPACE_ROOT,
+    WORKSPACE_USE_TMPFS,
+    WORKSPACE_TMPFS_ROOT,
+    WORKSPACE_TMPFS_MIN_FREE_BYTES
+)
+
+
+class Workspace:
+    """
+    Isolated scratch directory for one job or one segment render, so concurrent
+    jobs and renders sharing a container never write to the same paths.
+
+        with Workspace.create('job-<video_id>') as workspace:
+            html_path = workspace.path('segment.html')
+            seg = workspace.child('segment_3')   # removed with its parent
+
+    The directory is removed on exit from the with-block (success or failure) or
+    by cleanup(); create() picks tmpfs when enabled and it has room.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def create(cls, name: str, base: Optional[str] = None) -> 'Workspace':
+        base = base or scratch_root()
+        os.makedirs(base, exist_ok=True)
+        return cls(tempfile.mkdtemp(prefix=f'{_safe_name(name)}-', dir=base))
+
+    def path(self, *parts: str) -> str:
+        """Path inside the workspace; parent directories are created"""
+        full_path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        return full_path
+
+    def child(self, name: str) -> 'Workspace':
+        return Workspace(os.path.join(self.root, _safe_name(name)))
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self) -> 'Workspace':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+        return False
+
+
+def scratch_root() -> str:
+    """WORKSPACE_TMPFS_ROOT when tmpfs is enabled and has enough free space, else WORKSPACE_ROOT"""
+    if WORKSPACE_USE_TMPFS and os.path.isdir(WORKSPACE_TMPFS_ROOT):
+        try:
+            stats = os.statvfs(WORKSPACE_TMPFS_ROOT)
+            if stats.f_bavail * stats.f_frsize >= WORKSPACE_TMPFS_MIN_FREE_BYTES:
+                return os.path.join(WORKSPACE_TMPFS_ROOT, 'garliq-work')
+        except OSError:
+            pass
+    return WORKSPACE_ROOT
+
+
+def _safe_name(name: str) -> str:
+    return ''.join(c if c.isalnum() or c in '-_.' else '_' for c in str(name)) or 'workspace'